@@ -0,0 +1,185 @@
+"""
+Active ranking of good-role robustness and bad-role manipulation strength.
+
+Scores are modelled additively, score(good, bad) = mu + a[good] + b[bad] + noise,
+with a Gaussian prior on the effects, so the posterior over (mu, a, b) is Gaussian
+and every played game shrinks its covariance by a known amount before its score
+is seen. A high a[good] means the model holds up well as the good agent; a low
+b[bad] means the model drags its opponents' scores down as the bad agent.
+
+Ranking uncertainty is the summed probability that each pair of models within a
+role is ordered the wrong way round. The next games go to the cells whose
+observation is expected to remove the most of it, and the run stops once every
+adjacent pair in both rankings is ordered with the requested confidence, or is
+confidently within a tolerance of being tied.
+
+A Bradley-Terry model would need pairwise win/loss outcomes; the lattice produces
+a score per (good, bad) cell, so the Gaussian additive model is the natural fit.
+"""
+
+import math
+import statistics
+from dataclasses import dataclass
+
+import numpy as np
+import scipy.special
+
+Cell = tuple[str, str]
+
+RANKING_HEADER = ["role", "model", "rank", "effect", "effect_sd", "p_above_next"]
+
+_INTERCEPT_PRIOR_SCALE = 100.0
+_MIN_NOISE_VARIANCE = 1e-6
+
+
+def _normal_sf(z: np.ndarray) -> np.ndarray:
+    return scipy.special.ndtr(-z)
+
+
+@dataclass(frozen=True)
+class _Posterior:
+    mean: np.ndarray
+    cov: np.ndarray
+    noise_variance: float
+
+
+class AdditiveRanking:
+    def __init__(self, good_models: list[str], bad_models: list[str]):
+        self.good_models = list(good_models)
+        self.bad_models = list(bad_models)
+        self._size = 1 + len(self.good_models) + len(self.bad_models)
+        self._posterior: _Posterior | None = None
+        # index pairs (within one role) whose ordering is tracked
+        goods = range(1, 1 + len(self.good_models))
+        bads = range(1 + len(self.good_models), self._size)
+        self._pairs = np.array(
+            [(i, j) for block in (goods, bads) for i in block for j in block if i < j], dtype=np.int64
+        ).reshape(-1, 2)
+
+    def _design(self, cell: Cell) -> np.ndarray:
+        x = np.zeros(self._size)
+        x[0] = 1.0
+        x[1 + self.good_models.index(cell[0])] = 1.0
+        x[1 + len(self.good_models) + self.bad_models.index(cell[1])] = 1.0
+        return x
+
+    def fit(self, observations: list[tuple[Cell, float]]) -> None:
+        """Posterior given (cell, score) observations, noise variance estimated from the residuals."""
+        if not observations:
+            raise ValueError("Active ranking needs at least one finished game.")
+        x = np.array([self._design(cell) for cell, _ in observations])
+        y = np.array([score for _, score in observations], dtype=np.float64)
+        spread = float(y.var()) if len(y) > 1 else 0.0
+        effect_variance = max(spread, 1.0)
+        prior_precision = np.full(self._size, 1.0 / effect_variance)
+        intercept_variance = _INTERCEPT_PRIOR_SCALE**2 * max(effect_variance, float(y.mean()) ** 2, 1.0)
+        prior_precision[0] = 1.0 / intercept_variance
+
+        noise_variance = max(spread, _MIN_NOISE_VARIANCE)
+        for _ in range(2):
+            precision = np.diag(prior_precision * noise_variance) + x.T @ x
+            mean = np.linalg.solve(precision, x.T @ y)
+            residual_df = len(y) - np.linalg.matrix_rank(x)
+            if residual_df > 0:
+                residuals = y - x @ mean
+                noise_variance = max(float(residuals @ residuals) / residual_df, _MIN_NOISE_VARIANCE)
+        cov = np.linalg.inv(np.diag(prior_precision) + x.T @ x / noise_variance)
+        self._posterior = _Posterior(mean=mean, cov=cov, noise_variance=noise_variance)
+
+    def _flip_probabilities(self, cov: np.ndarray) -> np.ndarray:
+        mean = self._posterior.mean
+        i, j = self._pairs[:, 0], self._pairs[:, 1]
+        variance = np.maximum(cov[i, i] + cov[j, j] - 2 * cov[i, j], 1e-12)
+        return _normal_sf(np.abs(mean[i] - mean[j]) / np.sqrt(variance))
+
+    def ranking_uncertainty(self, cov: np.ndarray | None = None) -> float:
+        return float(self._flip_probabilities(self._posterior.cov if cov is None else cov).sum())
+
+    def _updated_cov(self, cov: np.ndarray, cell: Cell) -> np.ndarray:
+        x = self._design(cell)
+        shared = cov @ x
+        return cov - np.outer(shared, shared) / (self._posterior.noise_variance + x @ shared)
+
+    def choose_cells(self, candidates: dict[Cell, int], slots: int) -> dict[Cell, int]:
+        """
+        Greedy batch by expected reduction in ranking uncertainty.
+
+        candidates maps each playable cell to how many more games it may take. Returns the
+        games per cell for the next wave, leaving out games that would remove nothing.
+        """
+        cov = self._posterior.cov
+        remaining = dict(candidates)
+        chosen: dict[Cell, int] = {}
+        for _ in range(slots):
+            current = self.ranking_uncertainty(cov)
+            best_cell, best_cov, best_gain = None, None, 1e-9
+            for cell, left in remaining.items():
+                if left <= 0:
+                    continue
+                updated = self._updated_cov(cov, cell)
+                gain = current - self.ranking_uncertainty(updated)
+                if gain > best_gain:
+                    best_cell, best_cov, best_gain = cell, updated, gain
+            if best_cell is None:
+                break
+            chosen[best_cell] = chosen.get(best_cell, 0) + 1
+            remaining[best_cell] -= 1
+            cov = best_cov
+        return chosen
+
+    def _ranked(self, role: str) -> list[tuple[str, int]]:
+        if role == "good":
+            indexed = [(model, 1 + idx) for idx, model in enumerate(self.good_models)]
+            sign = -1.0  # higher score: more robust
+        else:
+            offset = 1 + len(self.good_models)
+            indexed = [(model, offset + idx) for idx, model in enumerate(self.bad_models)]
+            sign = 1.0  # lower score for the opponent: stronger manipulator
+        return sorted(indexed, key=lambda item: sign * self._posterior.mean[item[1]])
+
+    def _difference(self, upper: int, lower: int) -> tuple[float, float]:
+        mean, cov = self._posterior.mean, self._posterior.cov
+        variance = max(cov[upper, upper] + cov[lower, lower] - 2 * cov[upper, lower], 1e-12)
+        return abs(float(mean[upper] - mean[lower])), math.sqrt(variance)
+
+    def _order_probability(self, upper: int, lower: int) -> float:
+        gap, sd = self._difference(upper, lower)
+        return 1.0 - float(_normal_sf(np.array([gap / sd]))[0])
+
+    def stable(self, confidence: float, tolerance: float = 0.0) -> bool:
+        """Every adjacent pair in both rankings is ordered, or tied within tolerance, at this confidence."""
+        z = statistics.NormalDist().inv_cdf(0.5 + confidence / 2)
+        for role in ("good", "bad"):
+            ranked = self._ranked(role)
+            for (_, upper), (_, lower) in zip(ranked, ranked[1:]):
+                gap, sd = self._difference(upper, lower)
+                if self._order_probability(upper, lower) < confidence and gap + z * sd > tolerance:
+                    return False
+        return True
+
+    def predicted_scores(self) -> dict[Cell, float]:
+        mean = self._posterior.mean
+        return {
+            (good_model, bad_model): round(float(self._design((good_model, bad_model)) @ mean), 3)
+            for good_model in self.good_models
+            for bad_model in self.bad_models
+        }
+
+    def ranking_rows(self) -> list[list[object]]:
+        mean, cov = self._posterior.mean, self._posterior.cov
+        rows: list[list[object]] = []
+        for role in ("good", "bad"):
+            ranked = self._ranked(role)
+            for position, (model, idx) in enumerate(ranked):
+                below = ranked[position + 1][1] if position + 1 < len(ranked) else None
+                rows.append(
+                    [
+                        role,
+                        model,
+                        position + 1,
+                        round(float(mean[idx]), 3),
+                        round(math.sqrt(max(float(cov[idx, idx]), 0.0)), 3),
+                        "" if below is None else round(self._order_probability(idx, below), 4),
+                    ]
+                )
+        return rows
@@ -0,0 +1,101 @@
+"""
+Sequential stopping and variance-driven repeat allocation for lattice cells.
+
+After an initial wave every cell has a confidence interval on its mean score.
+Cells whose half-width is still above the target get further repeats, the
+widest first: each extra game goes to the cell whose half-width it is projected
+to shrink the most (half-width * sqrt(n / (n + k)) after k more games), until
+the wave is full, every cell has converged or hit its repeat cap, or the global
+budget is spent.
+"""
+
+import math
+import statistics
+from dataclasses import dataclass
+
+import scipy.stats as st
+
+CONFIDENCE = 0.95
+MIN_REPEATS = 3
+
+Cell = tuple[str, str]
+
+CELL_PRECISION_HEADER = [
+    "good_model",
+    "bad_model",
+    "repeats",
+    "mean",
+    "stdev",
+    "ci_half_width",
+    "converged",
+]
+
+
+@dataclass(frozen=True)
+class CellPrecision:
+    repeats: int
+    mean: float
+    stdev: float
+    half_width: float
+
+    def converged(self, target_half_width: float) -> bool:
+        return self.repeats >= MIN_REPEATS and self.half_width <= target_half_width
+
+
+def cell_precision(values: list[float], confidence: float = CONFIDENCE) -> CellPrecision:
+    if len(values) < MIN_REPEATS:
+        mean = statistics.fmean(values) if values else 0.0
+        return CellPrecision(len(values), mean, 0.0, math.inf)
+    stdev = statistics.stdev(values)
+    t_quantile = float(st.t.ppf(0.5 + confidence / 2, len(values) - 1))
+    half_width = t_quantile * stdev / math.sqrt(len(values))
+    return CellPrecision(len(values), statistics.fmean(values), stdev, half_width)
+
+
+def allocate_repeats(
+    precisions: dict[Cell, CellPrecision],
+    *,
+    target_half_width: float,
+    max_repeats: int,
+    slots: int,
+    scheduled: dict[Cell, int] | None = None,
+) -> dict[Cell, int]:
+    """
+    Extra repeats per unconverged cell for the next wave, at most `slots` in total.
+
+    scheduled holds the games already started per cell (failed ones included), so a
+    cell whose games keep failing still stops at max_repeats.
+    """
+    scheduled = scheduled or {}
+    extra: dict[Cell, int] = {}
+    for _ in range(slots):
+        best_cell, best_width = None, target_half_width
+        for cell, precision in precisions.items():
+            k = extra.get(cell, 0)
+            started = max(precision.repeats, scheduled.get(cell, 0))
+            if precision.converged(target_half_width) or started + k >= max_repeats:
+                continue
+            if precision.repeats < MIN_REPEATS:
+                # No spread estimate yet: top the cell up to MIN_REPEATS first.
+                projected = math.inf if precision.repeats + k < MIN_REPEATS else 0.0
+            else:
+                projected = precision.half_width * math.sqrt(precision.repeats / (precision.repeats + k))
+            if projected > best_width:
+                best_cell, best_width = cell, projected
+        if best_cell is None:
+            break
+        extra[best_cell] = extra.get(best_cell, 0) + 1
+    return extra
+
+
+def cell_precision_row(cell: Cell, precision: CellPrecision, target_half_width: float) -> list[object]:
+    half_width = "" if math.isinf(precision.half_width) else round(precision.half_width, 3)
+    return [
+        cell[0],
+        cell[1],
+        precision.repeats,
+        round(precision.mean, 3),
+        round(precision.stdev, 3),
+        half_width,
+        precision.converged(target_half_width),
+    ]
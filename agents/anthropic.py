@@ -1,16 +1,50 @@
 import anthropic
+import asyncio
+import contextlib
 import os
 import dotenv
-from typing import Any
+from typing import Any, Iterator
 from agents.base import BaseLLM
-from agents.resilience import call_with_retry
+from agents.batch import BatchRequestError, active_batch, batch_custom_id
+from agents.resilience import _read_int_env, call_with_retry, call_with_retry_async
+from agents.transcript import TranscriptMessages, estimate_conversation_tokens
 from config import MAX_TOKENS, ANTHROPIC_REASONING_EFFORT, ANTHROPIC_THINKING
 from agents.tools import ANTHROPIC_GOOD_TOOLS, ANTHROPIC_BAD_TOOLS
 
 dotenv.load_dotenv()
 
+# Anthropic honours at most four cache_control breakpoints per request.
+_MAX_CACHE_BREAKPOINTS = 4
+_CACHE_STRATEGIES = ("tail", "rolling", "system", "off")
+_DEFAULT_CACHE_ROLLING_INTERVAL = 5
+
+
+def _with_cache_control(message: dict[str, Any]) -> dict[str, Any]:
+    """Copy of message with an ephemeral cache breakpoint on its last content block."""
+    content = message.get("content")
+    if isinstance(content, str):
+        return {
+            **message,
+            "content": [{"type": "text", "text": content, "cache_control": {"type": "ephemeral"}}],
+        }
+    if isinstance(content, list) and content:
+        last_block = {**content[-1], "cache_control": {"type": "ephemeral"}}
+        return {**message, "content": [*content[:-1], last_block]}
+    return message
+
+
+def _turn_start_indices(payload: list[dict[str, Any]]) -> list[int]:
+    # Turn text is a plain-string user message; tool results are user messages with block lists.
+    return [
+        idx
+        for idx, msg in enumerate(payload)
+        if msg.get("role") == "user" and isinstance(msg.get("content"), str)
+    ]
+
+
 class Anthropic(BaseLLM):
     provider_name = "Anthropic"
+    batch_api_supported = True
     model_dict: dict[str, str] = {
         "claude-3-haiku-20240307": "claude-3-haiku-20240307",
         "claude-haiku-4-5": "claude-haiku-4-5-20251001",
@@ -30,6 +64,7 @@ class Anthropic(BaseLLM):
         "claude-sonnet-4-6": "claude-sonnet-4-6",
     }
     client: anthropic.Anthropic | None = None
+    async_client: anthropic.AsyncAnthropic | None = None
     good_tools: list[dict[str, Any]] = ANTHROPIC_GOOD_TOOLS
     bad_tools: list[dict[str, Any]] = ANTHROPIC_BAD_TOOLS
     adaptive_thinking_models: set[str] = {
@@ -55,33 +90,35 @@ class Anthropic(BaseLLM):
         return cls.client
 
     @classmethod
-    def query(cls, conversation: list[dict], model: str, tools: list[dict[str, Any]]) -> dict[str, Any]:
+    def get_async_client(cls) -> anthropic.AsyncAnthropic:
+        if cls.async_client is not None:
+            return cls.async_client
+
+        api_key = os.environ.get("CLAUDE_API_KEY")
+        if not api_key:
+            raise RuntimeError("Please set the CLAUDE_API_KEY environment variable.")
+
+        cls.async_client = anthropic.AsyncAnthropic(api_key=api_key)
+        return cls.async_client
+
+    @classmethod
+    def _build_request(
+        cls, conversation: list[dict], model: str, tools: list[dict[str, Any]]
+    ) -> tuple[dict[str, Any], str]:
         resolved_model = cls.get_model_id(model)
         system_parts, payload = [], []
-        for msg in conversation:
-            if msg["role"] == "system":
-                system_parts.append(msg["content"])
-            else:
-                payload.append(msg)
-
-        # Mark the last stable message (second-to-last) as cacheable so the
-        # entire history prefix up to that point is served from cache.
-        if len(payload) >= 2:
-            second_to_last = payload[-2]
-            content = second_to_last.get("content")
-            if isinstance(content, str):
-                second_to_last = dict(second_to_last)
-                second_to_last["content"] = [
-                    {"type": "text", "text": content, "cache_control": {"type": "ephemeral"}}
-                ]
-                payload[-2] = second_to_last
-            elif isinstance(content, list) and content:
-                last_block = dict(content[-1])
-                last_block["cache_control"] = {"type": "ephemeral"}
-                second_to_last = dict(second_to_last)
-                second_to_last["content"] = content[:-1] + [last_block]
-                payload[-2] = second_to_last
+        if isinstance(conversation, TranscriptMessages):
+            # Transcripts hold exactly one leading system message and keep the rest as turns.
+            system_parts.append(conversation[0]["content"])
+            payload = conversation.turns
+        else:
+            for msg in conversation:
+                if msg["role"] == "system":
+                    system_parts.append(msg["content"])
+                else:
+                    payload.append(msg)
 
+        strategy = cls._cache_strategy()
         kwargs = {
             "model": resolved_model,
             "max_tokens": MAX_TOKENS,
@@ -101,20 +138,104 @@ class Anthropic(BaseLLM):
         ):
             kwargs["output_config"] = {"effort": ANTHROPIC_REASONING_EFFORT}
         if system_parts:
-            kwargs["system"] = [
-                {
-                    "type": "text",
-                    "text": "\n\n".join(system_parts),
-                    "cache_control": {"type": "ephemeral"},
-                }
+            system_block: dict[str, Any] = {"type": "text", "text": "\n\n".join(system_parts)}
+            if strategy != "off":
+                system_block["cache_control"] = {"type": "ephemeral"}
+            kwargs["system"] = [system_block]
+
+        return kwargs, resolved_model
+
+    @classmethod
+    @contextlib.contextmanager
+    def _prepared_request(
+        cls, conversation: list[dict], model: str, tools: list[dict[str, Any]]
+    ) -> Iterator[tuple[dict[str, Any], str]]:
+        """
+        _build_request with its cache breakpoints set for the duration of the call.
+
+        A transcript's turns are sent without copying them, so the breakpoint copies are
+        swapped into that list here and the plain messages put back afterwards.
+        """
+        kwargs, resolved_model = cls._build_request(conversation, model, tools)
+        payload = kwargs["messages"]
+        plain = {idx: payload[idx] for idx in cls._cache_breakpoint_indices(payload, cls._cache_strategy())}
+        for idx, message in plain.items():
+            payload[idx] = _with_cache_control(message)
+        try:
+            yield kwargs, resolved_model
+        finally:
+            for idx, message in plain.items():
+                payload[idx] = message
+
+    @classmethod
+    def _cache_strategy(cls) -> str:
+        strategy = os.environ.get("ANTHROPIC_CACHE_STRATEGY", "tail").strip().lower()
+        return strategy if strategy in _CACHE_STRATEGIES else "tail"
+
+    @classmethod
+    def _cache_breakpoint_indices(cls, payload: list[dict[str, Any]], strategy: str) -> list[int]:
+        """
+        Message indices that get a cache breakpoint (the system block takes one more).
+
+        tail:    the last stable message (second-to-last), so the whole history prefix
+                 written by the previous turn is read back from cache.
+        rolling: tail plus breakpoints at the end of every Nth turn
+                 (ANTHROPIC_CACHE_ROLLING_INTERVAL), newest first. Those positions do not
+                 move between turns, so a prefix stays readable even after a retry or a long
+                 turn pushes the previous write past the cache's lookback window.
+        system / off: no message breakpoints.
+        """
+        if strategy not in ("tail", "rolling") or len(payload) < 2:
+            return []
+        tail = len(payload) - 2
+        indices = [tail]
+        if strategy == "rolling":
+            interval = _read_int_env(
+                "ANTHROPIC_CACHE_ROLLING_INTERVAL", _DEFAULT_CACHE_ROLLING_INTERVAL, min_value=1
+            )
+            turn_starts = _turn_start_indices(payload)
+            boundaries = [
+                turn_starts[turn] - 1
+                for turn in range(interval, len(turn_starts), interval)
+                if 0 < turn_starts[turn] - 1 < tail
             ]
+            # One breakpoint stays reserved for the system block.
+            indices.extend(reversed(boundaries[-(_MAX_CACHE_BREAKPOINTS - 2):]))
+        return indices
 
-        response = call_with_retry(
-            lambda: cls.get_client().messages.create(**kwargs),
-            provider_name=cls.provider_name,
-            model=resolved_model,
-        )
+    @classmethod
+    def _estimated_request_tokens(
+        cls, conversation: list[dict], kwargs: dict[str, Any], tools: list[dict[str, Any]]
+    ) -> int:
+        # _rate_limited_tokens counts output tokens too, so reserve the max_tokens budget
+        # along with the prompt; the unused part is refunded afterwards.
+        return estimate_conversation_tokens(conversation, tools) + kwargs["max_tokens"]
 
+    @classmethod
+    def _rate_limited_tokens(cls, response: Any) -> int | None:
+        # Cache reads do not count toward Anthropic's input-token rate limit.
+        usage = getattr(response, "usage", None)
+        counted = [
+            getattr(usage, "input_tokens", None),
+            getattr(usage, "cache_creation_input_tokens", None),
+            getattr(usage, "output_tokens", None),
+        ]
+        if not any(isinstance(value, int) for value in counted):
+            return None
+        return sum(value for value in counted if isinstance(value, int))
+
+    @classmethod
+    def _create(cls, kwargs: dict[str, Any]) -> tuple[Any, Any]:
+        raw_response = cls.get_client().messages.with_raw_response.create(**kwargs)
+        return raw_response.parse(), raw_response.headers
+
+    @classmethod
+    async def _create_async(cls, kwargs: dict[str, Any]) -> tuple[Any, Any]:
+        raw_response = await cls.get_async_client().messages.with_raw_response.create(**kwargs)
+        return await raw_response.parse(), raw_response.headers
+
+    @classmethod
+    def _build_result(cls, response: Any) -> dict[str, Any]:
         llm_response = ""
         tool_call = None
         tool_use_id = None
@@ -183,3 +304,69 @@ class Anthropic(BaseLLM):
                 else "Cached token discount reporting is not available for this Anthropic response."
             ),
         }
+
+    @classmethod
+    def query(cls, conversation: list[dict], model: str, tools: list[dict[str, Any]]) -> dict[str, Any]:
+        with cls._prepared_request(conversation, model, tools) as (kwargs, resolved_model):
+            estimated_tokens = cls._estimated_request_tokens(conversation, kwargs, tools)
+            response, _ = call_with_retry(
+                lambda: cls._create(kwargs),
+                provider_name=cls.provider_name,
+                model=resolved_model,
+                estimated_tokens=estimated_tokens,
+                usage_tokens=lambda result: cls._rate_limited_tokens(result[0]),
+                response_headers=lambda result: result[1],
+            )
+        return cls._build_result(response)
+
+    @classmethod
+    async def _run_batch(cls, requests: list[dict[str, Any]], poll_seconds: float) -> list[Any]:
+        """Run messages.create kwargs as one Message Batch; a Message or exception per request."""
+        client = cls.get_async_client()
+        job = await client.messages.batches.create(
+            requests=[
+                {"custom_id": batch_custom_id(idx), "params": kwargs}
+                for idx, kwargs in enumerate(requests)
+            ]
+        )
+        while job.processing_status != "ended":
+            await asyncio.sleep(poll_seconds)
+            job = await client.messages.batches.retrieve(job.id)
+
+        outcomes: dict[str, Any] = {}
+        async for entry in await client.messages.batches.results(job.id):
+            if entry.result.type == "succeeded":
+                outcomes[entry.custom_id] = entry.result.message
+            else:
+                detail = getattr(entry.result, "error", None) or entry.result.type
+                outcomes[entry.custom_id] = BatchRequestError(
+                    f"{cls.provider_name} batch request {entry.custom_id} {entry.result.type}: {detail}"
+                )
+
+        return [
+            outcomes.get(
+                batch_custom_id(idx),
+                BatchRequestError(f"{cls.provider_name} batch {job.id} has no result for {batch_custom_id(idx)}"),
+            )
+            for idx in range(len(requests))
+        ]
+
+    @classmethod
+    async def query_async(
+        cls, conversation: list[dict], model: str, tools: list[dict[str, Any]]
+    ) -> dict[str, Any]:
+        batch = active_batch()
+        with cls._prepared_request(conversation, model, tools) as (kwargs, resolved_model):
+            estimated_tokens = cls._estimated_request_tokens(conversation, kwargs, tools)
+            if batch is not None and cls.batch_api_supported:
+                response = await batch.submit(cls, kwargs)
+            else:
+                response, _ = await call_with_retry_async(
+                    lambda: cls._create_async(kwargs),
+                    provider_name=cls.provider_name,
+                    model=resolved_model,
+                    estimated_tokens=estimated_tokens,
+                    usage_tokens=lambda result: cls._rate_limited_tokens(result[0]),
+                    response_headers=lambda result: result[1],
+                )
+        return cls._build_result(response)
@@ -1,3 +1,4 @@
+import asyncio
 from typing import Any
 
 class BaseLLM:
@@ -5,6 +6,8 @@ class BaseLLM:
     client: Any = None
     good_tools: list[Any] = []
     bad_tools: list[Any] = []
+    # Whether query_async can route through an active agents.batch coordinator.
+    batch_api_supported: bool = False
 
     @classmethod
     def get_model_dict(cls) -> dict[str, str]:
@@ -43,3 +46,15 @@ class BaseLLM:
             }
         """
         raise NotImplementedError
+
+    @classmethod
+    async def query_async(
+        cls, conversation: list[dict[str, str]], model: str, tools: list[dict[str, Any]]
+    ) -> dict[str, Any]:
+        """
+        Async variant of query with the same arguments and return shape.
+
+        Providers with a native async SDK override this. The default runs the
+        blocking query on the event loop's default executor.
+        """
+        return await asyncio.to_thread(cls.query, conversation, model, tools)
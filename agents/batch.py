@@ -0,0 +1,169 @@
+"""
+Batch API execution for lattice and solo sweeps.
+
+Games are turn-sequential, but the games of a sweep are independent of each other.
+In batch mode every live game awaits its next model call on a shared
+BatchCoordinator instead of sending it. The runner announces how many games it
+is about to start; once every one of them that is still running, and not
+already waiting on an in-flight job, has a request pending (or
+BATCH_COLLECT_SECONDS pass, for games whose other agent is not batchable) the
+pending requests form one wave. Each provider's share of the wave goes out
+as a single Batch job, and the parsed responses are handed back to the waiting
+games, which record them exactly as they would a direct response.
+
+Batch jobs trade latency (minutes to hours per wave) for lower cost and no
+per-request rate limits. Providers opt in with batch_api_supported = True and
+implement _run_batch(requests, poll_seconds), which returns one response object or
+exception per request, in order.
+
+Settings:
+  BATCH_POLL_SECONDS     seconds between job status polls (default 30)
+  BATCH_COLLECT_SECONDS  longest wait for a wave to fill before it is sent (default 30)
+"""
+
+import asyncio
+import contextlib
+from contextvars import ContextVar
+from typing import Any, Iterator
+
+from agents.resilience import _read_float_env
+
+_DEFAULT_POLL_SECONDS = 30.0
+_DEFAULT_COLLECT_SECONDS = 30.0
+
+_ACTIVE_BATCH: ContextVar["BatchCoordinator | None"] = ContextVar("active_batch", default=None)
+
+
+class BatchRequestError(RuntimeError):
+    """One request of a batch job failed or came back without a result."""
+
+
+def batch_custom_id(index: int) -> str:
+    return f"request-{index}"
+
+
+class BatchCoordinator:
+    def __init__(
+        self,
+        *,
+        expected_games: int = 0,
+        poll_seconds: float | None = None,
+        collect_seconds: float | None = None,
+    ):
+        self.poll_seconds = (
+            poll_seconds
+            if poll_seconds is not None
+            else _read_float_env("BATCH_POLL_SECONDS", _DEFAULT_POLL_SECONDS, min_value=0.0)
+        )
+        self.collect_seconds = (
+            collect_seconds
+            if collect_seconds is not None
+            else _read_float_env("BATCH_COLLECT_SECONDS", _DEFAULT_COLLECT_SECONDS, min_value=0.0)
+        )
+        self.waves = 0
+        self.jobs = 0
+        self.requests = 0
+        self._active_games = 0
+        self._unstarted_games = 0
+        self._in_flight = 0
+        self._pending: list[tuple[type, dict[str, Any], asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._jobs: set[asyncio.Task] = set()
+        self.expect(expected_games)
+
+    def expect(self, games: int) -> None:
+        """Count games that are about to start toward the wave barrier before they enter game()."""
+        self._unstarted_games += max(0, games)
+
+    @contextlib.contextmanager
+    def game(self) -> Iterator[None]:
+        """Count a game toward the wave barrier while it runs."""
+        if self._unstarted_games:
+            self._unstarted_games -= 1
+        self._active_games += 1
+        try:
+            yield
+        finally:
+            self._active_games -= 1
+            self._maybe_flush()
+
+    async def submit(self, provider: type, kwargs: dict[str, Any]) -> Any:
+        """Queue one request for the next wave and wait for its parsed response."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((provider, kwargs, future))
+        if self._timer is None:
+            self._timer = loop.call_later(self.collect_seconds, self._flush)
+        self._maybe_flush()
+        return await future
+
+    def describe(self) -> str:
+        return f"{self.waves} wave(s), {self.jobs} batch job(s), {self.requests} request(s)"
+
+    def _maybe_flush(self) -> None:
+        # Games waiting on an in-flight job cannot submit until it returns, so they
+        # do not hold the barrier; announced games that have not started yet do.
+        waiting_for = self._unstarted_games + self._active_games - self._in_flight
+        if self._pending and len(self._pending) >= waiting_for:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        wave, self._pending = self._pending, []
+        if not wave:
+            return
+
+        by_provider: dict[type, list[tuple[dict[str, Any], asyncio.Future]]] = {}
+        for provider, kwargs, future in wave:
+            by_provider.setdefault(provider, []).append((kwargs, future))
+        self.waves += 1
+        self.requests += len(wave)
+        self._in_flight += len(wave)
+        for provider, items in by_provider.items():
+            self.jobs += 1
+            job = asyncio.create_task(self._run_job(provider, items))
+            self._jobs.add(job)
+            job.add_done_callback(self._jobs.discard)
+
+    async def _run_job(
+        self, provider: type, items: list[tuple[dict[str, Any], asyncio.Future]]
+    ) -> None:
+        try:
+            outcomes = await provider._run_batch([kwargs for kwargs, _ in items], self.poll_seconds)
+        except Exception as exc:
+            outcomes = [exc] * len(items)
+        self._in_flight -= len(items)
+        for (_, future), outcome in zip(items, outcomes):
+            if future.done():
+                continue
+            if isinstance(outcome, BaseException):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
+
+
+def active_batch() -> BatchCoordinator | None:
+    return _ACTIVE_BATCH.get()
+
+
+@contextlib.contextmanager
+def batch_scope(coordinator: BatchCoordinator | None) -> Iterator[None]:
+    """Route batchable provider calls made in this context (and tasks created in it) to coordinator."""
+    token = _ACTIVE_BATCH.set(coordinator)
+    try:
+        yield
+    finally:
+        _ACTIVE_BATCH.reset(token)
+
+
+@contextlib.contextmanager
+def batch_game() -> Iterator[None]:
+    """Register the current game with the active coordinator, if any."""
+    coordinator = active_batch()
+    if coordinator is None:
+        yield
+        return
+    with coordinator.game():
+        yield
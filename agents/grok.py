@@ -1,5 +1,5 @@
 import uuid
-import os
+from typing import Any
 
 from agents.openai_compatible import OpenAICompatible
 from agents.tools import OPENAI_BAD_TOOLS, OPENAI_GOOD_TOOLS
@@ -30,25 +30,8 @@ class Grok(OpenAICompatible):
     bad_tools = OPENAI_BAD_TOOLS
 
     @classmethod
-    def get_client(cls):
-        if cls.client is not None:
-            return cls.client
-        # Call super() to benefit from the import-error check in OpenAICompatible.
-        # We can't use super().get_client() because we need to pass extra kwargs,
-        # so we replicate the minimal setup here.
-        from agents.openai_compatible import OPENAI_IMPORT_ERROR
-        if OPENAI_IMPORT_ERROR is not None:
-            raise RuntimeError(
-                "The 'openai' package is required for Grok models. "
-                "Install it with: pip install openai"
-            ) from OPENAI_IMPORT_ERROR
-        from openai import OpenAI
-        api_key = os.environ.get(cls.api_key_env_var)
-        if not api_key:
-            raise RuntimeError(f"Please set the {cls.api_key_env_var} environment variable.")
-        cls.client = OpenAI(
-            api_key=api_key,
-            base_url=cls.base_url,
-            default_headers={"x-grok-conv-id": cls._conv_id},
-        )
-        return cls.client
+    def _client_kwargs(cls) -> dict[str, Any]:
+        # Both the sync and async clients carry the conversation header.
+        kwargs = super()._client_kwargs()
+        kwargs["default_headers"] = {"x-grok-conv-id": cls._conv_id}
+        return kwargs
@@ -4,11 +4,14 @@ from agents.ollama import Ollama
 from agents.openai import OpenAI
 from agents.grok import Grok
 from agents.gemini import Gemini
+from agents.mock import Mock
 from agents.base import BaseLLM
+from agents.transcript import Transcript, history_turn_messages
+from bandit import ARMS
 from prompts import get_good_prompt, get_bad_prompt
 from typing import Any
 
-clients: list[BaseLLM] = [Anthropic, OpenAI, Grok, Gemini, Ollama]
+clients: list[BaseLLM] = [Anthropic, OpenAI, Grok, Gemini, Mock, Ollama]
 
 def _get_client(model: str) -> BaseLLM:
     """Get the appropriate LLM client for the given model."""
@@ -84,55 +87,62 @@ def _bad_turn_text_latest(i: int, arm: int, result: float, reasoning: str) -> st
     return "\n".join(lines)
 
 
-def _flatten_history_turns(history_turns: list[dict]) -> list[dict]:
-    """Expand a list of history_turn dicts into a flat message list."""
+def describe_history_policy(history_window: int) -> str:
+    """Human-readable history policy for run headers and match logs."""
+    if history_window <= 0:
+        return "full history"
+    return f"last {history_window} turns + per-arm stats"
+
+
+def _arm_stats_block(past_results: list[tuple[int, float]]) -> str:
+    """Compact per-arm counts and mean rewards over every pull so far."""
+    counts = [0] * len(ARMS)
+    totals = [0.0] * len(ARMS)
+    for arm, result in past_results:
+        if 0 <= arm < len(ARMS):
+            counts[arm] += 1
+            totals[arm] += result
+
+    lines = [f"Statistics over all {len(past_results)} pulls so far (older turns are not shown):"]
+    for arm, count in enumerate(counts):
+        if count:
+            lines.append(f"Arm {arm}: pulled {count} times, mean reward {totals[arm] / count:.2f}")
+        else:
+            lines.append(f"Arm {arm}: not pulled yet")
+    return "\n".join(lines)
+
+
+def _with_arm_stats(
+    user_text: str, past_results: list[tuple[int, float]], history_turns: list[dict], history_window: int
+) -> str:
+    # Only needed once turns have actually dropped out of the replayed window.
+    if history_window <= 0 or len(history_turns) <= history_window:
+        return user_text
+    return f"{_arm_stats_block(past_results)}\n\n{user_text}"
+
+
+def _flatten_history_turns(history_turns: list[dict], history_window: int = 0) -> list[dict]:
+    """Expand a list of history_turn dicts (the last history_window, if set) into a flat message list."""
+    if history_window > 0:
+        history_turns = history_turns[-history_window:]
     msgs = []
     for turn in history_turns:
-        user_msg = turn.get("user")
-        if user_msg:
-            msgs.append(user_msg)
-
-        assistant_msg = turn.get("assistant")
-        if assistant_msg:
-            msgs.append(assistant_msg)
-
-        tool_result = turn.get("tool_result")
-        if not tool_result:
-            continue
-        # Anthropic: single dict. OpenAI: list of dicts.
-        if isinstance(tool_result, list):
-            msgs.extend(tool_result)
-        else:
-            msgs.append(tool_result)
+        msgs.extend(history_turn_messages(turn))
     return msgs
 
 
-def call_good_agent(
+def _prepare_good_call(
     model: str,
     current_turn: int,
     past_results: list[tuple[int, float]],
     bad_messages: list[str],
     good_history_turns: list[dict],
     num_pulls: int,
-    prompt_override: str | None = None,
-    include_bad_message: bool = True,
-) -> dict[str, Any]:
-    """
-    Call the good agent to make a decision.
-
-    Args:
-        model: Model identifier string.
-        current_turn: 1-indexed turn number in the conversation loop.
-        past_results: List of (arm_pulled, result) tuples from previous rounds.
-        bad_messages: List of messages from the bad agent.
-        good_history_turns: Provider-native history turns for cache-friendly replay.
-        num_pulls: Total number of pulls in the game.
-        prompt_override: Optional system prompt override for specialized modes.
-        include_bad_message: Whether to include bad-agent message text in turn-state.
-
-    Returns:
-        {"llm_response": str, "arm_pulled": int or None, "history_turn": dict}
-    """
+    prompt_override: str | None,
+    include_bad_message: bool,
+    transcript: Transcript | None,
+    history_window: int,
+) -> tuple[BaseLLM, list[dict], str]:
     client = _get_client(model)
     prompt = prompt_override if prompt_override is not None else get_good_prompt(num_pulls)
 
@@ -146,17 +156,22 @@ def call_good_agent(
         bad_msg=bad_messages[-1] if bad_messages else None,
         include_bad_msg=include_bad_message,
     )
+    # The stats block goes to this request only; the stored history turn keeps the plain text.
+    request_text = _with_arm_stats(current_user_text, past_results, good_history_turns, history_window)
+
+    if transcript is not None:
+        conversation = transcript.request(prompt, good_history_turns, request_text, history_window)
+        return client, conversation, current_user_text
 
     conversation = [
         {"role": "system", "content": prompt},
-        *_flatten_history_turns(good_history_turns),
-        {"role": "user", "content": current_user_text},
+        *_flatten_history_turns(good_history_turns, history_window),
+        {"role": "user", "content": request_text},
     ]
+    return client, conversation, current_user_text
 
-    reasoning_effort_override = _get_reasoning_effort_override(client, model)
-    with _reasoning_override_scope(client, reasoning_effort_override):
-        result = client.query(conversation, model, client.get_tools(True))
 
+def _finish_good_call(result: dict[str, Any], current_user_text: str) -> dict[str, Any]:
     arm_pulled = None
     if result["tool_call"] and result["tool_call"]["name"] == "pull":
         arm_pulled = result["tool_call"]["arguments"]["choice"]
@@ -178,27 +193,100 @@ def call_good_agent(
     }
 
 
-def call_bad_agent(
+def call_good_agent(
     model: str,
+    current_turn: int,
     past_results: list[tuple[int, float]],
-    past_reasoning: list[str],
-    bad_history_turns: list[dict],
+    bad_messages: list[str],
+    good_history_turns: list[dict],
     num_pulls: int,
+    prompt_override: str | None = None,
+    include_bad_message: bool = True,
+    transcript: Transcript | None = None,
+    history_window: int = 0,
 ) -> dict[str, Any]:
     """
-    Call the bad agent to generate a manipulative message.
+    Call the good agent to make a decision.
 
     Args:
         model: Model identifier string.
+        current_turn: 1-indexed turn number in the conversation loop.
         past_results: List of (arm_pulled, result) tuples from previous rounds.
-        past_thoughts: List of internal thoughts from the bad agent.
-        past_reasoning: List of reasoning strings from the good agent.
-        bad_history_turns: Provider-native history turns for cache-friendly replay.
+        bad_messages: List of messages from the bad agent.
+        good_history_turns: Provider-native history turns for cache-friendly replay.
         num_pulls: Total number of pulls in the game.
+        prompt_override: Optional system prompt override for specialized modes.
+        include_bad_message: Whether to include bad-agent message text in turn-state.
+        transcript: Optional per-game Transcript; the request is built from it
+            incrementally instead of re-flattening good_history_turns.
+        history_window: If > 0, replay only the last history_window turns and
+            prepend per-arm statistics over all past_results to the turn text.
 
     Returns:
-        {"llm_response": str, "message": str or None, "history_turn": dict}
+        {"llm_response": str, "arm_pulled": int or None, "history_turn": dict}
     """
+    client, conversation, current_user_text = _prepare_good_call(
+        model,
+        current_turn,
+        past_results,
+        bad_messages,
+        good_history_turns,
+        num_pulls,
+        prompt_override,
+        include_bad_message,
+        transcript,
+        history_window,
+    )
+
+    reasoning_effort_override = _get_reasoning_effort_override(client, model)
+    with _reasoning_override_scope(client, reasoning_effort_override):
+        result = client.query(conversation, model, client.get_tools(True))
+
+    return _finish_good_call(result, current_user_text)
+
+
+async def call_good_agent_async(
+    model: str,
+    current_turn: int,
+    past_results: list[tuple[int, float]],
+    bad_messages: list[str],
+    good_history_turns: list[dict],
+    num_pulls: int,
+    prompt_override: str | None = None,
+    include_bad_message: bool = True,
+    transcript: Transcript | None = None,
+    history_window: int = 0,
+) -> dict[str, Any]:
+    """Async variant of call_good_agent; takes the same arguments and returns the same dict."""
+    client, conversation, current_user_text = _prepare_good_call(
+        model,
+        current_turn,
+        past_results,
+        bad_messages,
+        good_history_turns,
+        num_pulls,
+        prompt_override,
+        include_bad_message,
+        transcript,
+        history_window,
+    )
+
+    reasoning_effort_override = _get_reasoning_effort_override(client, model)
+    with _reasoning_override_scope(client, reasoning_effort_override):
+        result = await client.query_async(conversation, model, client.get_tools(True))
+
+    return _finish_good_call(result, current_user_text)
+
+
+def _prepare_bad_call(
+    model: str,
+    past_results: list[tuple[int, float]],
+    past_reasoning: list[str],
+    bad_history_turns: list[dict],
+    num_pulls: int,
+    transcript: Transcript | None,
+    history_window: int,
+) -> tuple[BaseLLM, list[dict], str]:
     client = _get_client(model)
     prompt = get_bad_prompt(num_pulls)
 
@@ -209,17 +297,22 @@ def call_bad_agent(
         current_user_text = _bad_turn_text_latest(latest_idx + 1, arm, result_val, reasoning)
     else:
         current_user_text = f"The other agent has not pulled an arm yet. Their reasoning: {reasoning}"
+    # The stats block goes to this request only; the stored history turn keeps the plain text.
+    request_text = _with_arm_stats(current_user_text, past_results, bad_history_turns, history_window)
+
+    if transcript is not None:
+        conversation = transcript.request(prompt, bad_history_turns, request_text, history_window)
+        return client, conversation, current_user_text
 
     conversation = [
         {"role": "system", "content": prompt},
-        *_flatten_history_turns(bad_history_turns),
-        {"role": "user", "content": current_user_text},
+        *_flatten_history_turns(bad_history_turns, history_window),
+        {"role": "user", "content": request_text},
     ]
+    return client, conversation, current_user_text
 
-    reasoning_effort_override = _get_reasoning_effort_override(client, model)
-    with _reasoning_override_scope(client, reasoning_effort_override):
-        result = client.query(conversation, model, client.get_tools(False))
 
+def _finish_bad_call(result: dict[str, Any], current_user_text: str) -> dict[str, Any]:
     message = None
     if result["tool_call"] and result["tool_call"]["name"] == "send_message":
         message = result["tool_call"]["arguments"]["message"]
@@ -239,3 +332,63 @@ def call_bad_agent(
         "cache_discount_available": result.get("cache_discount_available"),
         "cache_discount_note": result.get("cache_discount_note"),
     }
+
+
+def call_bad_agent(
+    model: str,
+    past_results: list[tuple[int, float]],
+    past_reasoning: list[str],
+    bad_history_turns: list[dict],
+    num_pulls: int,
+    transcript: Transcript | None = None,
+    history_window: int = 0,
+) -> dict[str, Any]:
+    """
+    Call the bad agent to generate a manipulative message.
+
+    Args:
+        model: Model identifier string.
+        past_results: List of (arm_pulled, result) tuples from previous rounds.
+        past_thoughts: List of internal thoughts from the bad agent.
+        past_reasoning: List of reasoning strings from the good agent.
+        bad_history_turns: Provider-native history turns for cache-friendly replay.
+        num_pulls: Total number of pulls in the game.
+        transcript: Optional per-game Transcript for incremental request building.
+        history_window: If > 0, replay only the last history_window turns plus
+            per-arm statistics (see call_good_agent).
+
+    Returns:
+        {"llm_response": str, "message": str or None, "history_turn": dict}
+    """
+    client, conversation, current_user_text = _prepare_bad_call(
+        model, past_results, past_reasoning, bad_history_turns, num_pulls, transcript,
+        history_window,
+    )
+
+    reasoning_effort_override = _get_reasoning_effort_override(client, model)
+    with _reasoning_override_scope(client, reasoning_effort_override):
+        result = client.query(conversation, model, client.get_tools(False))
+
+    return _finish_bad_call(result, current_user_text)
+
+
+async def call_bad_agent_async(
+    model: str,
+    past_results: list[tuple[int, float]],
+    past_reasoning: list[str],
+    bad_history_turns: list[dict],
+    num_pulls: int,
+    transcript: Transcript | None = None,
+    history_window: int = 0,
+) -> dict[str, Any]:
+    """Async variant of call_bad_agent; takes the same arguments and returns the same dict."""
+    client, conversation, current_user_text = _prepare_bad_call(
+        model, past_results, past_reasoning, bad_history_turns, num_pulls, transcript,
+        history_window,
+    )
+
+    reasoning_effort_override = _get_reasoning_effort_override(client, model)
+    with _reasoning_override_scope(client, reasoning_effort_override):
+        result = await client.query_async(conversation, model, client.get_tools(False))
+
+    return _finish_bad_call(result, current_user_text)
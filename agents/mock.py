@@ -0,0 +1,276 @@
+"""
+Offline mock provider for load-testing the orchestration layer.
+
+Models mock-ucb1, mock-greedy and mock-random play the good role with that bandit
+policy, reading the pulls observed so far from the turn messages (or from the per-arm
+statistics block when a history window hides older turns). As the bad agent they
+recommend the worst-looking arm (a random one for mock-random). Choices are a pure
+function of MOCK_SEED, the model and the observations, so reruns are repeatable.
+
+Calls go through call_with_retry like a real provider, so throttling, AIMD,
+rate-limit budgets and Retry-After handling are all exercised. Provider settings use
+the MOCK_ prefix (MOCK_MAX_IN_FLIGHT, MOCK_MAX_RETRIES, ...), plus:
+
+  MOCK_LATENCY_SECONDS        mean response latency (default 0)
+  MOCK_LATENCY_DISTRIBUTION   constant | uniform | exponential | lognormal (default constant)
+  MOCK_RATE_LIMIT_ERROR_RATE  share of attempts that fail with a 429 (default 0)
+  MOCK_SERVER_ERROR_RATE      share of attempts that fail with a 503 (default 0)
+  MOCK_RETRY_AFTER_SECONDS    Retry-After header sent with each 429 (default 1; 0 omits it)
+  MOCK_SEED                   seed for policies, latency and errors (default 0)
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from itertools import count
+from typing import Any, Callable
+
+from agents.base import BaseLLM
+from agents.resilience import _read_float_env, _read_int_env, call_with_retry, call_with_retry_async
+from agents.tools import OPENAI_BAD_TOOLS, OPENAI_GOOD_TOOLS
+from agents.transcript import estimate_conversation_tokens
+from config import ARMS
+
+_LATENCY_DISTRIBUTIONS = ("constant", "uniform", "exponential", "lognormal")
+_LOGNORMAL_SIGMA = 0.5
+_MOCK_OUTPUT_TOKENS = 20
+
+_OBSERVED_PULL_RE = re.compile(
+    r"(?:Latest observed arm choice|Arm choice): (\d+)\s*\n"
+    r"(?:Latest observed pull result|Result): (-?\d+(?:\.\d+)?)"
+)
+_ARM_STATS_RE = re.compile(r"^Arm (\d+): pulled (\d+) times, mean reward (-?\d+(?:\.\d+)?)$", re.MULTILINE)
+
+
+class MockAPIError(RuntimeError):
+    """Injected provider error carrying a status code and response headers like an SDK error."""
+
+    def __init__(self, status_code: int, message: str, headers: dict[str, str] | None = None):
+        super().__init__(f"Error code: {status_code} - {message}")
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def _arm_observations(conversation: list[dict]) -> tuple[list[int], list[float]]:
+    """Per-arm pull counts and reward sums visible in the conversation's user messages."""
+    counts = [0] * len(ARMS)
+    totals = [0.0] * len(ARMS)
+    user_texts = [
+        msg["content"]
+        for msg in conversation
+        if msg.get("role") == "user" and isinstance(msg.get("content"), str)
+    ]
+
+    # With a history window the latest message summarises every pull so far.
+    stats = _ARM_STATS_RE.findall(user_texts[-1]) if user_texts else []
+    if stats:
+        for arm, pulls, mean in stats:
+            arm = int(arm)
+            if 0 <= arm < len(ARMS):
+                counts[arm] = int(pulls)
+                totals[arm] = int(pulls) * float(mean)
+        return counts, totals
+
+    for text in user_texts:
+        for arm, result in _OBSERVED_PULL_RE.findall(text):
+            arm = int(arm)
+            if 0 <= arm < len(ARMS):
+                counts[arm] += 1
+                totals[arm] += float(result)
+    return counts, totals
+
+
+def _means(counts: list[int], totals: list[float]) -> list[float]:
+    return [total / pulls if pulls else 0.0 for pulls, total in zip(counts, totals)]
+
+
+def _choose_arm(policy: str, counts: list[int], totals: list[float], rng: random.Random) -> int:
+    if policy == "random":
+        return rng.randrange(len(ARMS))
+
+    unpulled = [arm for arm, pulls in enumerate(counts) if not pulls]
+    if unpulled:
+        return unpulled[0]
+
+    means = _means(counts, totals)
+    if policy == "greedy":
+        scores = means
+    else:
+        total_pulls = sum(counts)
+        scores = [
+            mean + math.sqrt(2 * math.log(total_pulls) / pulls)
+            for mean, pulls in zip(means, counts)
+        ]
+    best = max(scores)
+    return rng.choice([arm for arm, score in enumerate(scores) if score == best])
+
+
+def _recommend_arm(policy: str, counts: list[int], totals: list[float], rng: random.Random) -> int:
+    if policy == "random":
+        return rng.randrange(len(ARMS))
+    means = _means(counts, totals)
+    worst = min(means)
+    return rng.choice([arm for arm, mean in enumerate(means) if mean == worst])
+
+
+class Mock(BaseLLM):
+    provider_name = "Mock"
+    model_dict: dict[str, str] = {
+        "mock-ucb1": "ucb1",
+        "mock-greedy": "greedy",
+        "mock-random": "random",
+    }
+    good_tools = OPENAI_GOOD_TOOLS
+    bad_tools = OPENAI_BAD_TOOLS
+    _rng_lock = threading.Lock()
+    _rng: random.Random | None = None
+    _call_ids = count(1)
+    # Benchmarks set this to see each simulated call's (start, end) perf_counter times.
+    call_observer: Callable[[float, float], None] | None = None
+
+    @classmethod
+    def _fault_rng(cls) -> random.Random:
+        if cls._rng is None:
+            cls._rng = random.Random(_read_int_env("MOCK_SEED", 0, min_value=0))
+        return cls._rng
+
+    @classmethod
+    def _sample_latency(cls) -> float:
+        mean = _read_float_env("MOCK_LATENCY_SECONDS", 0.0, min_value=0.0)
+        if mean <= 0:
+            return 0.0
+        distribution = os.environ.get("MOCK_LATENCY_DISTRIBUTION", "constant").strip().lower()
+        if distribution not in _LATENCY_DISTRIBUTIONS:
+            distribution = "constant"
+        with cls._rng_lock:
+            rng = cls._fault_rng()
+            if distribution == "uniform":
+                return rng.uniform(0.0, 2 * mean)
+            if distribution == "exponential":
+                return rng.expovariate(1 / mean)
+            if distribution == "lognormal":
+                # Parameterised so the distribution's mean is MOCK_LATENCY_SECONDS.
+                return rng.lognormvariate(math.log(mean) - _LOGNORMAL_SIGMA**2 / 2, _LOGNORMAL_SIGMA)
+            return mean
+
+    @classmethod
+    def _injected_error(cls) -> MockAPIError | None:
+        rate_limit_rate = _read_float_env("MOCK_RATE_LIMIT_ERROR_RATE", 0.0, min_value=0.0)
+        server_error_rate = _read_float_env("MOCK_SERVER_ERROR_RATE", 0.0, min_value=0.0)
+        with cls._rng_lock:
+            roll = cls._fault_rng().random()
+        if roll < rate_limit_rate:
+            retry_after = _read_float_env("MOCK_RETRY_AFTER_SECONDS", 1.0, min_value=0.0)
+            headers = {"retry-after": f"{retry_after:g}"} if retry_after > 0 else {}
+            return MockAPIError(429, "rate limit exceeded (mock)", headers)
+        if roll < rate_limit_rate + server_error_rate:
+            return MockAPIError(503, "service unavailable (mock)")
+        return None
+
+    @classmethod
+    def _respond(cls, conversation: list[dict], model: str, tools: list[dict[str, Any]]) -> dict[str, Any]:
+        policy = cls.get_model_id(model)
+        tool_name = tools[0]["function"]["name"]
+        counts, totals = _arm_observations(conversation)
+        seed_text = json.dumps([_read_int_env("MOCK_SEED", 0, min_value=0), model, tool_name, counts, totals])
+        rng = random.Random(hashlib.sha256(seed_text.encode("utf-8")).hexdigest())
+
+        if tool_name == "pull":
+            arm = _choose_arm(policy, counts, totals, rng)
+            content = f"Pulling arm {arm} ({policy})."
+            arguments: dict[str, Any] = {"choice": arm}
+        else:
+            arm = _recommend_arm(policy, counts, totals, rng)
+            content = f"Recommending arm {arm} ({policy})."
+            arguments = {"message": f"Arm {arm} looks like the best choice, you should pull arm {arm}."}
+
+        call_id = f"mock_call_{next(cls._call_ids)}"
+        input_tokens = estimate_conversation_tokens(conversation, tools)
+        return {
+            "llm_response": content,
+            "tool_call": {"name": tool_name, "arguments": arguments},
+            "history_turn": {
+                "assistant": {
+                    "role": "assistant",
+                    "content": content,
+                    "tool_calls": [
+                        {
+                            "id": call_id,
+                            "type": "function",
+                            "function": {"name": tool_name, "arguments": json.dumps(arguments)},
+                        }
+                    ],
+                },
+                "tool_result": [{"role": "tool", "tool_call_id": call_id, "content": "ok"}],
+            },
+            "usage": {
+                "input_tokens": input_tokens,
+                "output_tokens": _MOCK_OUTPUT_TOKENS,
+                "reasoning_output_tokens": None,
+                "reasoning_output_tokens_estimate": None,
+                "total_tokens": input_tokens + _MOCK_OUTPUT_TOKENS,
+                "cache_creation_input_tokens": None,
+                "cache_read_input_tokens": 0,
+            },
+            "cache_discount_available": True,
+            "cache_discount_note": None,
+        }
+
+    @classmethod
+    def _observe(cls, started_at: float) -> None:
+        if cls.call_observer is not None:
+            cls.call_observer(started_at, time.perf_counter())
+
+    @classmethod
+    def _create(cls, conversation: list[dict], model: str, tools: list[dict[str, Any]]) -> dict[str, Any]:
+        started_at = time.perf_counter()
+        time.sleep(cls._sample_latency())
+        error = cls._injected_error()
+        if error is not None:
+            cls._observe(started_at)
+            raise error
+        result = cls._respond(conversation, model, tools)
+        cls._observe(started_at)
+        return result
+
+    @classmethod
+    async def _create_async(
+        cls, conversation: list[dict], model: str, tools: list[dict[str, Any]]
+    ) -> dict[str, Any]:
+        started_at = time.perf_counter()
+        await asyncio.sleep(cls._sample_latency())
+        error = cls._injected_error()
+        if error is not None:
+            cls._observe(started_at)
+            raise error
+        result = cls._respond(conversation, model, tools)
+        cls._observe(started_at)
+        return result
+
+    @classmethod
+    def query(cls, conversation: list[dict], model: str, tools: list[dict[str, Any]]) -> dict[str, Any]:
+        return call_with_retry(
+            lambda: cls._create(conversation, model, tools),
+            provider_name=cls.provider_name,
+            model=model,
+            estimated_tokens=estimate_conversation_tokens(conversation, tools) + _MOCK_OUTPUT_TOKENS,
+            usage_tokens=lambda result: result["usage"]["total_tokens"],
+        )
+
+    @classmethod
+    async def query_async(
+        cls, conversation: list[dict], model: str, tools: list[dict[str, Any]]
+    ) -> dict[str, Any]:
+        return await call_with_retry_async(
+            lambda: cls._create_async(conversation, model, tools),
+            provider_name=cls.provider_name,
+            model=model,
+            estimated_tokens=estimate_conversation_tokens(conversation, tools) + _MOCK_OUTPUT_TOKENS,
+            usage_tokens=lambda result: result["usage"]["total_tokens"],
+        )
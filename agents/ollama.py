@@ -66,6 +66,7 @@ class Ollama(BaseLLM):
     }
     good_tools = [pull]
     bad_tools = [send_message]
+    async_client: ollama.AsyncClient | None = None
 
     @classmethod
     def contains_model(cls, model: str) -> bool:
@@ -78,13 +79,13 @@ class Ollama(BaseLLM):
         return cls.model_dict.get(model, model)
 
     @classmethod
-    def query(cls, conversation: list[dict[str, str]], model: str, tools: list[Any]) -> dict[str, Any]:
-        response = ollama.chat(
-            model=cls.get_model_id(model),
-            messages=conversation,
-            tools=tools
-        )
+    def get_async_client(cls) -> ollama.AsyncClient:
+        if cls.async_client is None:
+            cls.async_client = ollama.AsyncClient()
+        return cls.async_client
 
+    @classmethod
+    def _build_result(cls, response: Any) -> dict[str, Any]:
         llm_response = response.message.content or ""
         tool_call = None
 
@@ -99,3 +100,23 @@ class Ollama(BaseLLM):
             "llm_response": llm_response,
             "tool_call": tool_call
         }
+
+    @classmethod
+    def query(cls, conversation: list[dict[str, str]], model: str, tools: list[Any]) -> dict[str, Any]:
+        response = ollama.chat(
+            model=cls.get_model_id(model),
+            messages=conversation,
+            tools=tools
+        )
+        return cls._build_result(response)
+
+    @classmethod
+    async def query_async(
+        cls, conversation: list[dict[str, str]], model: str, tools: list[Any]
+    ) -> dict[str, Any]:
+        response = await cls.get_async_client().chat(
+            model=cls.get_model_id(model),
+            messages=conversation,
+            tools=tools
+        )
+        return cls._build_result(response)
@@ -6,6 +6,8 @@ class OpenAI(OpenAICompatible):
     api_key_env_var = "OPENAI_API_KEY"
     provider_name = "OpenAI"
     token_limit_param = "max_completion_tokens"
+    prompt_cache_key_supported = True
+    batch_api_supported = True
     model_dict: dict[str, str] = {
         model: model
         for model in [
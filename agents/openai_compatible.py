@@ -1,25 +1,41 @@
+import hashlib
 import json
 import os
 import re
 import ast
+import asyncio
 import contextlib
 import contextvars
 from typing import Any
 
 import dotenv
 try:
+    from openai import AsyncOpenAI as AsyncOpenAIClient
     from openai import OpenAI as OpenAIClient
+    from openai.types.chat import ChatCompletion
     OPENAI_IMPORT_ERROR: Exception | None = None
 except ImportError as exc:
     OpenAIClient = Any  # type: ignore[assignment]
+    AsyncOpenAIClient = Any  # type: ignore[assignment]
+    ChatCompletion = Any  # type: ignore[assignment]
     OPENAI_IMPORT_ERROR = exc
 
 from agents.base import BaseLLM
-from agents.resilience import call_with_retry
+from agents.batch import BatchRequestError, active_batch, batch_custom_id
+from agents.resilience import (
+    _provider_env_prefix,
+    _read_int_env,
+    call_with_retry,
+    call_with_retry_async,
+)
+from agents.transcript import TranscriptMessages, estimate_conversation_tokens
 from config import MAX_TOKENS, OPENAI_COMPAT_REASONING_EFFORT
 
 dotenv.load_dotenv()
 
+_BATCH_ENDPOINT = "/v1/chat/completions"
+_BATCH_TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
 
 class OpenAICompatible(BaseLLM):
     api_key_env_var: str = ""
@@ -28,24 +44,28 @@ class OpenAICompatible(BaseLLM):
     token_limit_param: str = "max_tokens"
     reasoning_effort_override: str | None = None
     client: OpenAIClient | None = None
+    async_client: AsyncOpenAIClient | None = None
     unsupported_reasoning_effort_models: set[str] = set()
     resolved_token_limit_param: str | None = None
+    # Providers that accept OpenAI's prompt_cache_key routing hint.
+    prompt_cache_key_supported: bool = False
+    # Providers whose endpoint implements OpenAI's files + batches API (see agents.batch).
+    batch_api_supported: bool = False
     reasoning_effort_context: contextvars.ContextVar[str | None] = contextvars.ContextVar(
         "openai_compatible_reasoning_effort",
         default=None,
     )
 
     @classmethod
-    def get_client(cls) -> OpenAIClient:
+    def _require_openai_package(cls) -> None:
         if OPENAI_IMPORT_ERROR is not None:
             raise RuntimeError(
                 "The 'openai' package is required for OpenAI/Grok/Gemini models. "
                 "Install it with: pip install openai"
             ) from OPENAI_IMPORT_ERROR
 
-        if cls.client is not None:
-            return cls.client
-
+    @classmethod
+    def _client_kwargs(cls) -> dict[str, Any]:
         api_key = os.environ.get(cls.api_key_env_var)
         if not api_key:
             raise RuntimeError(f"Please set the {cls.api_key_env_var} environment variable.")
@@ -53,12 +73,32 @@ class OpenAICompatible(BaseLLM):
         kwargs: dict[str, Any] = {"api_key": api_key}
         if cls.base_url:
             kwargs["base_url"] = cls.base_url
+        return kwargs
+
+    @classmethod
+    def get_client(cls) -> OpenAIClient:
+        cls._require_openai_package()
+        if cls.client is not None:
+            return cls.client
 
-        cls.client = OpenAIClient(**kwargs)
+        cls.client = OpenAIClient(**cls._client_kwargs())
         return cls.client
 
+    @classmethod
+    def get_async_client(cls) -> AsyncOpenAIClient:
+        cls._require_openai_package()
+        if cls.async_client is not None:
+            return cls.async_client
+
+        cls.async_client = AsyncOpenAIClient(**cls._client_kwargs())
+        return cls.async_client
+
     @classmethod
     def _normalize_conversation(cls, conversation: list[dict]) -> list[dict]:
+        if isinstance(conversation, TranscriptMessages):
+            # Already a single leading system message followed by the history.
+            return conversation
+
         system_parts: list[str] = []
         payload: list[dict] = []
 
@@ -372,9 +412,31 @@ class OpenAICompatible(BaseLLM):
             cls.reasoning_effort_context.reset(token)
 
     @classmethod
-    def query(
+    def _prompt_cache_key(
+        cls, resolved_model: str, messages: list[dict], tools: list[dict[str, Any]]
+    ) -> str | None:
+        """
+        Cache routing key shared by every request with the same model, role and prompt.
+
+        The role is the agent's tool set (pull vs send_message); the hash covers the system
+        prompt and tool schemas, which are byte-identical across games of a run.
+        """
+        enabled = _read_int_env(
+            f"{_provider_env_prefix(cls.provider_name)}_PROMPT_CACHE_KEY", 1, min_value=0
+        )
+        if not cls.prompt_cache_key_supported or not enabled:
+            return None
+        system_prompt = messages[0]["content"] if messages and messages[0]["role"] == "system" else ""
+        role = "+".join(tool.get("function", {}).get("name", "") for tool in tools) or "none"
+        digest = hashlib.sha256(
+            f"{system_prompt}\n{json.dumps(tools, sort_keys=True)}".encode("utf-8")
+        ).hexdigest()
+        return f"{resolved_model}:{role}:{digest[:16]}"
+
+    @classmethod
+    def _build_request(
         cls, conversation: list[dict], model: str, tools: list[dict[str, Any]]
-    ) -> dict[str, Any]:
+    ) -> tuple[dict[str, Any], str, str]:
         messages = cls._normalize_conversation(conversation)
         resolved_model = cls.get_model_id(model)
         reasoning_effort = (
@@ -395,45 +457,75 @@ class OpenAICompatible(BaseLLM):
             reasoning_effort_key not in cls.unsupported_reasoning_effort_models
         ):
             kwargs["reasoning_effort"] = reasoning_effort
+        prompt_cache_key = cls._prompt_cache_key(resolved_model, messages, tools)
+        if prompt_cache_key is not None:
+            kwargs["prompt_cache_key"] = prompt_cache_key
+        return kwargs, resolved_model, reasoning_effort_key
 
-        while True:
-            try:
-                response = call_with_retry(
-                    lambda: cls.get_client().chat.completions.create(**kwargs),
-                    provider_name=cls.provider_name,
-                    model=resolved_model,
-                )
-                break
-            except Exception as exc:
-                error_text = str(exc).lower()
-                current_param = (
-                    "max_completion_tokens"
-                    if "max_completion_tokens" in kwargs
-                    else "max_tokens"
-                )
-                alt_param = (
-                    "max_completion_tokens"
-                    if current_param == "max_tokens"
-                    else "max_tokens"
-                )
-                retried = False
-
-                # Some OpenAI-compatible endpoints reject reasoning_effort.
-                if "reasoning_effort" in kwargs and "reasoning_effort" in error_text:
-                    kwargs.pop("reasoning_effort", None)
-                    cls.unsupported_reasoning_effort_models.add(reasoning_effort_key)
-                    retried = True
-
-                # Providers differ on token limit parameter name.
-                if current_param in error_text or alt_param in error_text:
-                    kwargs.pop(current_param, None)
-                    kwargs[alt_param] = MAX_TOKENS
-                    cls.resolved_token_limit_param = alt_param
-                    retried = True
-
-                if not retried:
-                    raise
+    @classmethod
+    def _adapt_request_to_error(
+        cls, kwargs: dict[str, Any], exc: Exception, reasoning_effort_key: str
+    ) -> bool:
+        """Rewrite kwargs after a parameter rejection. Returns True if worth resending."""
+        error_text = str(exc).lower()
+        current_param = (
+            "max_completion_tokens"
+            if "max_completion_tokens" in kwargs
+            else "max_tokens"
+        )
+        alt_param = (
+            "max_completion_tokens"
+            if current_param == "max_tokens"
+            else "max_tokens"
+        )
+        retried = False
+
+        # Some OpenAI-compatible endpoints reject reasoning_effort.
+        if "reasoning_effort" in kwargs and "reasoning_effort" in error_text:
+            kwargs.pop("reasoning_effort", None)
+            cls.unsupported_reasoning_effort_models.add(reasoning_effort_key)
+            retried = True
+
+        if "prompt_cache_key" in kwargs and "prompt_cache_key" in error_text:
+            kwargs.pop("prompt_cache_key", None)
+            cls.prompt_cache_key_supported = False
+            retried = True
+
+        # Providers differ on token limit parameter name.
+        if current_param in error_text or alt_param in error_text:
+            kwargs.pop(current_param, None)
+            kwargs[alt_param] = MAX_TOKENS
+            cls.resolved_token_limit_param = alt_param
+            retried = True
+
+        return retried
+
+    @classmethod
+    def _estimated_request_tokens(cls, kwargs: dict[str, Any], tools: list[dict[str, Any]]) -> int:
+        # total_tokens (prompt + completion) is what the reservation is reconciled against,
+        # so reserve the completion budget too; the unused part is refunded afterwards.
+        completion_budget = kwargs.get("max_completion_tokens", kwargs.get("max_tokens", MAX_TOKENS))
+        return estimate_conversation_tokens(kwargs["messages"], tools) + completion_budget
+
+    @classmethod
+    def _rate_limited_tokens(cls, response: Any) -> int | None:
+        total_tokens = getattr(getattr(response, "usage", None), "total_tokens", None)
+        return total_tokens if isinstance(total_tokens, int) else None
+
+    @classmethod
+    def _create(cls, kwargs: dict[str, Any]) -> tuple[Any, Any]:
+        raw_response = cls.get_client().chat.completions.with_raw_response.create(**kwargs)
+        return raw_response.parse(), raw_response.headers
 
+    @classmethod
+    async def _create_async(cls, kwargs: dict[str, Any]) -> tuple[Any, Any]:
+        raw_response = await cls.get_async_client().chat.completions.with_raw_response.create(
+            **kwargs
+        )
+        return raw_response.parse(), raw_response.headers
+
+    @classmethod
+    def _build_result(cls, response: Any, tools: list[dict[str, Any]]) -> dict[str, Any]:
         message = response.choices[0].message
         tool_call = cls._parse_tool_call(message)
         if tool_call is None:
@@ -484,3 +576,107 @@ class OpenAICompatible(BaseLLM):
             "cache_discount_available": cache_discount_available,
             "cache_discount_note": cache_discount_note,
         }
+
+    @classmethod
+    def query(
+        cls, conversation: list[dict], model: str, tools: list[dict[str, Any]]
+    ) -> dict[str, Any]:
+        kwargs, resolved_model, reasoning_effort_key = cls._build_request(conversation, model, tools)
+        estimated_tokens = cls._estimated_request_tokens(kwargs, tools)
+
+        while True:
+            try:
+                response, _ = call_with_retry(
+                    lambda: cls._create(kwargs),
+                    provider_name=cls.provider_name,
+                    model=resolved_model,
+                    estimated_tokens=estimated_tokens,
+                    usage_tokens=lambda result: cls._rate_limited_tokens(result[0]),
+                    response_headers=lambda result: result[1],
+                )
+                break
+            except Exception as exc:
+                if not cls._adapt_request_to_error(kwargs, exc, reasoning_effort_key):
+                    raise
+
+        return cls._build_result(response, tools)
+
+    @classmethod
+    def _batch_outcome(cls, record: dict[str, Any]) -> Any:
+        response = record.get("response") or {}
+        if response.get("status_code") == 200 and response.get("body"):
+            return ChatCompletion.model_validate(response["body"])
+        detail = record.get("error") or response.get("body") or "no response"
+        return BatchRequestError(f"{cls.provider_name} batch request {record.get('custom_id')} failed: {detail}")
+
+    @classmethod
+    async def _run_batch(cls, requests: list[dict[str, Any]], poll_seconds: float) -> list[Any]:
+        """Run chat completion kwargs as one Batch job; a ChatCompletion or exception per request."""
+        client = cls.get_async_client()
+        lines = [
+            json.dumps(
+                {"custom_id": batch_custom_id(idx), "method": "POST", "url": _BATCH_ENDPOINT, "body": kwargs},
+                ensure_ascii=False,
+            )
+            for idx, kwargs in enumerate(requests)
+        ]
+        input_file = await client.files.create(
+            file=("batch.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch",
+        )
+        job = await client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=_BATCH_ENDPOINT,
+            completion_window="24h",
+        )
+        while job.status not in _BATCH_TERMINAL_STATUSES:
+            await asyncio.sleep(poll_seconds)
+            job = await client.batches.retrieve(job.id)
+
+        outcomes: dict[str, Any] = {}
+        for file_id in (job.output_file_id, job.error_file_id):
+            if not file_id:
+                continue
+            content = await client.files.content(file_id)
+            for line in content.text.splitlines():
+                if line.strip():
+                    record = json.loads(line)
+                    outcomes[record.get("custom_id")] = cls._batch_outcome(record)
+
+        return [
+            outcomes.get(
+                batch_custom_id(idx),
+                BatchRequestError(
+                    f"{cls.provider_name} batch {job.id} ended {job.status} "
+                    f"without a result for {batch_custom_id(idx)}"
+                ),
+            )
+            for idx in range(len(requests))
+        ]
+
+    @classmethod
+    async def query_async(
+        cls, conversation: list[dict], model: str, tools: list[dict[str, Any]]
+    ) -> dict[str, Any]:
+        kwargs, resolved_model, reasoning_effort_key = cls._build_request(conversation, model, tools)
+        batch = active_batch()
+        if batch is not None and cls.batch_api_supported:
+            return cls._build_result(await batch.submit(cls, kwargs), tools)
+        estimated_tokens = cls._estimated_request_tokens(kwargs, tools)
+
+        while True:
+            try:
+                response, _ = await call_with_retry_async(
+                    lambda: cls._create_async(kwargs),
+                    provider_name=cls.provider_name,
+                    model=resolved_model,
+                    estimated_tokens=estimated_tokens,
+                    usage_tokens=lambda result: cls._rate_limited_tokens(result[0]),
+                    response_headers=lambda result: result[1],
+                )
+                break
+            except Exception as exc:
+                if not cls._adapt_request_to_error(kwargs, exc, reasoning_effort_key):
+                    raise
+
+        return cls._build_result(response, tools)
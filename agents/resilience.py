@@ -1,14 +1,17 @@
+import asyncio
+import json
 import os
 import random
 import re
 import threading
 import time
-from contextlib import contextmanager
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
 from contextvars import ContextVar
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from email.utils import parsedate_to_datetime
-from typing import Any, Callable, Iterator, TypeVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator, TypeVar
 
 T = TypeVar("T")
 
@@ -27,6 +30,13 @@ _RETRYABLE_TEXT_MARKERS = (
     "connection error",
     "try again",
 )
+_CONGESTION_STATUS_CODES = {429, 503, 529}
+_CONGESTION_TEXT_MARKERS = (
+    "rate limit",
+    "too many requests",
+    "resource exhausted",
+    "overloaded",
+)
 
 _DEFAULT_MAX_IN_FLIGHT = 2
 _DEFAULT_MIN_INTERVAL_SECONDS = 0.0
@@ -34,9 +44,33 @@ _DEFAULT_MAX_RETRIES = 6
 _DEFAULT_BACKOFF_BASE_SECONDS = 1.0
 _DEFAULT_BACKOFF_MAX_SECONDS = 30.0
 _DEFAULT_BACKOFF_JITTER = 0.2
+_DEFAULT_REQUESTS_PER_MINUTE = 0.0
+_DEFAULT_TOKENS_PER_MINUTE = 0.0
+_CHARS_PER_TOKEN_ESTIMATE = 4
+_RATE_LIMIT_HEADERS = {
+    # bucket -> (limit header, remaining header) per provider family.
+    "requests": (
+        ("x-ratelimit-limit-requests", "x-ratelimit-remaining-requests"),
+        ("anthropic-ratelimit-requests-limit", "anthropic-ratelimit-requests-remaining"),
+    ),
+    "tokens": (
+        ("x-ratelimit-limit-tokens", "x-ratelimit-remaining-tokens"),
+        ("anthropic-ratelimit-tokens-limit", "anthropic-ratelimit-tokens-remaining"),
+    ),
+}
+_DEFAULT_ADAPTIVE_DECREASE_FACTOR = 0.5
+_DEFAULT_ADAPTIVE_LATENCY_RATIO = 2.0
+# Default ceiling of the adaptive window, as a multiple of the static *_MAX_IN_FLIGHT.
+_DEFAULT_ADAPTIVE_HEADROOM = 4
+_ADAPTIVE_LATENCY_SMOOTHING = 0.2
+_ADAPTIVE_MIN_COOLDOWN_SECONDS = 1.0
 
 _THROTTLES: dict[str, "_ProviderThrottle"] = {}
 _THROTTLES_LOCK = threading.Lock()
+_RATE_LIMITERS: dict[tuple[str, str], "_ModelRateLimiter"] = {}
+_RATE_LIMITERS_LOCK = threading.Lock()
+_CONTROLLERS: dict[str, "_ConcurrencyController | None"] = {}
+_CONTROLLERS_LOCK = threading.Lock()
 _RETRY_LOG_SINK: ContextVar[Callable[[str], None] | None] = ContextVar(
     "retry_log_sink",
     default=None,
@@ -87,11 +121,16 @@ def _extract_status_code(exc: Exception) -> int | None:
     return None
 
 
-def _extract_retry_after_seconds(exc: Exception) -> float | None:
+def _extract_headers(exc: Exception) -> Any:
     headers = getattr(exc, "headers", None)
     if headers is None:
         response = getattr(exc, "response", None)
         headers = getattr(response, "headers", None) if response is not None else None
+    return headers
+
+
+def _extract_retry_after_seconds(exc: Exception) -> float | None:
+    headers = _extract_headers(exc)
     if headers is None:
         return None
 
@@ -130,36 +169,119 @@ def is_retryable_exception(exc: Exception) -> bool:
     return any(marker in error_text for marker in _RETRYABLE_TEXT_MARKERS)
 
 
+def _is_congestion_signal(exc: Exception) -> bool:
+    if _extract_status_code(exc) in _CONGESTION_STATUS_CODES:
+        return True
+    error_text = str(exc).lower()
+    return any(marker in error_text for marker in _CONGESTION_TEXT_MARKERS)
+
+
+@dataclass(eq=False)
+class _SlotWaiter:
+    # Exactly one of future (coroutine caller) or event (thread caller) is set.
+    loop: asyncio.AbstractEventLoop | None = None
+    future: "asyncio.Future[None] | None" = None
+    event: threading.Event | None = None
+    granted: bool = False
+
+    def wake(self) -> None:
+        if self.event is not None:
+            self.event.set()
+            return
+        assert self.loop is not None and self.future is not None
+        future = self.future
+        self.loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+
+
 @dataclass
 class _ProviderThrottle:
+    """
+    In-flight cap plus minimum spacing between request starts for one provider.
+
+    State lives behind a plain lock so coroutines on any event loop and
+    blocking threads share the same slots. Coroutines wait on a future and
+    asyncio.sleep; threads wait on an Event and time.sleep.
+    """
+
     max_in_flight: int
     min_interval_seconds: float
-    semaphore: threading.BoundedSemaphore = field(init=False)
-    interval_lock: threading.Lock = field(default_factory=threading.Lock)
+    in_flight: int = 0
     next_allowed_time: float = 0.0
-
-    def __post_init__(self) -> None:
-        self.semaphore = threading.BoundedSemaphore(self.max_in_flight)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    waiters: deque[_SlotWaiter] = field(default_factory=deque)
+
+    def _try_acquire_locked(self) -> bool:
+        if self.in_flight < self.max_in_flight and not self.waiters:
+            self.in_flight += 1
+            return True
+        return False
+
+    def _grant_waiters_locked(self) -> None:
+        while self.waiters and self.in_flight < self.max_in_flight:
+            waiter = self.waiters.popleft()
+            waiter.granted = True
+            self.in_flight += 1
+            waiter.wake()
+
+    def _reserve_start_delay(self) -> float:
+        if self.min_interval_seconds <= 0:
+            return 0.0
+        with self.lock:
+            now = time.monotonic()
+            start_at = max(now, self.next_allowed_time)
+            self.next_allowed_time = start_at + self.min_interval_seconds
+            return start_at - now
 
     def acquire(self) -> None:
-        self.semaphore.acquire()
-        self._wait_for_turn()
+        with self.lock:
+            waiter = None
+            if not self._try_acquire_locked():
+                waiter = _SlotWaiter(event=threading.Event())
+                self.waiters.append(waiter)
+        if waiter is not None:
+            waiter.event.wait()
+
+        delay = self._reserve_start_delay()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            waiter = None
+            if not self._try_acquire_locked():
+                waiter = _SlotWaiter(loop=loop, future=loop.create_future())
+                self.waiters.append(waiter)
+        if waiter is not None:
+            try:
+                await waiter.future
+            except asyncio.CancelledError:
+                with self.lock:
+                    owns_slot = waiter.granted
+                    if not owns_slot:
+                        self.waiters.remove(waiter)
+                if owns_slot:
+                    self.release()
+                raise
 
-    def release(self) -> None:
-        self.semaphore.release()
+        delay = self._reserve_start_delay()
+        if delay > 0:
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                self.release()
+                raise
 
-    def _wait_for_turn(self) -> None:
-        if self.min_interval_seconds <= 0:
-            return
+    def release(self) -> None:
+        with self.lock:
+            self.in_flight -= 1
+            self._grant_waiters_locked()
 
-        while True:
-            with self.interval_lock:
-                now = time.monotonic()
-                if now >= self.next_allowed_time:
-                    self.next_allowed_time = now + self.min_interval_seconds
-                    return
-                sleep_for = self.next_allowed_time - now
-            time.sleep(sleep_for)
+    def resize(self, max_in_flight: int) -> None:
+        # Shrinking never preempts running requests; the excess drains as they release.
+        with self.lock:
+            self.max_in_flight = max_in_flight
+            self._grant_waiters_locked()
 
 
 def _get_provider_throttle(provider_name: str) -> _ProviderThrottle:
@@ -192,6 +314,298 @@ def _get_provider_throttle(provider_name: str) -> _ProviderThrottle:
         return throttle
 
 
+@dataclass
+class _ConcurrencyController:
+    """
+    AIMD window over one provider's in-flight limit.
+
+    Each success grows the window by 1/window (about +1 per window of
+    completions); a rate-limit or overload retry multiplies it by
+    decrease_factor, at most once per smoothed round trip. While smoothed
+    latency sits above latency_ratio times the best seen, growth pauses.
+    """
+
+    provider_name: str
+    throttle: _ProviderThrottle
+    min_window: int
+    max_window: int
+    decrease_factor: float
+    latency_ratio: float
+    window: float = field(init=False)
+    latency_ewma: float | None = None
+    latency_floor: float | None = None
+    last_decrease_at: float = 0.0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def __post_init__(self) -> None:
+        self.window = float(
+            max(self.min_window, min(self.max_window, self.throttle.max_in_flight))
+        )
+
+    def _latency_congested_locked(self) -> bool:
+        if self.latency_ratio <= 0 or self.latency_ewma is None or self.latency_floor is None:
+            return False
+        return self.latency_ewma > self.latency_floor * self.latency_ratio
+
+    def _apply_locked(self) -> tuple[int, int] | None:
+        limit = max(self.min_window, min(self.max_window, int(self.window)))
+        previous = self.throttle.max_in_flight
+        if limit == previous:
+            return None
+        self.throttle.resize(limit)
+        return previous, limit
+
+    def on_success(self, latency_seconds: float) -> None:
+        with self.lock:
+            if self.latency_ewma is None:
+                self.latency_ewma = latency_seconds
+            else:
+                self.latency_ewma += _ADAPTIVE_LATENCY_SMOOTHING * (
+                    latency_seconds - self.latency_ewma
+                )
+            if self.latency_floor is None or self.latency_ewma < self.latency_floor:
+                self.latency_floor = self.latency_ewma
+            if self._latency_congested_locked():
+                return
+            self.window = min(float(self.max_window), self.window + 1.0 / self.window)
+            self._apply_locked()
+
+    def on_congestion(self, exc: Exception) -> None:
+        with self.lock:
+            now = time.monotonic()
+            cooldown = max(_ADAPTIVE_MIN_COOLDOWN_SECONDS, self.latency_ewma or 0.0)
+            if now - self.last_decrease_at < cooldown:
+                return
+            self.last_decrease_at = now
+            self.window = max(float(self.min_window), self.window * self.decrease_factor)
+            change = self._apply_locked()
+        if change is not None:
+            previous, limit = change
+            _emit_retry_log(
+                f"[aimd][{self.provider_name}] in-flight window {previous} -> {limit} "
+                f"after {type(exc).__name__}"
+            )
+
+    def describe(self) -> str:
+        return f"{self.provider_name}={self.throttle.max_in_flight}/{self.max_window}"
+
+
+def _get_concurrency_controller(provider_name: str) -> _ConcurrencyController | None:
+    provider_key = provider_name.lower()
+    with _CONTROLLERS_LOCK:
+        if provider_key in _CONTROLLERS:
+            return _CONTROLLERS[provider_key]
+
+        prefix = _provider_env_prefix(provider_name)
+        enabled = _read_int_env(
+            f"{prefix}_ADAPTIVE_CONCURRENCY",
+            _read_int_env("LLM_ADAPTIVE_CONCURRENCY", 0, min_value=0),
+            min_value=0,
+        )
+        controller = None
+        if enabled:
+            throttle = _get_provider_throttle(provider_name)
+            min_window = _read_int_env(
+                f"{prefix}_ADAPTIVE_MIN_IN_FLIGHT",
+                _read_int_env("LLM_ADAPTIVE_MIN_IN_FLIGHT", 1, min_value=1),
+                min_value=1,
+            )
+            max_window = _read_int_env(
+                f"{prefix}_ADAPTIVE_MAX_IN_FLIGHT",
+                _read_int_env(
+                    "LLM_ADAPTIVE_MAX_IN_FLIGHT",
+                    throttle.max_in_flight * _DEFAULT_ADAPTIVE_HEADROOM,
+                    min_value=1,
+                ),
+                min_value=1,
+            )
+            decrease_factor = _read_float_env(
+                f"{prefix}_ADAPTIVE_DECREASE_FACTOR",
+                _read_float_env(
+                    "LLM_ADAPTIVE_DECREASE_FACTOR",
+                    _DEFAULT_ADAPTIVE_DECREASE_FACTOR,
+                    min_value=0.05,
+                ),
+                min_value=0.05,
+            )
+            latency_ratio = _read_float_env(
+                f"{prefix}_ADAPTIVE_LATENCY_RATIO",
+                _read_float_env(
+                    "LLM_ADAPTIVE_LATENCY_RATIO",
+                    _DEFAULT_ADAPTIVE_LATENCY_RATIO,
+                    min_value=0.0,
+                ),
+                min_value=0.0,
+            )
+            controller = _ConcurrencyController(
+                provider_name=provider_name,
+                throttle=throttle,
+                min_window=min(min_window, max_window),
+                max_window=max_window,
+                decrease_factor=min(1.0, decrease_factor),
+                latency_ratio=latency_ratio,
+            )
+        _CONTROLLERS[provider_key] = controller
+        return controller
+
+
+def describe_concurrency_windows() -> str:
+    """Current adaptive in-flight window per provider, e.g. 'OpenAI=12/64'."""
+    with _CONTROLLERS_LOCK:
+        controllers = [c for c in _CONTROLLERS.values() if c is not None]
+    return " ".join(controller.describe() for controller in controllers)
+
+
+@dataclass
+class _TokenBucket:
+    """Continuous-refill bucket sized to one minute of budget; may run into debt."""
+
+    per_minute: float
+    learned: bool = False
+    level: float = field(init=False)
+    updated_at: float = field(default_factory=time.monotonic)
+
+    def __post_init__(self) -> None:
+        self.level = self.per_minute
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self.updated_at)
+        self.level = min(self.per_minute, self.level + elapsed * self.per_minute / 60.0)
+        self.updated_at = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        """Debit amount and return how long the caller must wait before starting."""
+        self._refill(now)
+        self.level -= amount
+        if self.level >= 0:
+            return 0.0
+        return -self.level * 60.0 / self.per_minute
+
+    def credit(self, amount: float, now: float) -> None:
+        self._refill(now)
+        self.level = min(self.per_minute, self.level + amount)
+
+    def observe(self, limit: float | None, remaining: float, age_seconds: float, now: float) -> None:
+        """Clamp the local level to the provider's reported remaining budget."""
+        if limit is not None and self.learned and limit != self.per_minute:
+            self.per_minute = limit
+        self._refill(now)
+        # Headers describe the budget when the request was admitted; add back what has
+        # refilled since then so slow responses do not over-throttle.
+        remaining += age_seconds * self.per_minute / 60.0
+        self.level = min(self.level, remaining)
+
+
+@dataclass
+class _ModelRateLimiter:
+    """Requests-per-minute and tokens-per-minute buckets for one resolved model id."""
+
+    requests: _TokenBucket | None
+    tokens: _TokenBucket | None
+    learn_from_headers: bool = True
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def reserve(self, estimated_tokens: int) -> float:
+        with self.lock:
+            now = time.monotonic()
+            delay = 0.0
+            if self.requests is not None:
+                delay = max(delay, self.requests.reserve(1, now))
+            if self.tokens is not None and estimated_tokens > 0:
+                delay = max(delay, self.tokens.reserve(estimated_tokens, now))
+            return delay
+
+    def reconcile(self, estimated_tokens: int, actual_tokens: int) -> None:
+        if self.tokens is None:
+            return
+        with self.lock:
+            # Positive difference refunds an over-estimate; negative charges the shortfall.
+            self.tokens.credit(estimated_tokens - actual_tokens, time.monotonic())
+
+    def observe_headers(self, headers: Any, age_seconds: float) -> None:
+        if headers is None or not self.learn_from_headers:
+            return
+        with self.lock:
+            now = time.monotonic()
+            for bucket_name, header_pairs in _RATE_LIMIT_HEADERS.items():
+                limit, remaining = _read_rate_limit_headers(headers, header_pairs)
+                if remaining is None:
+                    continue
+                bucket = getattr(self, bucket_name)
+                if bucket is None:
+                    if not limit:
+                        continue
+                    bucket = _TokenBucket(limit, learned=True)
+                    setattr(self, bucket_name, bucket)
+                bucket.observe(limit, remaining, age_seconds, now)
+
+
+def _parse_header_number(value: Any) -> float | None:
+    if value is None:
+        return None
+    try:
+        return float(str(value).strip())
+    except ValueError:
+        return None
+
+
+def _read_rate_limit_headers(
+    headers: Any, header_pairs: tuple[tuple[str, str], ...]
+) -> tuple[float | None, float | None]:
+    for limit_name, remaining_name in header_pairs:
+        remaining = _parse_header_number(headers.get(remaining_name))
+        if remaining is not None:
+            return _parse_header_number(headers.get(limit_name)), max(0.0, remaining)
+    return None, None
+
+
+def _read_rate_limit_env(provider_name: str, model: str, suffix: str, default: float) -> float:
+    prefix = _provider_env_prefix(provider_name)
+    model_key = _provider_env_prefix(model)
+    return _read_float_env(
+        f"{prefix}_{model_key}_{suffix}",
+        _read_float_env(
+            f"{prefix}_{suffix}",
+            _read_float_env(f"LLM_{suffix}", default, min_value=0.0),
+            min_value=0.0,
+        ),
+        min_value=0.0,
+    )
+
+
+def _get_rate_limiter(provider_name: str, model: str) -> _ModelRateLimiter:
+    key = (provider_name.lower(), model)
+    with _RATE_LIMITERS_LOCK:
+        existing = _RATE_LIMITERS.get(key)
+        if existing is not None:
+            return existing
+
+        rpm = _read_rate_limit_env(provider_name, model, "RPM", _DEFAULT_REQUESTS_PER_MINUTE)
+        tpm = _read_rate_limit_env(provider_name, model, "TPM", _DEFAULT_TOKENS_PER_MINUTE)
+        prefix = _provider_env_prefix(provider_name)
+        learn_from_headers = _read_int_env(
+            f"{prefix}_RATE_LIMIT_HEADERS",
+            _read_int_env("LLM_RATE_LIMIT_HEADERS", 1, min_value=0),
+            min_value=0,
+        )
+        limiter = _ModelRateLimiter(
+            requests=_TokenBucket(rpm) if rpm > 0 else None,
+            tokens=_TokenBucket(tpm) if tpm > 0 else None,
+            learn_from_headers=bool(learn_from_headers),
+        )
+        _RATE_LIMITERS[key] = limiter
+        return limiter
+
+
+def estimate_tokens(payload: Any) -> int:
+    """Rough token count for a request payload (serialized characters / 4)."""
+    try:
+        text = json.dumps(payload, default=str, ensure_ascii=False)
+    except (TypeError, ValueError):
+        text = str(payload)
+    return max(1, len(text) // _CHARS_PER_TOKEN_ESTIMATE)
+
+
 @contextmanager
 def provider_request_slot(provider_name: str) -> Iterator[None]:
     throttle = _get_provider_throttle(provider_name)
@@ -219,12 +633,25 @@ def _emit_retry_log(message: str) -> None:
     sink(message)
 
 
-def call_with_retry(
-    fn: Callable[[], T],
-    *,
-    provider_name: str,
-    model: str,
-) -> T:
+@asynccontextmanager
+async def provider_request_slot_async(provider_name: str) -> AsyncIterator[None]:
+    throttle = _get_provider_throttle(provider_name)
+    await throttle.acquire_async()
+    try:
+        yield
+    finally:
+        throttle.release()
+
+
+@dataclass(frozen=True)
+class _RetrySettings:
+    max_retries: int
+    backoff_base: float
+    backoff_max: float
+    backoff_jitter: float
+
+
+def _read_retry_settings(provider_name: str) -> _RetrySettings:
     prefix = _provider_env_prefix(provider_name)
     max_retries = _read_int_env(
         f"{prefix}_MAX_RETRIES",
@@ -254,29 +681,152 @@ def call_with_retry(
         _read_float_env("LLM_BACKOFF_JITTER", _DEFAULT_BACKOFF_JITTER, min_value=0.0),
         min_value=0.0,
     )
+    return _RetrySettings(
+        max_retries=max_retries,
+        backoff_base=backoff_base,
+        backoff_max=backoff_max,
+        backoff_jitter=backoff_jitter,
+    )
+
+
+def _backoff_seconds(settings: _RetrySettings, attempt: int, exc: Exception) -> float:
+    backoff_delay = min(settings.backoff_max, settings.backoff_base * (2 ** attempt))
+    retry_after_delay = _extract_retry_after_seconds(exc) or 0.0
+    sleep_seconds = max(backoff_delay, retry_after_delay)
+    if settings.backoff_jitter > 0:
+        jitter_multiplier = random.uniform(
+            max(0.0, 1.0 - settings.backoff_jitter),
+            1.0 + settings.backoff_jitter,
+        )
+        sleep_seconds *= jitter_multiplier
+    return sleep_seconds
+
+
+def _should_retry(settings: _RetrySettings, attempt: int, exc: Exception) -> bool:
+    return attempt < settings.max_retries and is_retryable_exception(exc)
+
+
+def _emit_retry_attempt(
+    provider_name: str,
+    model: str,
+    attempt: int,
+    settings: _RetrySettings,
+    sleep_seconds: float,
+    exc: Exception,
+) -> None:
+    _emit_retry_log(
+        f"[retry][{provider_name}][{model}] attempt {attempt}/{settings.max_retries} "
+        f"in {sleep_seconds:.2f}s after {type(exc).__name__}: {exc}"
+    )
+
+
+def _reconcile_usage(
+    limiter: _ModelRateLimiter,
+    estimated_tokens: int,
+    response: Any,
+    usage_tokens: Callable[[Any], int | None] | None,
+) -> None:
+    if usage_tokens is None or estimated_tokens <= 0:
+        return
+    actual_tokens = usage_tokens(response)
+    if isinstance(actual_tokens, int):
+        limiter.reconcile(estimated_tokens, actual_tokens)
+
+
+def _refund_failed_attempt(limiter: _ModelRateLimiter, estimated_tokens: int) -> None:
+    if estimated_tokens > 0:
+        limiter.reconcile(estimated_tokens, 0)
+
+
+def call_with_retry(
+    fn: Callable[[], T],
+    *,
+    provider_name: str,
+    model: str,
+    estimated_tokens: int = 0,
+    usage_tokens: Callable[[T], int | None] | None = None,
+    response_headers: Callable[[T], Any] | None = None,
+) -> T:
+    settings = _read_retry_settings(provider_name)
+    limiter = _get_rate_limiter(provider_name, model)
+    controller = _get_concurrency_controller(provider_name)
 
     attempt = 0
     while True:
         try:
+            # Wait out this model's own budget before taking a provider-wide slot, so a
+            # model short on tokens does not hold up the provider's other models.
+            delay = limiter.reserve(estimated_tokens)
+            if delay > 0:
+                time.sleep(delay)
             with provider_request_slot(provider_name):
-                return fn()
+                started_at = time.monotonic()
+                response = fn()
         except Exception as exc:
-            if attempt >= max_retries or not is_retryable_exception(exc):
+            # A failed attempt reports no usage; hand its reservation back before the
+            # error's headers (if any) clamp the bucket to what the provider counted.
+            _refund_failed_attempt(limiter, estimated_tokens)
+            limiter.observe_headers(_extract_headers(exc), 0.0)
+            if controller is not None and _is_congestion_signal(exc):
+                controller.on_congestion(exc)
+            if not _should_retry(settings, attempt, exc):
                 raise
 
-            backoff_delay = min(backoff_max, backoff_base * (2 ** attempt))
-            retry_after_delay = _extract_retry_after_seconds(exc) or 0.0
-            sleep_seconds = max(backoff_delay, retry_after_delay)
-            if backoff_jitter > 0:
-                jitter_multiplier = random.uniform(
-                    max(0.0, 1.0 - backoff_jitter),
-                    1.0 + backoff_jitter,
-                )
-                sleep_seconds *= jitter_multiplier
-
+            sleep_seconds = _backoff_seconds(settings, attempt, exc)
             attempt += 1
-            _emit_retry_log(
-                f"[retry][{provider_name}][{model}] attempt {attempt}/{max_retries} "
-                f"in {sleep_seconds:.2f}s after {type(exc).__name__}: {exc}"
-            )
+            _emit_retry_attempt(provider_name, model, attempt, settings, sleep_seconds, exc)
             time.sleep(sleep_seconds)
+        else:
+            latency_seconds = time.monotonic() - started_at
+            if controller is not None:
+                controller.on_success(latency_seconds)
+            _reconcile_usage(limiter, estimated_tokens, response, usage_tokens)
+            if response_headers is not None:
+                limiter.observe_headers(response_headers(response), latency_seconds)
+            return response
+
+
+async def call_with_retry_async(
+    fn: Callable[[], Awaitable[T]],
+    *,
+    provider_name: str,
+    model: str,
+    estimated_tokens: int = 0,
+    usage_tokens: Callable[[T], int | None] | None = None,
+    response_headers: Callable[[T], Any] | None = None,
+) -> T:
+    settings = _read_retry_settings(provider_name)
+    limiter = _get_rate_limiter(provider_name, model)
+    controller = _get_concurrency_controller(provider_name)
+
+    attempt = 0
+    while True:
+        try:
+            delay = limiter.reserve(estimated_tokens)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            async with provider_request_slot_async(provider_name):
+                started_at = time.monotonic()
+                response = await fn()
+        except Exception as exc:
+            # A failed attempt reports no usage; hand its reservation back before the
+            # error's headers (if any) clamp the bucket to what the provider counted.
+            _refund_failed_attempt(limiter, estimated_tokens)
+            limiter.observe_headers(_extract_headers(exc), 0.0)
+            if controller is not None and _is_congestion_signal(exc):
+                controller.on_congestion(exc)
+            if not _should_retry(settings, attempt, exc):
+                raise
+
+            sleep_seconds = _backoff_seconds(settings, attempt, exc)
+            attempt += 1
+            _emit_retry_attempt(provider_name, model, attempt, settings, sleep_seconds, exc)
+            await asyncio.sleep(sleep_seconds)
+        else:
+            latency_seconds = time.monotonic() - started_at
+            if controller is not None:
+                controller.on_success(latency_seconds)
+            _reconcile_usage(limiter, estimated_tokens, response, usage_tokens)
+            if response_headers is not None:
+                limiter.observe_headers(response_headers(response), latency_seconds)
+            return response
@@ -0,0 +1,155 @@
+import json
+from collections import deque
+from typing import Any
+
+from agents.resilience import _CHARS_PER_TOKEN_ESTIMATE, estimate_tokens
+
+
+def history_turn_messages(turn: dict) -> list[dict]:
+    """Provider-native messages of one history_turn dict, in replay order."""
+    msgs = []
+    user_msg = turn.get("user")
+    if user_msg:
+        msgs.append(user_msg)
+
+    assistant_msg = turn.get("assistant")
+    if assistant_msg:
+        msgs.append(assistant_msg)
+
+    tool_result = turn.get("tool_result")
+    if tool_result:
+        # Anthropic: single dict. OpenAI: list of dicts.
+        if isinstance(tool_result, list):
+            msgs.extend(tool_result)
+        else:
+            msgs.append(tool_result)
+    return msgs
+
+
+def _serialized_chars(message: dict) -> int:
+    try:
+        return len(json.dumps(message, default=str, ensure_ascii=False))
+    except (TypeError, ValueError):
+        return len(str(message))
+
+
+class TranscriptMessages(list):
+    """
+    Conversation list owned by a Transcript: [system, *history, current user].
+
+    Only the first entry is a system message, so providers can use the list as is
+    instead of re-walking it. turns holds the same entries without the system message,
+    kept in step with the list, for providers that take the system prompt separately.
+    serialized_chars is the running JSON size of the entries.
+    """
+
+    serialized_chars: int = 0
+
+    def __init__(self):
+        super().__init__()
+        self.turns: list[dict] = []
+
+
+class Transcript:
+    """
+    One agent's conversation for one game, grown in place as turns complete.
+
+    The game state keeps its JSON-friendly history_turns list (it is what gets
+    checkpointed); sync() appends only the turns added since the last call, so a
+    request costs the new delta rather than a rebuild of the whole history.
+    """
+
+    def __init__(self):
+        self.messages = TranscriptMessages()
+        self._chars: list[int] = []
+        self._turn_sizes: deque[int] = deque()
+        self._turns_absorbed = 0
+        self._pending_user = False
+
+    def _append(self, message: dict) -> None:
+        chars = _serialized_chars(message)
+        if self.messages:
+            self.messages.turns.append(message)
+        self.messages.append(message)
+        self._chars.append(chars)
+        self.messages.serialized_chars += chars
+
+    def _pop(self) -> None:
+        self.messages.turns.pop()
+        self.messages.pop()
+        self.messages.serialized_chars -= self._chars.pop()
+
+    def _drop_pending_user(self) -> None:
+        if self._pending_user:
+            self._pop()
+            self._pending_user = False
+
+    def _set_system_prompt(self, prompt: str) -> None:
+        system_msg = {"role": "system", "content": prompt}
+        if not self.messages:
+            self._append(system_msg)
+        elif self.messages[0]["content"] != prompt:
+            chars = _serialized_chars(system_msg)
+            self.messages.serialized_chars += chars - self._chars[0]
+            self.messages[0] = system_msg
+            self._chars[0] = chars
+
+    def sync(self, history_turns: list[dict]) -> None:
+        if len(history_turns) < self._turns_absorbed:
+            # History was replaced (e.g. a different game state); rebuild from scratch.
+            del self.messages[1:]
+            self.messages.turns.clear()
+            del self._chars[1:]
+            self.messages.serialized_chars = sum(self._chars)
+            self._turn_sizes.clear()
+            self._turns_absorbed = 0
+            self._pending_user = False
+        if len(history_turns) == self._turns_absorbed:
+            return
+
+        self._drop_pending_user()
+        for turn in history_turns[self._turns_absorbed:]:
+            messages = history_turn_messages(turn)
+            for message in messages:
+                self._append(message)
+            self._turn_sizes.append(len(messages))
+        self._turns_absorbed = len(history_turns)
+
+    def _trim_to_window(self, history_window: int) -> None:
+        while len(self._turn_sizes) > history_window:
+            end = 1 + self._turn_sizes.popleft()
+            self.messages.serialized_chars -= sum(self._chars[1:end])
+            del self.messages[1:end]
+            del self.messages.turns[: end - 1]
+            del self._chars[1:end]
+
+    def request(
+        self,
+        system_prompt: str,
+        history_turns: list[dict],
+        user_text: str,
+        history_window: int = 0,
+    ) -> TranscriptMessages:
+        """
+        Bring the transcript up to date and return it ending in the new user message.
+
+        With history_window > 0 only the last history_window turns are kept.
+        """
+        self._set_system_prompt(system_prompt)
+        self.sync(history_turns)
+        self._drop_pending_user()
+        if history_window > 0:
+            self._trim_to_window(history_window)
+        self._append({"role": "user", "content": user_text})
+        self._pending_user = True
+        return self.messages
+
+
+def estimate_conversation_tokens(conversation: list[dict], *extra: Any) -> int:
+    """estimate_tokens over [conversation, *extra], reusing a transcript's running size."""
+    if isinstance(conversation, TranscriptMessages):
+        return max(
+            1,
+            conversation.serialized_chars // _CHARS_PER_TOKEN_ESTIMATE + estimate_tokens(list(extra)),
+        )
+    return estimate_tokens([conversation, *extra])
@@ -1,6 +1,4 @@
-import ast
 import math
-import re
 import sys
 from collections import Counter
 from dataclasses import dataclass
@@ -20,22 +18,11 @@ import pandas as pd
 from scipy.stats import kruskal, mannwhitneyu, ttest_1samp, wilcoxon
 from statsmodels.stats.multitest import multipletests
 
+from analysis.loader import load_runs, to_records
 from config import ARMS
 from util import expected_score
 
 
-SOLO_LOG_DIRS = [
-    REPO / "results" / "async_solo_50x30" / "openai-none" / "game_logs",
-    REPO / "results" / "async_solo_50x30_extra" / "openai-none" / "game_logs",
-    REPO / "results" / "async_solo_topup_20260331_014640" / "openai-none" / "game_logs",
-]
-MATCH_LOG_DIRS = sorted(
-    [
-        path
-        for path in (REPO / "results").glob("async_lattices_50x30_*/openai-none/match_logs")
-        if path.is_dir()
-    ]
-)
 OUT_DIR = REPO / "blogpost_assets"
 
 MODELS = ["gpt-4o-mini", "gpt-4.1", "gpt-5.1", "gpt-5.4"]
@@ -65,10 +52,6 @@ ARM_COLORS = {
     3: "#4C72B0",
 }
 
-PULL_RE = re.compile(r"Pull\s+(\d+):\s+arm\s+(\d+)\s+gave\s+(-?\d+(?:\.\d+)?)\s+points")
-USAGE_RE = re.compile(r"Usage \(([^)]+)\): (\{.*\})")
-ANSI_RE = re.compile(r"\x1b\[[0-9;]*m")
-
 ABANDONMENT_WINDOW = 3
 COMMITMENT_STREAK = 5
 STRICT_FULL30_ONLY = True
@@ -95,97 +78,8 @@ class RunRecord:
     bad_turns: int
 
 
-def _strip_ansi(text: str) -> str:
-    return ANSI_RE.sub("", text)
-
-
-def parse_log(path: Path, *, good_model: str, bad_model: str, source: str) -> RunRecord | None:
-    arms: list[int] = []
-    rewards: list[float] = []
-    text = path.read_text(encoding="utf-8", errors="ignore")
-    good_input_tokens = 0
-    good_output_tokens = 0
-    good_total_tokens = 0
-    good_turns = 0
-    bad_input_tokens = 0
-    bad_output_tokens = 0
-    bad_total_tokens = 0
-    bad_turns = 0
-    current_role: str | None = "good" if bad_model == "no_evil_model" else None
-
-    for raw_line in text.splitlines():
-        line = _strip_ansi(raw_line.strip())
-        if line.startswith("Good Model ("):
-            current_role = "good"
-        elif line.startswith("Bad Model ("):
-            current_role = "bad"
-        elif line.startswith("Model ("):
-            current_role = "good"
-
-        usage_match = USAGE_RE.search(line)
-        if usage_match and current_role is not None:
-            usage = ast.literal_eval(usage_match.group(2))
-            input_tokens = int(usage.get("input_tokens") or 0)
-            output_tokens = int(usage.get("output_tokens") or 0)
-            total_tokens = int(usage.get("total_tokens") or 0)
-
-            if current_role == "good":
-                good_input_tokens += input_tokens
-                good_output_tokens += output_tokens
-                good_total_tokens += total_tokens
-                good_turns += 1
-            else:
-                bad_input_tokens += input_tokens
-                bad_output_tokens += output_tokens
-                bad_total_tokens += total_tokens
-                bad_turns += 1
-
-    for match in PULL_RE.finditer(text):
-        arms.append(int(match.group(2)))
-        rewards.append(float(match.group(3)))
-
-    if not arms:
-        return None
-
-    return RunRecord(
-        good_model=good_model,
-        bad_model=bad_model,
-        source=source,
-        run_id=f"{source}:{path.name}",
-        arms=tuple(arms),
-        rewards=tuple(rewards),
-        good_input_tokens=good_input_tokens,
-        good_output_tokens=good_output_tokens,
-        good_total_tokens=good_total_tokens,
-        good_turns=good_turns,
-        bad_input_tokens=bad_input_tokens,
-        bad_output_tokens=bad_output_tokens,
-        bad_total_tokens=bad_total_tokens,
-        bad_turns=bad_turns,
-    )
-
-
 def iter_runs() -> list[RunRecord]:
-    runs: list[RunRecord] = []
-
-    for log_dir in SOLO_LOG_DIRS:
-        source = log_dir.parent.parent.name
-        for path in sorted(log_dir.glob("*.log")):
-            model = path.stem.rsplit("_r", 1)[0]
-            parsed = parse_log(path, good_model=model, bad_model="no_evil_model", source=source)
-            if parsed is not None:
-                runs.append(parsed)
-
-    for log_dir in MATCH_LOG_DIRS:
-        source = log_dir.parent.parent.name
-        for path in sorted(log_dir.glob("*.log")):
-            good_model, bad_with_repeat = path.stem.split("_vs_", 1)
-            bad_model = bad_with_repeat.rsplit("_r", 1)[0]
-            parsed = parse_log(path, good_model=good_model, bad_model=bad_model, source=source)
-            if parsed is not None:
-                runs.append(parsed)
-
-    return runs
+    return to_records(load_runs(), RunRecord)
 
 
 def commitment_round(arms: tuple[int, ...]) -> tuple[int | None, int | None]:
@@ -15,7 +15,7 @@ Outputs (saved to results/analysis_1b_commitment/):
 """
 
 import os
-import re
+import sys
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
@@ -23,43 +23,17 @@ import matplotlib.pyplot as plt
 # ── paths ─────────────────────────────────────────────────────────────────────
 HERE = os.path.dirname(os.path.abspath(__file__))
 REPO = os.path.dirname(HERE)
-LATTICE_LOG_DIRS = sorted(
-    [
-        os.path.join(REPO, "results", d, "openai-none", "match_logs")
-        for d in os.listdir(os.path.join(REPO, "results"))
-        if d.startswith("async_lattices_50x30_")
-        and os.path.isdir(os.path.join(REPO, "results", d, "openai-none", "match_logs"))
-    ]
-)
-SOLO_LOG_DIRS = [
-    os.path.join(REPO, "results", "async_solo_50x30", "openai-none", "game_logs"),
-    os.path.join(REPO, "results", "async_solo_50x30_extra", "openai-none", "game_logs"),
-    os.path.join(REPO, "results", "async_solo_topup_20260331_014640", "openai-none", "game_logs"),
-]
+if REPO not in sys.path:
+    sys.path.insert(0, REPO)
+
+from analysis.loader import load_runs
+
 OUT_DIR = os.path.join(REPO, "results", "analysis_1b_commitment")
 os.makedirs(OUT_DIR, exist_ok=True)
 
-PULL_RE = re.compile(r"Pull\s+(\d+):\s+arm\s+(\d+)\s+gave\s+(-?\d+)\s+points")
-LATTICE_HEADER_RE = re.compile(r"Match:\s+(\S+)\s+\(good\)\s+vs\s+(\S+)\s+\(bad\)")
-SOLO_HEADER_RE = re.compile(r"^Model:\s+(\S+)")
-
 CONSECUTIVE_THRESHOLD = 5  # minimum streak length to qualify as "committed"
 
 
-def parse_arm_sequence(filepath: str) -> list[int]:
-    """Return the list of arms pulled, in order, from a log file."""
-    arms = []
-    with open(filepath, "r", errors="replace") as f:
-        for line in f:
-            line = line.strip()
-            # strip ANSI codes
-            line = re.sub(r"\x1b\[[0-9;]*m", "", line)
-            m = PULL_RE.search(line)
-            if m:
-                arms.append(int(m.group(2)))
-    return arms
-
-
 def commitment_round(arms: list[int]) -> tuple[int | None, int | None]:
     """
     Return (first_commitment_round, committed_arm).
@@ -79,29 +53,16 @@ def commitment_round(arms: list[int]) -> tuple[int | None, int | None]:
     return None, None
 
 
-def load_lattice_runs(log_dir: str) -> list[dict]:
+def _commitment_records(runs: pd.DataFrame) -> list[dict]:
     records = []
-    for fname in sorted(os.listdir(log_dir)):
-        if not fname.endswith(".log"):
-            continue
-        path = os.path.join(log_dir, fname)
-        good_model = bad_model = None
-        with open(path, "r", errors="replace") as f:
-            for line in f:
-                line = re.sub(r"\x1b\[[0-9;]*m", "", line.strip())
-                m = LATTICE_HEADER_RE.search(line)
-                if m:
-                    good_model, bad_model = m.group(1), m.group(2)
-                    break
-        if good_model is None:
-            continue
-        arms = parse_arm_sequence(path)
+    for run in runs.itertuples(index=False):
+        arms = [int(arm) for arm in run.arms]
         if len(arms) < 15:
             continue  # skip truncated runs
         cr, ca = commitment_round(arms)
         records.append({
-            "good_model": good_model,
-            "bad_model": bad_model,
+            "good_model": run.good_model,
+            "bad_model": run.bad_model,
             "commit_round": cr,
             "commit_arm": ca,
             "n_pulls": len(arms),
@@ -110,48 +71,21 @@ def load_lattice_runs(log_dir: str) -> list[dict]:
     return records
 
 
-def load_solo_runs(log_dir: str) -> list[dict]:
-    records = []
-    for fname in sorted(os.listdir(log_dir)):
-        if not fname.endswith(".log"):
-            continue
-        path = os.path.join(log_dir, fname)
-        model = None
-        with open(path, "r", errors="replace") as f:
-            for line in f:
-                line = re.sub(r"\x1b\[[0-9;]*m", "", line.strip())
-                m = SOLO_HEADER_RE.match(line)
-                if m:
-                    model = m.group(1)
-                    break
-        if model is None:
-            continue
-        arms = parse_arm_sequence(path)
-        if len(arms) < 15:
-            continue
-        cr, ca = commitment_round(arms)
-        records.append({
-            "good_model": model,
-            "bad_model": "no_evil_model",
-            "commit_round": cr,
-            "commit_arm": ca,
-            "n_pulls": len(arms),
-            "never_committed": cr is None,
-        })
-    return records
+def load_lattice_runs() -> list[dict]:
+    return _commitment_records(load_runs("match"))
+
+
+def load_solo_runs() -> list[dict]:
+    return _commitment_records(load_runs("solo"))
 
 
 # ── load all runs ─────────────────────────────────────────────────────────────
 print("Loading lattice logs…")
-lattice_records = []
-for lattice_log_dir in LATTICE_LOG_DIRS:
-    lattice_records.extend(load_lattice_runs(lattice_log_dir))
+lattice_records = load_lattice_runs()
 print(f"  {len(lattice_records)} valid lattice runs")
 
 print("Loading solo logs…")
-solo_records = []
-for solo_log_dir in SOLO_LOG_DIRS:
-    solo_records.extend(load_solo_runs(solo_log_dir))
+solo_records = load_solo_runs()
 print(f"  {len(solo_records)} valid solo runs")
 
 all_records = pd.DataFrame(lattice_records + solo_records)
@@ -0,0 +1,115 @@
+"""
+Shared run loader for the analysis scripts.
+
+Every script used to glob its own log directories and re-parse every log with its
+own regexes. This module reads the cached index built by analysis.log_index
+(results/index/runs.parquet), refreshing only the logs whose (mtime_ns, size)
+fingerprint changed, and hands out the same selections the scripts used before:
+
+  solo runs   - results/async_solo_50x30{,_extra}, async_solo_topup_20260331_014640
+  match runs  - results/async_lattices_50x30_*
+
+all restricted to the openai-none lattice. Within a process the index is loaded once.
+
+Usage:
+  from analysis.loader import load_runs, to_records
+  frame = load_runs()                       # solo + match, one row per game
+  runs = to_records(frame, RunRecord)       # any dataclass whose fields are index columns
+"""
+
+import sys
+from dataclasses import fields
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from analysis.log_index import INDEX_DIR, INDEX_FILENAME, RESULTS_DIR, build_index, load_index
+
+LATTICE = "openai-none"
+SOLO_SOURCES = (
+    "async_solo_50x30",
+    "async_solo_50x30_extra",
+    "async_solo_topup_20260331_014640",
+)
+MATCH_SOURCE_PREFIX = "async_lattices_50x30_"
+SEQUENCE_COLUMNS = ("rounds", "arms", "rewards")
+
+_INDEX_CACHE: dict[tuple[Path, Path], pd.DataFrame] = {}
+
+
+def load_index_frame(
+    results_dir: Path = RESULTS_DIR,
+    index_dir: Path = INDEX_DIR,
+    *,
+    refresh: bool = True,
+) -> pd.DataFrame:
+    """
+    The full log index, loaded once per process.
+
+    With refresh=True (the default) logs whose fingerprint changed since the last
+    build are re-parsed first; refresh=False trusts the on-disk index as is.
+    """
+    key = (results_dir, index_dir)
+    if key not in _INDEX_CACHE:
+        if refresh or not (index_dir / INDEX_FILENAME).exists():
+            _INDEX_CACHE[key] = build_index(results_dir, index_dir)
+        else:
+            _INDEX_CACHE[key] = load_index(index_dir)
+    return _INDEX_CACHE[key]
+
+
+def load_runs(
+    kind: str | None = None,
+    *,
+    solo_sources: tuple[str, ...] = SOLO_SOURCES,
+    match_source_prefix: str = MATCH_SOURCE_PREFIX,
+    lattice: str = LATTICE,
+) -> pd.DataFrame:
+    """
+    Solo and/or match games from the standard result trees, one row per game.
+
+    kind is "solo", "match" or None for both. Rows come back solo first, each group
+    ordered by log path, which is the order the per-directory parsers produced.
+    """
+    index = load_index_frame()
+    if index.empty:
+        return index
+
+    in_lattice = index["lattice"] == lattice
+    solo = in_lattice & (index["kind"] == "solo") & index["source"].isin(solo_sources)
+    match = in_lattice & (index["kind"] == "match") & index["source"].str.startswith(match_source_prefix)
+    if kind == "solo":
+        selected = solo
+    elif kind == "match":
+        selected = match
+    elif kind is None:
+        selected = solo | match
+    else:
+        raise ValueError(f"kind must be 'solo', 'match' or None, got {kind!r}")
+
+    frame = index[selected].copy()
+    frame["_solo_first"] = frame["kind"] != "solo"
+    return frame.sort_values(["_solo_first", "path"]).drop(columns="_solo_first").reset_index(drop=True)
+
+
+def to_records(frame: pd.DataFrame, record_cls: type) -> list:
+    """Build record_cls instances from the index columns named like its fields."""
+    names = [field.name for field in fields(record_cls)]
+    missing = [name for name in names if name not in frame.columns]
+    if missing:
+        raise KeyError(f"{record_cls.__name__} fields not in the run index: {missing}")
+
+    records = []
+    for row in frame[names].itertuples(index=False):
+        values = {}
+        for name, value in zip(names, row):
+            if name in SEQUENCE_COLUMNS:
+                values[name] = tuple(value.tolist() if hasattr(value, "tolist") else value)
+            else:
+                values[name] = value.item() if hasattr(value, "item") else value
+        records.append(record_cls(**values))
+    return records
@@ -1,5 +1,4 @@
 import csv
-import re
 import sys
 from collections import defaultdict
 from dataclasses import dataclass
@@ -9,32 +8,16 @@ import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 
-PULL_RE = re.compile(r"Pull (\d+): arm (\d+) gave ([0-9]+(?:\.[0-9]+)?) points")
-ANSI_RE = re.compile(r"\x1b\[[0-9;]*m")
-
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
+from analysis.loader import load_runs, to_records
 from config import ARMS
 from util import expected_score
 
 OUTPUT_DIR = ROOT / "results" / "analysis_quick"
 
-SOLO_LOG_DIRS = [
-    ROOT / "results" / "async_solo_50x30" / "openai-none" / "game_logs",
-    ROOT / "results" / "async_solo_50x30_extra" / "openai-none" / "game_logs",
-    ROOT / "results" / "async_solo_topup_20260331_014640" / "openai-none" / "game_logs",
-]
-
-MATCH_LOG_DIRS = sorted(
-    [
-        path
-        for path in (ROOT / "results").glob("async_lattices_50x30_*/openai-none/match_logs")
-        if path.is_dir()
-    ]
-)
-
 ABANDONMENT_WINDOW = 3
 FINAL_WINDOW = 10
 
@@ -50,10 +33,6 @@ class RunRecord:
     rewards: tuple[float, ...]
 
 
-def _strip_ansi(text: str) -> str:
-    return ANSI_RE.sub("", text)
-
-
 def _optimal_arm() -> int:
     return max(range(len(ARMS)), key=expected_score)
 
@@ -62,57 +41,12 @@ OPTIMAL_ARM = _optimal_arm()
 SAFE_ARM = min(range(len(ARMS)), key=expected_score)
 
 
-def parse_log(path: Path, good_model: str, bad_model: str, source: str) -> RunRecord | None:
-    rounds: list[int] = []
-    arms: list[int] = []
-    rewards: list[float] = []
-    with path.open(encoding="utf-8") as handle:
-        for raw_line in handle:
-            line = _strip_ansi(raw_line.strip())
-            match = PULL_RE.search(line)
-            if not match:
-                continue
-            rounds.append(int(match.group(1)))
-            arms.append(int(match.group(2)))
-            rewards.append(float(match.group(3)))
-
-    if not rounds:
-        return None
-
-    return RunRecord(
-        good_model=good_model,
-        bad_model=bad_model,
-        source=source,
-        run_id=f"{source}:{path.name}",
-        rounds=tuple(rounds),
-        arms=tuple(arms),
-        rewards=tuple(rewards),
-    )
-
-
 def iter_solo_runs() -> list[RunRecord]:
-    runs: list[RunRecord] = []
-    for log_dir in SOLO_LOG_DIRS:
-        for path in sorted(log_dir.glob("*.log")):
-            model = path.stem.rsplit("_r", 1)[0]
-            parsed = parse_log(path, good_model=model, bad_model="no_evil_model", source=log_dir.parent.parent.name)
-            if parsed is not None:
-                runs.append(parsed)
-    return runs
+    return to_records(load_runs("solo"), RunRecord)
 
 
 def iter_match_runs() -> list[RunRecord]:
-    runs: list[RunRecord] = []
-    for log_dir in MATCH_LOG_DIRS:
-        source = log_dir.parent.parent.name
-        for path in sorted(log_dir.glob("*.log")):
-            stem = path.stem
-            good_model, bad_with_repeat = stem.split("_vs_", 1)
-            bad_model = bad_with_repeat.rsplit("_r", 1)[0]
-            parsed = parse_log(path, good_model=good_model, bad_model=bad_model, source=source)
-            if parsed is not None:
-                runs.append(parsed)
-    return runs
+    return to_records(load_runs("match"), RunRecord)
 
 
 def build_run_frame(runs: list[RunRecord]) -> pd.DataFrame:
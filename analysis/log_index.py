@@ -0,0 +1,258 @@
+"""
+Results log indexer
+
+Walks every match_logs/*.log and game_logs/*.log under results/ (async_lattices_*,
+async_solo_*, reasoning-scaling, ...), parses each log once across a process pool,
+and writes one deduplicated table keyed by (source, lattice, good_model,
+bad_model, repeat_index).
+
+Re-runs are incremental: a manifest of (mtime_ns, size) per log decides which files
+are re-parsed, and rows for deleted logs are dropped.
+
+Outputs (saved to results/index/):
+  runs.parquet   - one row per game: pulls as list columns, per-role token totals
+  manifest.json  - fingerprint of every log seen, including logs without pull lines
+
+Usage:
+  python -m analysis.log_index            # incremental update
+  python -m analysis.log_index --full     # re-parse everything
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+RESULTS_DIR = ROOT / "results"
+INDEX_DIR = RESULTS_DIR / "index"
+INDEX_FILENAME = "runs.parquet"
+MANIFEST_FILENAME = "manifest.json"
+
+LOG_GLOBS = ("*/*/match_logs/*.log", "*/*/game_logs/*.log")
+INDEX_KEY = ["source", "lattice", "good_model", "bad_model", "repeat_index"]
+SOLO_BAD_MODEL = "no_evil_model"
+ROLES = ("good", "bad")
+USAGE_COLUMNS = (
+    "input_tokens",
+    "output_tokens",
+    "total_tokens",
+    "cache_read_input_tokens",
+    "cache_creation_input_tokens",
+)
+
+PULL_RE = re.compile(r"Pull\s+(\d+):\s+arm\s+(\d+)\s+gave\s+(-?\d+(?:\.\d+)?)\s+points")
+USAGE_RE = re.compile(r"Usage \(([^)]+)\): (\{.*\})")
+USAGE_FIELD_RE = re.compile(r"'(\w+)': (\d+)")
+ANSI_RE = re.compile(r"\x1b\[[0-9;]*m")
+MATCH_HEADER_RE = re.compile(r"^Match: (.+) \(good\) vs (.+) \(bad\)$")
+SOLO_HEADER_RE = re.compile(r"^Model: (.+)$")
+REPEAT_HEADER_RE = re.compile(r"^Repeat index: (\d+)$")
+REPEAT_SUFFIX_RE = re.compile(r"_r(\d+)$")
+
+
+def discover_logs(results_dir: Path = RESULTS_DIR) -> list[Path]:
+    paths: set[Path] = set()
+    for pattern in LOG_GLOBS:
+        paths.update(results_dir.glob(pattern))
+    return sorted(paths)
+
+
+def _fingerprint(path: Path) -> list[int]:
+    stat = path.stat()
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _identity_from_filename(path: Path) -> tuple[str, str, int | None]:
+    stem = path.stem
+    repeat_match = REPEAT_SUFFIX_RE.search(stem)
+    repeat_index = int(repeat_match.group(1)) if repeat_match else None
+    base = stem[: repeat_match.start()] if repeat_match else stem
+    if path.parent.name == "game_logs":
+        return base, SOLO_BAD_MODEL, repeat_index
+    good_model, _, bad_model = base.partition("_vs_")
+    return good_model, bad_model, repeat_index
+
+
+def parse_log_file(path_str: str, results_dir_str: str) -> dict[str, object] | None:
+    """Parse one game log into an index row; None if it has no pull lines."""
+    path = Path(path_str)
+    good_model, bad_model, repeat_index = _identity_from_filename(path)
+    solo = path.parent.name == "game_logs"
+
+    rounds: list[int] = []
+    arms: list[int] = []
+    rewards: list[float] = []
+    usage_totals = {
+        f"{role}_{column}": 0 for role in ROLES for column in (*USAGE_COLUMNS, "turns")
+    }
+    current_role: str | None = "good" if solo else None
+
+    with path.open(encoding="utf-8", errors="ignore") as handle:
+        for raw_line in handle:
+            line = ANSI_RE.sub("", raw_line.strip())
+            if line.startswith("Good Model (") or line.startswith("Model ("):
+                current_role = "good"
+            elif line.startswith("Bad Model ("):
+                current_role = "bad"
+            elif line.startswith("Match: "):
+                header = MATCH_HEADER_RE.match(line)
+                if header:
+                    good_model, bad_model = header.group(1), header.group(2)
+                continue
+            elif line.startswith("Repeat index: "):
+                header = REPEAT_HEADER_RE.match(line)
+                if header:
+                    repeat_index = int(header.group(1))
+                continue
+            elif solo and line.startswith("Model: "):
+                header = SOLO_HEADER_RE.match(line)
+                if header:
+                    good_model = header.group(1)
+                continue
+
+            pull_match = PULL_RE.search(line)
+            if pull_match:
+                rounds.append(int(pull_match.group(1)))
+                arms.append(int(pull_match.group(2)))
+                rewards.append(float(pull_match.group(3)))
+                continue
+
+            usage_match = USAGE_RE.search(line)
+            if usage_match and current_role is not None:
+                fields = dict(USAGE_FIELD_RE.findall(usage_match.group(2)))
+                for column in USAGE_COLUMNS:
+                    usage_totals[f"{current_role}_{column}"] += int(fields.get(column, 0))
+                usage_totals[f"{current_role}_turns"] += 1
+
+    if not arms:
+        return None
+
+    relative = path.relative_to(results_dir_str)
+    mtime_ns, size = _fingerprint(path)
+    return {
+        "source": relative.parts[0],
+        "lattice": relative.parts[1],
+        "kind": "solo" if solo else "match",
+        "good_model": good_model,
+        "bad_model": bad_model,
+        "repeat_index": repeat_index if repeat_index is not None else -1,
+        "run_id": f"{relative.parts[0]}:{relative.parts[1]}:{path.name}",
+        "rounds": rounds,
+        "arms": arms,
+        "rewards": rewards,
+        "n_pulls": len(arms),
+        "total_score": sum(rewards),
+        **usage_totals,
+        "path": str(relative),
+        "mtime_ns": mtime_ns,
+        "size": size,
+    }
+
+
+def _parse_many(paths: list[Path], results_dir: Path, workers: int | None) -> list[dict[str, object]]:
+    path_strs = [str(path) for path in paths]
+    if len(path_strs) < 64 or workers == 1:
+        parsed = [parse_log_file(path_str, str(results_dir)) for path_str in path_strs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parsed = list(
+                pool.map(
+                    parse_log_file,
+                    path_strs,
+                    [str(results_dir)] * len(path_strs),
+                    chunksize=64,
+                )
+            )
+    return [row for row in parsed if row is not None]
+
+
+def _read_manifest(index_dir: Path) -> dict[str, list[int]]:
+    manifest_path = index_dir / MANIFEST_FILENAME
+    if not manifest_path.exists():
+        return {}
+    with manifest_path.open(encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def _write_atomic_json(path: Path, payload: object) -> None:
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    with tmp_path.open("w", encoding="utf-8") as handle:
+        json.dump(payload, handle, indent=0, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def build_index(
+    results_dir: Path = RESULTS_DIR,
+    index_dir: Path = INDEX_DIR,
+    *,
+    workers: int | None = None,
+    full: bool = False,
+) -> pd.DataFrame:
+    """Bring index_dir/runs.parquet up to date with the logs under results_dir."""
+    index_dir.mkdir(parents=True, exist_ok=True)
+    index_path = index_dir / INDEX_FILENAME
+
+    logs = discover_logs(results_dir)
+    current = {str(path.relative_to(results_dir)): _fingerprint(path) for path in logs}
+    previous = {} if full else _read_manifest(index_dir)
+    existing = (
+        pd.read_parquet(index_path)
+        if index_path.exists() and previous
+        else pd.DataFrame(columns=["path"])
+    )
+
+    unchanged = {rel for rel, fingerprint in current.items() if previous.get(rel) == fingerprint}
+    stale = [results_dir / rel for rel in current if rel not in unchanged]
+
+    kept = existing[existing["path"].isin(unchanged)]
+    fresh = pd.DataFrame(_parse_many(stale, results_dir, workers))
+    frames = [frame for frame in (kept, fresh) if not frame.empty]
+    index = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=INDEX_KEY)
+
+    if not index.empty:
+        # A game logged more than once within one lattice directory keeps the newest file;
+        # copies in other trees (e.g. *_combined) are separate sources and stay separate rows.
+        index = (
+            index.sort_values(["mtime_ns", "path"])
+            .drop_duplicates(subset=INDEX_KEY, keep="last")
+            .sort_values([*INDEX_KEY, "path"])
+            .reset_index(drop=True)
+        )
+
+    tmp_path = index_path.with_name(f"{index_path.name}.tmp")
+    index.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, index_path)
+    _write_atomic_json(index_dir / MANIFEST_FILENAME, current)
+
+    print(
+        f"[log_index] {len(logs)} logs, {len(stale)} parsed, {len(unchanged)} unchanged, "
+        f"{len(index)} indexed games -> {index_path}"
+    )
+    return index
+
+
+def load_index(index_dir: Path = INDEX_DIR) -> pd.DataFrame:
+    return pd.read_parquet(index_dir / INDEX_FILENAME)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Index results/ game logs into a Parquet table.")
+    parser.add_argument("--results-dir", type=Path, default=RESULTS_DIR)
+    parser.add_argument("--index-dir", type=Path, default=INDEX_DIR)
+    parser.add_argument("--workers", type=int, default=None, help="Parser processes (default: CPU count).")
+    parser.add_argument("--full", action="store_true", help="Ignore the manifest and re-parse every log.")
+    args = parser.parse_args()
+    build_index(args.results_dir, args.index_dir, workers=args.workers, full=args.full)
+
+
+if __name__ == "__main__":
+    main()
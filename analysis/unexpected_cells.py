@@ -1,4 +1,3 @@
-import csv
 import sys
 from dataclasses import dataclass
 from pathlib import Path
@@ -10,20 +9,13 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-OUTPUT_DIR = ROOT / "results" / "analysis_quick"
+from analysis.loader import SOLO_SOURCES, load_runs
+from util import total_expected_score
 
-SOLO_SUMMARY_DIRS = [
-    ROOT / "results" / "async_solo_50x30" / "openai-none" / "games",
-    ROOT / "results" / "async_solo_50x30_extra" / "openai-none" / "games",
-]
+OUTPUT_DIR = ROOT / "results" / "analysis_quick"
 
-MATCH_SUMMARY_DIRS = sorted(
-    [
-        path
-        for path in (ROOT / "results").glob("async_lattices_50x30_*/openai-none/matches")
-        if path.is_dir()
-    ]
-)
+# The solo top-up batch never wrote summary CSVs, so it was never part of this table.
+SOLO_SUMMARY_SOURCES = tuple(source for source in SOLO_SOURCES if "topup" not in source)
 
 
 @dataclass(frozen=True)
@@ -36,53 +28,29 @@ class SummaryRun:
     n_rounds: int
 
 
-def _read_metric_csv(path: Path) -> dict[str, float]:
-    with path.open(newline="") as handle:
-        reader = csv.reader(handle)
-        next(reader)
-        return {row[0]: float(row[1]) for row in reader}
-
-
-def _parse_solo_runs() -> list[SummaryRun]:
+def _summary_runs(frame: pd.DataFrame) -> list[SummaryRun]:
     runs: list[SummaryRun] = []
-    for summary_dir in SOLO_SUMMARY_DIRS:
-        for path in sorted(summary_dir.glob("*.csv")):
-            metrics = _read_metric_csv(path)
-            good_model = path.stem.rsplit("_r", 1)[0]
-            arm_count = int(sum(value for key, value in metrics.items() if key.startswith("Arm ")))
-            runs.append(
-                SummaryRun(
-                    good_model=good_model,
-                    bad_model="no_evil_model",
-                    run_id=path.stem,
-                    total_score=metrics["Total score"],
-                    expected_score=metrics["Expected score"],
-                    n_rounds=arm_count,
-                )
+    for row in frame.itertuples(index=False):
+        pulls = list(zip(row.arms, row.rewards))
+        runs.append(
+            SummaryRun(
+                good_model=row.good_model,
+                bad_model=row.bad_model,
+                run_id=Path(row.path).stem,
+                total_score=row.total_score,
+                expected_score=total_expected_score(pulls),
+                n_rounds=row.n_pulls,
             )
+        )
     return runs
 
 
+def _parse_solo_runs() -> list[SummaryRun]:
+    return _summary_runs(load_runs("solo", solo_sources=SOLO_SUMMARY_SOURCES))
+
+
 def _parse_match_runs() -> list[SummaryRun]:
-    runs: list[SummaryRun] = []
-    for summary_dir in MATCH_SUMMARY_DIRS:
-        for path in sorted(summary_dir.glob("*.csv")):
-            metrics = _read_metric_csv(path)
-            stem = path.stem
-            good_model, bad_with_repeat = stem.split("_vs_", 1)
-            bad_model = bad_with_repeat.rsplit("_r", 1)[0]
-            arm_count = int(sum(value for key, value in metrics.items() if key.startswith("Arm ")))
-            runs.append(
-                SummaryRun(
-                    good_model=good_model,
-                    bad_model=bad_model,
-                    run_id=path.stem,
-                    total_score=metrics["Total score"],
-                    expected_score=metrics["Expected score"],
-                    n_rounds=arm_count,
-                )
-            )
-    return runs
+    return _summary_runs(load_runs("match"))
 
 
 def load_full30_frame() -> pd.DataFrame:
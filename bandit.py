@@ -1,9 +1,113 @@
-import random
+"""
+Bandit reward engine.
+
+Each arm in config.ARMS maps ascending spin thresholds to payouts: a uniform spin
+below the first threshold pays its reward, below the next pays the next, and a spin
+past the last threshold pays 0. The thresholds and payouts are precomputed once as
+(K, width) arrays, so rewards for any batch of arms are drawn with one NumPy call.
+
+Two ways to draw:
+  n_armed_bandit(choice)          live draw from a shared, lock-protected sampler that
+                                  refills per-arm buffers in batches
+  game_reward_tape(seed, r, n)    a seeded (K, n) tape, rewards[arm, t] paid if arm is
+                                  pulled on pull t, so games with the same seed and
+                                  repeat index (LLM matches, solo games, baselines) see
+                                  identical reward realisations
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import Iterator, Sequence
+
+import numpy as np
+
 from config import ARMS
 
+_BUFFER_SIZE = 1024
+
+
+def _arm_tables(arms: list[dict[float, float]]) -> tuple[np.ndarray, np.ndarray]:
+    """Padded thresholds (K, width) and payouts (K, width + 1); the extra column pays 0."""
+    width = max(len(arm) for arm in arms)
+    payout_type = np.result_type(*(reward for arm in arms for reward in arm.values()))
+    thresholds = np.full((len(arms), width), np.inf)
+    payouts = np.zeros((len(arms), width + 1), dtype=payout_type)
+    for idx, arm in enumerate(arms):
+        for position, threshold in enumerate(sorted(arm)):
+            thresholds[idx, position] = threshold
+            payouts[idx, position] = arm[threshold]
+    return thresholds, payouts
+
+
+NUM_ARMS = len(ARMS)
+THRESHOLDS, PAYOUTS = _arm_tables(ARMS)
+
+
+def rewards_for(choices: np.ndarray, spins: np.ndarray) -> np.ndarray:
+    """Payouts for arms `choices` given uniform `spins` of a broadcast-compatible shape."""
+    choices = np.asarray(choices)
+    outcome = (spins[..., None] >= THRESHOLDS[choices]).sum(axis=-1)
+    return PAYOUTS[choices, outcome]
+
+
+def sample_rewards(rng: np.random.Generator, choices: Sequence[int] | np.ndarray) -> np.ndarray:
+    """One independent reward per entry of choices."""
+    choices = np.asarray(choices)
+    return rewards_for(choices, rng.random(choices.shape))
+
+
+def reward_table(rng: np.random.Generator, num_pulls: int) -> np.ndarray:
+    """(K, num_pulls) rewards: rewards[arm, t] is paid if arm is pulled on pull t."""
+    return rewards_for(np.arange(NUM_ARMS)[:, None], rng.random((NUM_ARMS, num_pulls)))
+
+
+class BanditSampler:
+    """Thread-safe live draws, refilling each arm's buffer _BUFFER_SIZE rewards at a time."""
+
+    def __init__(self, seed: int | Sequence[int] | None = None):
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+        # Iterators over plain lists: far cheaper per draw than indexing an ndarray.
+        self._buffers: list[Iterator] = [iter(()) for _ in range(NUM_ARMS)]
+
+    def pull(self, choice: int):
+        with self._lock:
+            try:
+                return next(self._buffers[choice])
+            except StopIteration:
+                buffer = iter(sample_rewards(self._rng, np.full(_BUFFER_SIZE, choice)).tolist())
+                self._buffers[choice] = buffer
+                return next(buffer)
+
+
+_SAMPLER = BanditSampler()
+
+
 def n_armed_bandit(choice: int) -> float:
-    spin = random.random()
-    for option in sorted(ARMS[choice].keys()):
-        if spin < option:
-            return ARMS[choice][option]
-    return 0
\ No newline at end of file
+    return _SAMPLER.pull(choice)
+
+
+@dataclass(frozen=True)
+class RewardTape:
+    """Pre-drawn rewards for one game; rewards[arm, t] is paid if arm is pulled on pull t."""
+
+    rewards: np.ndarray
+
+    @property
+    def num_pulls(self) -> int:
+        return self.rewards.shape[1]
+
+    def reward(self, choice: int, pull_index: int) -> float:
+        return self.rewards[choice, pull_index].item()
+
+
+def game_reward_tape(reward_seed: int, repeat_index: int, num_pulls: int) -> RewardTape:
+    """The tape for repeat repeat_index of a run seeded with reward_seed (independent of the models)."""
+    return RewardTape(reward_table(np.random.default_rng([reward_seed, repeat_index]), num_pulls))
+
+
+def draw_reward(choice: int, pull_index: int, tape: RewardTape | None = None) -> float:
+    """Reward for pulling choice on pull pull_index: from tape if given, else a live draw."""
+    if tape is not None:
+        return tape.reward(choice, pull_index)
+    return n_armed_bandit(choice)
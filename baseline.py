@@ -1,6 +1,7 @@
 import argparse
 from agents.main import call_good_agent
-from bandit import n_armed_bandit
+from agents.transcript import Transcript
+from bandit import draw_reward, game_reward_tape
 from util import GREEN, RESET, get_summary
 from config import NUM_PULLS
 
@@ -9,6 +10,7 @@ if __name__ == "__main__":
     parser.add_argument("--num_pulls", type=int, default=NUM_PULLS, help="Number of pulls in the game")
     parser.add_argument("--model", type=str, default="llama3.2", help="Model ID to use for the agent")
     parser.add_argument("--debug", action="store_true", help="Enable debug mode")
+    parser.add_argument("--reward_seed", type=int, default=None, help="Draw rewards from the seeded reward tape for repeat 0")
     
     args = parser.parse_args()
     
@@ -18,6 +20,8 @@ if __name__ == "__main__":
     all_results: list[tuple[int, float]] = []
     bad_messages: list[str] = []
     good_history_turns: list[dict] = []
+    transcript = Transcript()
+    reward_tape = game_reward_tape(args.reward_seed, 0, num_pulls) if args.reward_seed is not None else None
     
     for i in range(num_pulls):
         print(f"{RESET}{'='*25} PULL {i+1} OF {num_pulls} {'='*25}")
@@ -28,7 +32,8 @@ if __name__ == "__main__":
             past_results=all_results,
             bad_messages=bad_messages,
             good_history_turns=good_history_turns,
-            num_pulls=num_pulls
+            num_pulls=num_pulls,
+            transcript=transcript,
         )
         
         if args.debug:
@@ -40,7 +45,7 @@ if __name__ == "__main__":
         
         if response['arm_pulled'] is not None:
             arm = int(response['arm_pulled'])
-            result = n_armed_bandit(arm)
+            result = draw_reward(arm, i, reward_tape)
             all_results.append((arm, result))
             bad_messages.append("The other agent chose not to say anything.")
             
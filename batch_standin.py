@@ -0,0 +1,357 @@
+"""
+Local stand-in for the OpenAI Batch and Anthropic Message Batches APIs.
+
+Serves just enough of both APIs for lattice_async.py / solo_async.py --batch-mode:
+
+  OpenAI     POST /v1/files, POST /v1/batches, GET /v1/batches/{id},
+             GET /v1/files/{id}/content
+  Anthropic  POST /v1/messages/batches, GET /v1/messages/batches/{id},
+             GET /v1/messages/batches/{id}/results
+
+Each batched request is answered immediately by a scripted agent: the good agent
+pulls a random arm, the bad agent recommends one. Jobs report in-progress for
+--polls-to-complete status checks before they end, and --fail-rate makes a share of
+requests come back as errors, so the retry path can be exercised too.
+
+Usage:
+  python batch_standin.py --port 8765
+  OPENAI_API_KEY=x CLAUDE_API_KEY=x OPENAI_BASE_URL=http://127.0.0.1:8765/v1 \\
+  ANTHROPIC_BASE_URL=http://127.0.0.1:8765 BATCH_POLL_SECONDS=0.2 \\
+  python lattice_async.py --batch-mode --lattice mixed-low --num-pulls 5
+"""
+
+import argparse
+import email.parser
+import email.policy
+import itertools
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from config import ARMS
+
+
+class StandinState:
+    def __init__(self, *, polls_to_complete: int = 1, fail_rate: float = 0.0, seed: int | None = None):
+        self.polls_to_complete = polls_to_complete
+        self.fail_rate = fail_rate
+        self.rng = random.Random(seed)
+        self.files: dict[str, bytes] = {}
+        self.batches: dict[str, dict] = {}
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+
+    def new_id(self, prefix: str) -> str:
+        return f"{prefix}_{next(self.ids):06d}"
+
+    def _agent_reply(self, tool_name: str) -> tuple[str, dict]:
+        arm = self.rng.randrange(len(ARMS))
+        if tool_name == "pull":
+            return f"Pulling arm {arm}.", {"choice": arm}
+        return "Recommending an arm.", {"message": f"You should pull arm {arm}."}
+
+    def _failed(self) -> bool:
+        return self.rng.random() < self.fail_rate
+
+    def openai_output_line(self, line: dict) -> tuple[bool, dict]:
+        body = line["body"]
+        if self._failed():
+            return False, {
+                "id": self.new_id("batch_req"),
+                "custom_id": line["custom_id"],
+                "response": {"status_code": 500, "request_id": "", "body": {"error": {"message": "stand-in failure"}}},
+                "error": None,
+            }
+        name = body["tools"][0]["function"]["name"]
+        text, arguments = self._agent_reply(name)
+        completion = {
+            "id": self.new_id("chatcmpl"),
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body["model"],
+            "choices": [
+                {
+                    "index": 0,
+                    "finish_reason": "tool_calls",
+                    "message": {
+                        "role": "assistant",
+                        "content": text,
+                        "tool_calls": [
+                            {
+                                "id": self.new_id("call"),
+                                "type": "function",
+                                "function": {"name": name, "arguments": json.dumps(arguments)},
+                            }
+                        ],
+                    },
+                }
+            ],
+            "usage": {"prompt_tokens": 100, "completion_tokens": 10, "total_tokens": 110},
+        }
+        return True, {
+            "id": self.new_id("batch_req"),
+            "custom_id": line["custom_id"],
+            "response": {"status_code": 200, "request_id": "", "body": completion},
+            "error": None,
+        }
+
+    def anthropic_result_line(self, request: dict) -> dict:
+        params = request["params"]
+        if self._failed():
+            result = {
+                "type": "errored",
+                "error": {"type": "error", "error": {"type": "api_error", "message": "stand-in failure"}},
+            }
+            return {"custom_id": request["custom_id"], "result": result}
+        name = params["tools"][0]["name"]
+        text, arguments = self._agent_reply(name)
+        message = {
+            "id": self.new_id("msg"),
+            "type": "message",
+            "role": "assistant",
+            "model": params["model"],
+            "content": [
+                {"type": "text", "text": text},
+                {"type": "tool_use", "id": self.new_id("toolu"), "name": name, "input": arguments},
+            ],
+            "stop_reason": "tool_use",
+            "stop_sequence": None,
+            "usage": {
+                "input_tokens": 100,
+                "output_tokens": 10,
+                "cache_creation_input_tokens": 0,
+                "cache_read_input_tokens": 0,
+            },
+        }
+        return {"custom_id": request["custom_id"], "result": {"type": "succeeded", "message": message}}
+
+
+def _timestamp() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+
+def _make_handler(state: StandinState) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):  # noqa: A002 - BaseHTTPRequestHandler signature
+            pass
+
+        def _send(self, status: int, payload: bytes, content_type: str = "application/json") -> None:
+            self.send_response(status)
+            self.send_header("content-type", content_type)
+            self.send_header("content-length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _send_json(self, payload: dict, status: int = 200) -> None:
+            self._send(status, json.dumps(payload).encode("utf-8"))
+
+        def _not_found(self) -> None:
+            self._send_json({"error": {"type": "not_found_error", "message": self.path}}, status=404)
+
+        def _body(self) -> bytes:
+            return self.rfile.read(int(self.headers.get("content-length") or 0))
+
+        def do_POST(self):
+            path = self.path.split("?")[0]
+            with state.lock:
+                if path == "/v1/files":
+                    self._create_file()
+                elif path == "/v1/batches":
+                    self._create_openai_batch()
+                elif path == "/v1/messages/batches":
+                    self._create_anthropic_batch()
+                else:
+                    self._not_found()
+
+        def do_GET(self):
+            parts = self.path.split("?")[0].strip("/").split("/")
+            with state.lock:
+                if parts[:2] == ["v1", "batches"] and len(parts) == 3:
+                    self._poll_openai_batch(parts[2])
+                elif parts[:2] == ["v1", "files"] and len(parts) == 4 and parts[3] == "content":
+                    content = state.files.get(parts[2])
+                    if content is None:
+                        self._not_found()
+                    else:
+                        self._send(200, content, "application/octet-stream")
+                elif parts[:3] == ["v1", "messages", "batches"] and len(parts) == 4:
+                    self._poll_anthropic_batch(parts[3])
+                elif parts[:3] == ["v1", "messages", "batches"] and len(parts) == 5 and parts[4] == "results":
+                    batch = state.batches.get(parts[3])
+                    if batch is None:
+                        self._not_found()
+                    else:
+                        self._send(200, batch["results"], "application/binary")
+                else:
+                    self._not_found()
+
+        def _create_file(self) -> None:
+            raw = self._body()
+            header = f"Content-Type: {self.headers['content-type']}\r\n\r\n".encode("utf-8")
+            message = email.parser.BytesParser(policy=email.policy.default).parsebytes(header + raw)
+            content, filename = b"", "upload.jsonl"
+            for part in message.iter_parts():
+                if part.get_param("name", header="content-disposition") == "file":
+                    content = part.get_payload(decode=True) or b""
+                    filename = part.get_filename() or filename
+            file_id = state.new_id("file")
+            state.files[file_id] = content
+            self._send_json(
+                {
+                    "id": file_id,
+                    "object": "file",
+                    "bytes": len(content),
+                    "created_at": int(time.time()),
+                    "filename": filename,
+                    "purpose": "batch",
+                    "status": "processed",
+                }
+            )
+
+        def _openai_batch_view(self, batch: dict) -> dict:
+            done = batch["polls"] >= state.polls_to_complete
+            return {
+                "id": batch["id"],
+                "object": "batch",
+                "endpoint": batch["endpoint"],
+                "completion_window": "24h",
+                "created_at": batch["created_at"],
+                "input_file_id": batch["input_file_id"],
+                "status": "completed" if done else "in_progress",
+                "output_file_id": batch["output_file_id"] if done else None,
+                "error_file_id": batch["error_file_id"] if done else None,
+                "request_counts": batch["request_counts"],
+            }
+
+        def _create_openai_batch(self) -> None:
+            request = json.loads(self._body())
+            content = state.files.get(request["input_file_id"])
+            if content is None:
+                self._not_found()
+                return
+            outputs, errors = [], []
+            for raw_line in content.decode("utf-8").splitlines():
+                if raw_line.strip():
+                    ok, record = state.openai_output_line(json.loads(raw_line))
+                    (outputs if ok else errors).append(json.dumps(record))
+            batch_id = state.new_id("batch")
+            output_file_id = state.new_id("file")
+            state.files[output_file_id] = "\n".join(outputs).encode("utf-8")
+            error_file_id = None
+            if errors:
+                error_file_id = state.new_id("file")
+                state.files[error_file_id] = "\n".join(errors).encode("utf-8")
+            batch = {
+                "id": batch_id,
+                "endpoint": request["endpoint"],
+                "created_at": int(time.time()),
+                "input_file_id": request["input_file_id"],
+                "output_file_id": output_file_id,
+                "error_file_id": error_file_id,
+                "request_counts": {
+                    "total": len(outputs) + len(errors),
+                    "completed": len(outputs),
+                    "failed": len(errors),
+                },
+                "polls": 0,
+            }
+            state.batches[batch_id] = batch
+            self._send_json(self._openai_batch_view(batch))
+
+        def _poll_openai_batch(self, batch_id: str) -> None:
+            batch = state.batches.get(batch_id)
+            if batch is None:
+                self._not_found()
+                return
+            batch["polls"] += 1
+            self._send_json(self._openai_batch_view(batch))
+
+        def _anthropic_batch_view(self, batch: dict) -> dict:
+            done = batch["polls"] >= state.polls_to_complete
+            host = self.headers.get("host", "127.0.0.1")
+            return {
+                "id": batch["id"],
+                "type": "message_batch",
+                "processing_status": "ended" if done else "in_progress",
+                "request_counts": batch["request_counts"],
+                "created_at": batch["created_at"],
+                "expires_at": batch["created_at"],
+                "ended_at": _timestamp() if done else None,
+                "cancel_initiated_at": None,
+                "archived_at": None,
+                "results_url": f"http://{host}/v1/messages/batches/{batch['id']}/results" if done else None,
+            }
+
+        def _create_anthropic_batch(self) -> None:
+            request = json.loads(self._body())
+            lines = [state.anthropic_result_line(item) for item in request["requests"]]
+            errored = sum(1 for line in lines if line["result"]["type"] != "succeeded")
+            batch_id = state.new_id("msgbatch")
+            batch = {
+                "id": batch_id,
+                "created_at": _timestamp(),
+                "results": "\n".join(json.dumps(line) for line in lines).encode("utf-8"),
+                "request_counts": {
+                    "processing": 0,
+                    "succeeded": len(lines) - errored,
+                    "errored": errored,
+                    "canceled": 0,
+                    "expired": 0,
+                },
+                "polls": 0,
+            }
+            state.batches[batch_id] = batch
+            self._send_json(self._anthropic_batch_view(batch))
+
+        def _poll_anthropic_batch(self, batch_id: str) -> None:
+            batch = state.batches.get(batch_id)
+            if batch is None:
+                self._not_found()
+                return
+            batch["polls"] += 1
+            self._send_json(self._anthropic_batch_view(batch))
+
+    return Handler
+
+
+def start_standin(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    **state_kwargs,
+) -> tuple[ThreadingHTTPServer, StandinState]:
+    """Serve the stand-in on a daemon thread; port 0 picks a free port."""
+    state = StandinState(**state_kwargs)
+    server = ThreadingHTTPServer((host, port), _make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local stand-in for the OpenAI and Anthropic batch APIs.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--polls-to-complete",
+        type=int,
+        default=1,
+        help="Status checks a job reports in progress before it ends.",
+    )
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Share of requests answered with an error.")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    state = StandinState(polls_to_complete=args.polls_to_complete, fail_rate=args.fail_rate, seed=args.seed)
+    server = ThreadingHTTPServer((args.host, args.port), _make_handler(state))
+    print(f"[batch_standin] serving on http://{args.host}:{server.server_address[1]}")
+    print(f"  OPENAI_BASE_URL=http://{args.host}:{server.server_address[1]}/v1")
+    print(f"  ANTHROPIC_BASE_URL=http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+"""
+Orchestrator throughput benchmark
+
+Runs lattice_async._run_lattice and solo_async._run_solo_lattice against the
+offline Mock provider (agents/mock.py) across a sweep of max_concurrent_games,
+with the same log tee, per-match logs, checkpoints and event log a real run writes.
+Each (runner, concurrency) point runs in a fresh subprocess so provider throttles
+and peak RSS start clean.
+
+Per point:
+  games_per_sec, turns_per_sec   wall-clock throughput (a turn is one agent call)
+  overhead_p50_ms, overhead_p99_ms
+                                 per-turn orchestration overhead: time between the end
+                                 of one mock call and the start of the game's next call
+                                 (response handling, history, checkpoint, logs, throttle)
+  memory_per_game_kb             peak RSS growth over a warmed-up process during the
+                                 run / concurrent games
+
+Results are written to benchmarks/results/<timestamp>.json and compared with
+benchmarks/baseline.json (created by the first run, replaced with
+--update-baseline). Throughput drops or overhead/memory growth beyond --tolerance
+are reported as regressions; --check exits non-zero on any.
+
+Usage:
+  python -m benchmarks.orchestrator
+  python -m benchmarks.orchestrator --runners lattice --concurrency 1 16 256 --check
+  python -m benchmarks.orchestrator --mock-latency 0 --update-baseline
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+BENCHMARK_DIR = ROOT / "benchmarks"
+BASELINE_PATH = BENCHMARK_DIR / "baseline.json"
+RESULTS_DIR = BENCHMARK_DIR / "results"
+
+RUNNERS = ("lattice", "solo")
+DEFAULT_CONCURRENCY = (1, 4, 16, 64, 256, 1024)
+# Higher is better for throughput; lower is better for overhead and memory.
+HIGHER_IS_BETTER = ("games_per_sec", "turns_per_sec")
+LOWER_IS_BETTER = ("overhead_p50_ms", "overhead_p99_ms", "memory_per_game_kb")
+_RSS_SAMPLE_SECONDS = 0.05
+
+
+def _percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def _current_rss_kb() -> int:
+    try:
+        with open("/proc/self/status", encoding="utf-8") as handle:
+            for line in handle:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    # No /proc: fall back to the peak so far (KiB on Linux, bytes on macOS).
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+async def _track_peak_rss(peak: list[int]) -> None:
+    while True:
+        peak[0] = max(peak[0], _current_rss_kb())
+        await asyncio.sleep(_RSS_SAMPLE_SECONDS)
+
+
+async def _run_point(runner: str, concurrency: int, games: int, num_pulls: int, output_root: Path) -> dict:
+    from agents.mock import Mock
+
+    if runner == "lattice":
+        import lattice_async as module
+
+        lattice = module.LATTICES["mock"]
+        games_per_repeat = len(lattice.models) ** 2
+        run = module._run_lattice
+    else:
+        import solo_async as module
+
+        lattice = module.LATTICES["mock"]
+        games_per_repeat = len(lattice.models)
+        run = module._run_solo_lattice
+    repeats = max(1, math.ceil(games / games_per_repeat))
+
+    calls: dict[int, list[tuple[float, float]]] = {}
+
+    def observe(started_at: float, finished_at: float) -> None:
+        task = asyncio.current_task()
+        calls.setdefault(id(task), []).append((started_at, finished_at))
+
+    # One tiny run first, so lazy imports and first-use caches are not billed to the games.
+    await run(
+        lattice,
+        num_pulls=1,
+        repeats=1,
+        max_concurrent_games=1,
+        output_root=output_root / "warmup",
+        debug=True,
+    )
+
+    Mock.call_observer = observe
+    rss_before = _current_rss_kb()
+    peak_rss = [rss_before]
+    tracker = asyncio.create_task(_track_peak_rss(peak_rss))
+    start = time.perf_counter()
+    with module._tee_terminal_output(output_root / "tee.log"):
+        await run(
+            lattice,
+            num_pulls=num_pulls,
+            repeats=repeats,
+            max_concurrent_games=concurrency,
+            output_root=output_root,
+            debug=True,
+        )
+    wall_seconds = time.perf_counter() - start
+    tracker.cancel()
+    Mock.call_observer = None
+
+    overheads = [
+        (next_start - previous_end) * 1000
+        for game_calls in calls.values()
+        for (_, previous_end), (next_start, _) in zip(game_calls, game_calls[1:])
+    ]
+    turns = sum(len(game_calls) for game_calls in calls.values())
+    total_games = repeats * games_per_repeat
+    in_flight = min(concurrency, total_games)
+    return {
+        "runner": runner,
+        "max_concurrent_games": concurrency,
+        "games": total_games,
+        "turns": turns,
+        "num_pulls": num_pulls,
+        "wall_seconds": round(wall_seconds, 3),
+        "games_per_sec": round(total_games / wall_seconds, 3),
+        "turns_per_sec": round(turns / wall_seconds, 3),
+        "overhead_p50_ms": round(_percentile(overheads, 0.50), 3),
+        "overhead_p99_ms": round(_percentile(overheads, 0.99), 3),
+        "memory_per_game_kb": round(max(0, peak_rss[0] - rss_before) / in_flight, 1),
+    }
+
+
+def _worker(args: argparse.Namespace) -> None:
+    # Never let the provider throttle, rather than the orchestrator, set the ceiling.
+    os.environ["MOCK_MAX_IN_FLIGHT"] = str(max(1, args.worker_concurrency))
+    os.environ["MOCK_ADAPTIVE_CONCURRENCY"] = "0"
+    os.environ["MOCK_LATENCY_SECONDS"] = str(args.mock_latency)
+    os.environ["MOCK_LATENCY_DISTRIBUTION"] = "constant"
+    os.chdir(ROOT)  # prompts/ is resolved relative to the working directory
+
+    with tempfile.TemporaryDirectory(prefix="orchestrator_bench_") as tmp:
+        result = asyncio.run(
+            _run_point(
+                args.worker_runner,
+                args.worker_concurrency,
+                max(args.min_games, args.games_per_slot * args.worker_concurrency),
+                args.num_pulls,
+                Path(tmp),
+            )
+        )
+    result["mock_latency_seconds"] = args.mock_latency
+    Path(args.worker_result).write_text(json.dumps(result), encoding="utf-8")
+
+
+def _run_worker(args: argparse.Namespace, runner: str, concurrency: int) -> dict:
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as handle:
+        result_path = Path(handle.name)
+    try:
+        subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.orchestrator",
+                "--worker-runner",
+                runner,
+                "--worker-concurrency",
+                str(concurrency),
+                "--worker-result",
+                str(result_path),
+                "--num-pulls",
+                str(args.num_pulls),
+                "--min-games",
+                str(args.min_games),
+                "--games-per-slot",
+                str(args.games_per_slot),
+                "--mock-latency",
+                str(args.mock_latency),
+            ],
+            cwd=ROOT,
+            stdout=subprocess.DEVNULL,
+            check=True,
+        )
+        return json.loads(result_path.read_text(encoding="utf-8"))
+    finally:
+        result_path.unlink(missing_ok=True)
+
+
+def _point_key(point: dict) -> str:
+    return f"{point['runner']}/c{point['max_concurrent_games']}"
+
+
+def compare_to_baseline(points: list[dict], baseline: dict, tolerance: float) -> list[str]:
+    """One line per metric that moved the wrong way by more than tolerance."""
+    baseline_points = {_point_key(point): point for point in baseline.get("points", [])}
+    regressions = []
+    for point in points:
+        reference = baseline_points.get(_point_key(point))
+        if reference is None:
+            continue
+        for metric in (*HIGHER_IS_BETTER, *LOWER_IS_BETTER):
+            old, new = reference.get(metric), point.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = change < -tolerance if metric in HIGHER_IS_BETTER else change > tolerance
+            if worse:
+                regressions.append(f"{_point_key(point)} {metric}: {old} -> {new} ({change:+.1%})")
+    return regressions
+
+
+def _format_point(point: dict) -> str:
+    return (
+        f"{point['runner']:>7} c={point['max_concurrent_games']:<5} games={point['games']:<6} "
+        f"{point['games_per_sec']:>9.2f} games/s {point['turns_per_sec']:>10.2f} turns/s "
+        f"overhead p50={point['overhead_p50_ms']:.2f}ms p99={point['overhead_p99_ms']:.2f}ms "
+        f"mem/game={point['memory_per_game_kb']:.1f}KiB"
+    )
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark lattice/solo orchestration throughput on the mock provider.")
+    parser.add_argument("--runners", nargs="+", choices=RUNNERS, default=list(RUNNERS))
+    parser.add_argument("--concurrency", nargs="+", type=int, default=list(DEFAULT_CONCURRENCY))
+    parser.add_argument("--num-pulls", type=int, default=10, help="Pulls per game.")
+    parser.add_argument("--min-games", type=int, default=32, help="Fewest games per point.")
+    parser.add_argument(
+        "--games-per-slot",
+        type=int,
+        default=2,
+        help="Games per concurrency slot, so every point runs a few full waves.",
+    )
+    parser.add_argument(
+        "--mock-latency",
+        type=float,
+        default=0.05,
+        help="Constant simulated response latency in seconds (0 measures pure orchestration cost).",
+    )
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Relative change counted as a regression.")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="Replace the baseline with this run.")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if any metric regressed.")
+    parser.add_argument("--worker-runner", choices=RUNNERS, help=argparse.SUPPRESS)
+    parser.add_argument("--worker-concurrency", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--worker-result", type=Path, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = _parse_args()
+    if args.worker_runner is not None:
+        _worker(args)
+        return
+
+    points = []
+    for runner in args.runners:
+        for concurrency in args.concurrency:
+            point = _run_worker(args, runner, concurrency)
+            points.append(point)
+            print(_format_point(point), flush=True)
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "machine": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+        },
+        "settings": {
+            "num_pulls": args.num_pulls,
+            "min_games": args.min_games,
+            "games_per_slot": args.games_per_slot,
+            "mock_latency_seconds": args.mock_latency,
+        },
+        "points": points,
+    }
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    results_path = RESULTS_DIR / f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    results_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"[benchmark] results -> {results_path}")
+
+    regressions: list[str] = []
+    if args.baseline.exists() and not args.update_baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        if baseline.get("settings") != report["settings"]:
+            print(f"[benchmark] baseline {args.baseline} used different settings; comparing anyway")
+        regressions = compare_to_baseline(points, baseline, args.tolerance)
+        if regressions:
+            print(f"[benchmark] {len(regressions)} regression(s) vs {args.baseline}:")
+            for line in regressions:
+                print(f"  {line}")
+        else:
+            print(f"[benchmark] no regressions vs {args.baseline} (tolerance {args.tolerance:.0%})")
+    else:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"[benchmark] baseline written -> {args.baseline}")
+
+    if args.check and regressions:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
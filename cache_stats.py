@@ -0,0 +1,101 @@
+from agents.anthropic import Anthropic
+
+CACHE_STATS_HEADER = [
+    "good_model",
+    "bad_model",
+    "repeat_index",
+    "role",
+    "model",
+    "prompt_tokens",
+    "cache_read_input_tokens",
+    "cache_creation_input_tokens",
+    "uncached_input_tokens",
+    "cache_hit_ratio",
+]
+
+_BREAKDOWN_KEYS = (
+    "prompt_tokens",
+    "cache_read_input_tokens",
+    "cache_creation_input_tokens",
+    "uncached_input_tokens",
+)
+
+
+def prompt_cache_breakdown(model: str, usage: dict[str, int]) -> dict[str, int]:
+    """
+    Split one role's summed usage into prompt tokens read from cache, written to it, and neither.
+
+    Anthropic reports input_tokens after cache reads and writes; OpenAI-compatible providers
+    report the full prompt in input_tokens with the cached part inside it.
+    """
+    input_tokens = int(usage.get("input_tokens") or 0)
+    cache_read = int(usage.get("cache_read_input_tokens") or 0)
+    cache_write = int(usage.get("cache_creation_input_tokens") or 0)
+    if Anthropic.contains_model(model):
+        prompt_tokens = input_tokens + cache_read + cache_write
+    else:
+        prompt_tokens = input_tokens
+    return {
+        "prompt_tokens": prompt_tokens,
+        "cache_read_input_tokens": cache_read,
+        "cache_creation_input_tokens": cache_write,
+        "uncached_input_tokens": max(0, prompt_tokens - cache_read),
+    }
+
+
+def cache_hit_ratio(breakdown: dict[str, int]) -> float:
+    prompt_tokens = breakdown["prompt_tokens"]
+    return round(breakdown["cache_read_input_tokens"] / prompt_tokens, 4) if prompt_tokens else 0.0
+
+
+def cache_stats_row(
+    good_model: str,
+    bad_model: str,
+    repeat_index: int,
+    role: str,
+    model: str,
+    usage: dict[str, int],
+) -> list[object]:
+    breakdown = prompt_cache_breakdown(model, usage)
+    return [
+        good_model,
+        bad_model,
+        repeat_index,
+        role,
+        model,
+        *(breakdown[key] for key in _BREAKDOWN_KEYS),
+        cache_hit_ratio(breakdown),
+    ]
+
+
+def summarize_cache_rows(rows: list[list[object]]) -> list[str]:
+    """One line per model: share of its prompt tokens served from cache across the rows."""
+    totals: dict[str, dict[str, int]] = {}
+    model_col = CACHE_STATS_HEADER.index("model")
+    first_key_col = CACHE_STATS_HEADER.index(_BREAKDOWN_KEYS[0])
+    for row in rows:
+        model_totals = totals.setdefault(str(row[model_col]), dict.fromkeys(_BREAKDOWN_KEYS, 0))
+        for offset, key in enumerate(_BREAKDOWN_KEYS):
+            model_totals[key] += int(row[first_key_col + offset])
+
+    lines = []
+    for model, model_totals in sorted(totals.items()):
+        lines.append(
+            f"{model}: {cache_hit_ratio(model_totals):.1%} of {model_totals['prompt_tokens']} prompt tokens "
+            f"read from cache, {model_totals['cache_creation_input_tokens']} written, "
+            f"{model_totals['uncached_input_tokens']} uncached"
+        )
+    return lines
+
+
+def cell_cache_ratios(rows: list[list[object]]) -> dict[tuple[str, str], float]:
+    """Share of prompt tokens read from cache per (good_model, bad_model) cell, both roles pooled."""
+    read: dict[tuple[str, str], int] = {}
+    prompt: dict[tuple[str, str], int] = {}
+    read_col = CACHE_STATS_HEADER.index("cache_read_input_tokens")
+    prompt_col = CACHE_STATS_HEADER.index("prompt_tokens")
+    for row in rows:
+        cell = (str(row[0]), str(row[1]))
+        read[cell] = read.get(cell, 0) + int(row[read_col])
+        prompt[cell] = prompt.get(cell, 0) + int(row[prompt_col])
+    return {cell: round(read[cell] / prompt[cell], 4) for cell in prompt if prompt[cell]}
@@ -1,9 +1,166 @@
-from agents.main import call_good_agent, call_bad_agent
-from bandit import n_armed_bandit
+from agents.main import call_good_agent, call_bad_agent, call_good_agent_async, call_bad_agent_async
+from agents.transcript import Transcript
+from bandit import RewardTape, draw_reward, game_reward_tape
 from util import GREEN, RED, RESET, get_summary
 import argparse
-from typing import Callable
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable
 from config import NUM_PULLS
+from game_checkpoint import GameCheckpoint
+
+
+def _warn_cache_discount_once(
+    log: Callable[[str], None],
+    model_id: str,
+    response: dict[str, Any],
+    shown: set[str],
+) -> None:
+    cache_note = response.get("cache_discount_note")
+    warning_key = f"{model_id}:{cache_note}"
+    if cache_note and warning_key not in shown:
+        log(f"[cache-warning][{model_id}] {cache_note}")
+        shown.add(warning_key)
+
+
+def _apply_good_response(
+    log: Callable[[str], None],
+    debug: bool,
+    good_model_id: str,
+    current_pull: int,
+    good_response: dict[str, Any],
+    all_results: list[tuple[int, float]],
+    past_reasoning: list[str],
+    good_history_turns: list[dict],
+    cache_discount_warnings_shown: set[str],
+    reward_tape: RewardTape | None = None,
+) -> tuple[int, float] | None:
+    _warn_cache_discount_once(log, good_model_id, good_response, cache_discount_warnings_shown)
+
+    if debug:
+        log(f"{GREEN}Good Model ({good_model_id}): {good_response['llm_response']}{RESET}\n")
+        if good_response.get("usage"):
+            log(f"Usage ({good_model_id}): {good_response['usage']}")
+
+    past_reasoning.append(good_response['llm_response'])
+    if good_response.get("history_turn"):
+        good_history_turns.append(good_response["history_turn"])
+
+    # Process the pull if one was made
+    if good_response['arm_pulled'] is not None:
+        arm = int(good_response['arm_pulled'])
+        result = draw_reward(arm, current_pull, reward_tape)
+        all_results.append((arm, result))
+
+        if debug:
+            log(f"{RESET}Pull {current_pull + 1}: arm {arm} gave {result} points")
+        return arm, result
+    return None
+
+
+def _report_turn(
+    on_turn: Callable[[dict[str, Any]], None] | None,
+    role: str,
+    model_id: str,
+    current_pull: int,
+    response: dict[str, Any],
+    started_at: float,
+    pull: tuple[int, float] | None = None,
+) -> None:
+    if on_turn is None:
+        return
+    on_turn(
+        {
+            "role": role,
+            "model": model_id,
+            "turn": current_pull + 1,
+            "arm": pull[0] if pull is not None else None,
+            "reward": pull[1] if pull is not None else None,
+            "usage": response.get("usage"),
+            "latency_seconds": round(time.perf_counter() - started_at, 3),
+        }
+    )
+
+
+def _apply_bad_response(
+    log: Callable[[str], None],
+    debug: bool,
+    bad_model_id: str,
+    bad_response: dict[str, Any],
+    bad_messages: list[str],
+    bad_history_turns: list[dict],
+    cache_discount_warnings_shown: set[str],
+) -> None:
+    _warn_cache_discount_once(log, bad_model_id, bad_response, cache_discount_warnings_shown)
+
+    if debug:
+        log(f"{RED}Bad Model ({bad_model_id}): {bad_response['llm_response']}{RESET}\n")
+        log(f"Bad Model Message: {bad_response['message']}")
+        if bad_response.get("usage"):
+            log(f"Usage ({bad_model_id}): {bad_response['usage']}")
+
+    if bad_response.get("history_turn"):
+        bad_history_turns.append(bad_response["history_turn"])
+    if bad_response['message']:
+        bad_messages.append(bad_response['message'])
+    else:
+        bad_messages.append("")
+
+
+@dataclass
+class GameState:
+    """Everything a game loop needs to continue from the last completed agent call."""
+
+    all_results: list[tuple[int, float]] = field(default_factory=list)
+    past_reasoning: list[str] = field(default_factory=list)
+    bad_messages: list[str] = field(default_factory=list)
+    good_history_turns: list[dict] = field(default_factory=list)
+    bad_history_turns: list[dict] = field(default_factory=list)
+    next_pull: int = 0
+    awaiting_bad: bool = False
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "all_results": [[arm, reward] for arm, reward in self.all_results],
+            "past_reasoning": self.past_reasoning,
+            "bad_messages": self.bad_messages,
+            "good_history_turns": self.good_history_turns,
+            "bad_history_turns": self.bad_history_turns,
+            "next_pull": self.next_pull,
+            "awaiting_bad": self.awaiting_bad,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "GameState":
+        return cls(
+            all_results=[(int(arm), float(reward)) for arm, reward in data["all_results"]],
+            past_reasoning=list(data["past_reasoning"]),
+            bad_messages=list(data["bad_messages"]),
+            good_history_turns=list(data["good_history_turns"]),
+            bad_history_turns=list(data["bad_history_turns"]),
+            next_pull=int(data["next_pull"]),
+            awaiting_bad=bool(data["awaiting_bad"]),
+        )
+
+
+def load_game_state(
+    checkpoint: GameCheckpoint | None, log: Callable[[str], None]
+) -> GameState:
+    saved = checkpoint.load() if checkpoint is not None else None
+    if saved is None:
+        return GameState()
+    state = GameState.from_dict(saved)
+    log(
+        f"[checkpoint] resuming at pull {state.next_pull + 1}"
+        f"{' (bad agent turn)' if state.awaiting_bad else ''} "
+        f"with {len(state.all_results)} recorded pulls"
+    )
+    return state
+
+
+def save_game_state(checkpoint: GameCheckpoint | None, state: GameState) -> None:
+    if checkpoint is not None:
+        checkpoint.save(state.to_dict())
 
 
 def conversation(
@@ -12,80 +169,132 @@ def conversation(
     bad_model_id: str,
     debug: bool = False,
     emit: Callable[[str], None] | None = None,
+    on_turn: Callable[[dict[str, Any]], None] | None = None,
+    checkpoint: GameCheckpoint | None = None,
+    history_window: int = 0,
+    reward_tape: RewardTape | None = None,
 ) -> list[tuple[int, float]]:
-    all_results: list[tuple[int, float]] = []
-    past_reasoning: list[str] = []
     log = emit if emit is not None else print
-
-    bad_messages: list[str] = []
-    good_history_turns: list[dict] = []
-    bad_history_turns: list[dict] = []
+    state = load_game_state(checkpoint, log)
+    all_results = state.all_results
     cache_discount_warnings_shown: set[str] = set()
+    good_transcript, bad_transcript = Transcript(), Transcript()
 
-    for current_pull in range(num_pulls):
+    for current_pull in range(state.next_pull, num_pulls):
         # Good agent makes a decision
-        good_response = call_good_agent(
-            model=good_model_id,
-            current_turn=current_pull + 1,
-            past_results=all_results,
-            bad_messages=bad_messages,
-            good_history_turns=good_history_turns,
-            num_pulls=num_pulls,
-        )
-
-        good_cache_note = good_response.get("cache_discount_note")
-        good_warning_key = f"{good_model_id}:{good_cache_note}"
-        if good_cache_note and good_warning_key not in cache_discount_warnings_shown:
-            log(f"[cache-warning][{good_model_id}] {good_cache_note}")
-            cache_discount_warnings_shown.add(good_warning_key)
-        
-        if debug:
-            log(f"{GREEN}Good Model ({good_model_id}): {good_response['llm_response']}{RESET}\n")
-            if good_response.get("usage"):
-                log(f"Usage ({good_model_id}): {good_response['usage']}")
-        
-        past_reasoning.append(good_response['llm_response'])
-        if good_response.get("history_turn"):
-            good_history_turns.append(good_response["history_turn"])
-
-        # Process the pull if one was made
-        if good_response['arm_pulled'] is not None:
-            arm = int(good_response['arm_pulled'])
-            result = n_armed_bandit(arm)
-            all_results.append((arm, result))
-
-            if debug:
-                log(f"{RESET}Pull {current_pull + 1}: arm {arm} gave {result} points")
+        if not state.awaiting_bad:
+            started_at = time.perf_counter()
+            good_response = call_good_agent(
+                model=good_model_id,
+                current_turn=current_pull + 1,
+                past_results=all_results,
+                bad_messages=state.bad_messages,
+                good_history_turns=state.good_history_turns,
+                num_pulls=num_pulls,
+                transcript=good_transcript,
+                history_window=history_window,
+            )
+            pull = _apply_good_response(
+                log, debug, good_model_id, current_pull, good_response,
+                all_results, state.past_reasoning, state.good_history_turns,
+                cache_discount_warnings_shown, reward_tape,
+            )
+            _report_turn(
+                on_turn, "good", good_model_id, current_pull, good_response, started_at, pull
+            )
+            state.awaiting_bad = True
+            save_game_state(checkpoint, state)
 
         # Bad agent responds
         if current_pull < num_pulls - 1:
+            started_at = time.perf_counter()
             bad_response = call_bad_agent(
                 model=bad_model_id,
                 past_results=all_results,
-                past_reasoning=past_reasoning,
-                bad_history_turns=bad_history_turns,
+                past_reasoning=state.past_reasoning,
+                bad_history_turns=state.bad_history_turns,
+                num_pulls=num_pulls,
+                transcript=bad_transcript,
+                history_window=history_window,
+            )
+            _apply_bad_response(
+                log, debug, bad_model_id, bad_response,
+                state.bad_messages, state.bad_history_turns, cache_discount_warnings_shown,
+            )
+            _report_turn(on_turn, "bad", bad_model_id, current_pull, bad_response, started_at)
+
+        state.next_pull = current_pull + 1
+        state.awaiting_bad = False
+        save_game_state(checkpoint, state)
+
+    if debug:
+        log(get_summary(all_results, num_pulls))
+    return all_results
+
+
+async def conversation_async(
+    num_pulls: int,
+    good_model_id: str,
+    bad_model_id: str,
+    debug: bool = False,
+    emit: Callable[[str], None] | None = None,
+    on_turn: Callable[[dict[str, Any]], None] | None = None,
+    checkpoint: GameCheckpoint | None = None,
+    history_window: int = 0,
+    reward_tape: RewardTape | None = None,
+) -> list[tuple[int, float]]:
+    """Same game loop as conversation(), awaiting the providers' async clients."""
+    log = emit if emit is not None else print
+    state = load_game_state(checkpoint, log)
+    all_results = state.all_results
+    cache_discount_warnings_shown: set[str] = set()
+    good_transcript, bad_transcript = Transcript(), Transcript()
+
+    for current_pull in range(state.next_pull, num_pulls):
+        if not state.awaiting_bad:
+            started_at = time.perf_counter()
+            good_response = await call_good_agent_async(
+                model=good_model_id,
+                current_turn=current_pull + 1,
+                past_results=all_results,
+                bad_messages=state.bad_messages,
+                good_history_turns=state.good_history_turns,
+                num_pulls=num_pulls,
+                transcript=good_transcript,
+                history_window=history_window,
+            )
+            pull = _apply_good_response(
+                log, debug, good_model_id, current_pull, good_response,
+                all_results, state.past_reasoning, state.good_history_turns,
+                cache_discount_warnings_shown, reward_tape,
+            )
+            _report_turn(
+                on_turn, "good", good_model_id, current_pull, good_response, started_at, pull
+            )
+            state.awaiting_bad = True
+            save_game_state(checkpoint, state)
+
+        if current_pull < num_pulls - 1:
+            started_at = time.perf_counter()
+            bad_response = await call_bad_agent_async(
+                model=bad_model_id,
+                past_results=all_results,
+                past_reasoning=state.past_reasoning,
+                bad_history_turns=state.bad_history_turns,
                 num_pulls=num_pulls,
+                transcript=bad_transcript,
+                history_window=history_window,
             )
+            _apply_bad_response(
+                log, debug, bad_model_id, bad_response,
+                state.bad_messages, state.bad_history_turns, cache_discount_warnings_shown,
+            )
+            _report_turn(on_turn, "bad", bad_model_id, current_pull, bad_response, started_at)
+
+        state.next_pull = current_pull + 1
+        state.awaiting_bad = False
+        save_game_state(checkpoint, state)
 
-            bad_cache_note = bad_response.get("cache_discount_note")
-            bad_warning_key = f"{bad_model_id}:{bad_cache_note}"
-            if bad_cache_note and bad_warning_key not in cache_discount_warnings_shown:
-                log(f"[cache-warning][{bad_model_id}] {bad_cache_note}")
-                cache_discount_warnings_shown.add(bad_warning_key)
-            
-            if debug:
-                log(f"{RED}Bad Model ({bad_model_id}): {bad_response['llm_response']}{RESET}\n")
-                log(f"Bad Model Message: {bad_response['message']}")
-                if bad_response.get("usage"):
-                    log(f"Usage ({bad_model_id}): {bad_response['usage']}")
-            
-            if bad_response.get("history_turn"):
-                bad_history_turns.append(bad_response["history_turn"])
-            if bad_response['message']:
-                bad_messages.append(bad_response['message'])
-            else:
-                bad_messages.append("")
-    
     if debug:
         log(get_summary(all_results, num_pulls))
     return all_results
@@ -97,7 +306,27 @@ if __name__ == "__main__":
     parser.add_argument("--good_model", type=str, default="claude-sonnet-4-6", help="Model ID for the good agent")
     parser.add_argument("--bad_model", type=str, default="claude-sonnet-4-6", help="Model ID for the bad agent")
     parser.add_argument("--debug", action="store_true", help="Enable debug mode")
+    parser.add_argument(
+        "--history_window",
+        type=int,
+        default=0,
+        help="Replay only the last K turns plus per-arm stats (0 = full history)",
+    )
+    parser.add_argument(
+        "--reward_seed",
+        type=int,
+        default=None,
+        help="Draw rewards from the seeded reward tape (repeat 0) instead of live random pulls",
+    )
 
     args = parser.parse_args()
 
-    conversation(args.num_pulls, args.good_model, args.bad_model, args.debug)
+    conversation(
+        args.num_pulls, args.good_model, args.bad_model, args.debug,
+        history_window=max(0, args.history_window),
+        reward_tape=(
+            game_reward_tape(args.reward_seed, 0, args.num_pulls)
+            if args.reward_seed is not None
+            else None
+        ),
+    )
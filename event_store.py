@@ -0,0 +1,154 @@
+import json
+import threading
+from pathlib import Path
+from typing import Any
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_IMPORT_ERROR: Exception | None = None
+except ImportError as exc:
+    pa = None  # type: ignore[assignment]
+    pq = None  # type: ignore[assignment]
+    PYARROW_IMPORT_ERROR = exc
+
+EVENTS_JSONL = "events.jsonl"
+EVENTS_PARQUET = "events.parquet"
+
+USAGE_FIELDS = (
+    "input_tokens",
+    "output_tokens",
+    "reasoning_output_tokens",
+    "reasoning_output_tokens_estimate",
+    "total_tokens",
+    "cache_creation_input_tokens",
+    "cache_read_input_tokens",
+)
+
+# One row per agent call. Solo games use role="solo" and leave bad_model empty.
+EVENT_KEY = ("good_model", "bad_model", "repeat_index", "turn", "role")
+
+
+def _event_schema() -> "pa.Schema":
+    return pa.schema(
+        [
+            ("lattice", pa.string()),
+            ("good_model", pa.string()),
+            ("bad_model", pa.string()),
+            ("repeat_index", pa.int32()),
+            ("num_pulls", pa.int32()),
+            ("role", pa.string()),
+            ("model", pa.string()),
+            ("turn", pa.int32()),
+            ("arm", pa.int32()),
+            ("reward", pa.float64()),
+            ("latency_seconds", pa.float64()),
+            *[(f"usage_{name}", pa.int64()) for name in USAGE_FIELDS],
+        ]
+    )
+
+
+def _require_pyarrow() -> None:
+    if PYARROW_IMPORT_ERROR is not None:
+        raise RuntimeError(
+            "The 'pyarrow' package is required to write or read events.parquet. "
+            "Install it with: pip install pyarrow"
+        ) from PYARROW_IMPORT_ERROR
+
+
+def pyarrow_available() -> bool:
+    return PYARROW_IMPORT_ERROR is None
+
+
+def flatten_event(context: dict[str, Any], turn: dict[str, Any]) -> dict[str, Any]:
+    """Merge game context with an on_turn record, spreading usage into usage_* columns."""
+    usage = turn.get("usage") or {}
+    event = {
+        **context,
+        "role": turn["role"],
+        "model": turn["model"],
+        "turn": turn["turn"],
+        "arm": turn.get("arm"),
+        "reward": turn.get("reward"),
+        "latency_seconds": turn.get("latency_seconds"),
+    }
+    for name in USAGE_FIELDS:
+        value = usage.get(name)
+        event[f"usage_{name}"] = value if isinstance(value, int) else None
+    return event
+
+
+class EventLog:
+    """Append-only JSONL sink for the per-turn events of one lattice run."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, event: dict[str, Any]) -> None:
+        line = json.dumps(event, ensure_ascii=False)
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(f"{line}\n")
+
+
+def _read_jsonl_events(path: Path) -> list[dict[str, Any]]:
+    events: dict[tuple, dict[str, Any]] = {}
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            # A retried turn replaces the attempt that was written before the failure.
+            events[tuple(event.get(key) for key in EVENT_KEY)] = event
+    return list(events.values())
+
+
+def _event_sort_key(event: dict[str, Any]) -> tuple:
+    return (
+        event.get("good_model") or "",
+        event.get("bad_model") or "",
+        event.get("repeat_index") or 0,
+        event.get("turn") or 0,
+        event.get("role") == "bad",
+    )
+
+
+def compact_events(lattice_dir: Path) -> Path | None:
+    """Rewrite <lattice_dir>/events.jsonl as a deduplicated events.parquet."""
+    _require_pyarrow()
+    jsonl_path = lattice_dir / EVENTS_JSONL
+    if not jsonl_path.exists():
+        return None
+
+    schema = _event_schema()
+    events = _read_jsonl_events(jsonl_path)
+    events.sort(key=_event_sort_key)
+    columns = {name: [event.get(name) for event in events] for name in schema.names}
+    table = pa.Table.from_pydict(columns, schema=schema)
+
+    parquet_path = lattice_dir / EVENTS_PARQUET
+    tmp_path = parquet_path.with_name(f"{parquet_path.name}.tmp")
+    pq.write_table(table, tmp_path, compression="zstd")
+    tmp_path.replace(parquet_path)
+    return parquet_path
+
+
+def load_events(lattice_dir: Path):
+    """Events of one lattice run as a pandas DataFrame (Parquet if compacted, else JSONL)."""
+    import pandas as pd
+
+    parquet_path = lattice_dir / EVENTS_PARQUET
+    if parquet_path.exists():
+        _require_pyarrow()
+        return pq.read_table(parquet_path).to_pandas()
+
+    jsonl_path = lattice_dir / EVENTS_JSONL
+    if not jsonl_path.exists():
+        raise FileNotFoundError(f"No {EVENTS_PARQUET} or {EVENTS_JSONL} in {lattice_dir}")
+    return pd.DataFrame(_read_jsonl_events(jsonl_path))
@@ -0,0 +1,43 @@
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+
+class GameCheckpoint:
+    """
+    Atomic JSON snapshot of one in-progress game.
+
+    The metadata identifies the task that owns the file; a checkpoint written for
+    different metadata (another model pair, another num_pulls) is ignored on load.
+    """
+
+    def __init__(self, path: Path, metadata: dict[str, Any]):
+        self.path = path
+        self.metadata = metadata
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def load(self) -> dict[str, Any] | None:
+        try:
+            with self.path.open("r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if not isinstance(payload, dict) or payload.get("metadata") != self.metadata:
+            return None
+        state = payload.get("state")
+        return state if isinstance(state, dict) else None
+
+    def save(self, state: dict[str, Any]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump({"metadata": self.metadata, "state": state}, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
@@ -5,6 +5,7 @@ import contextlib
 import csv
 import os
 import re
+import shutil
 import shlex
 import statistics
 import sys
@@ -12,19 +13,48 @@ import threading
 import time
 import traceback
 from collections import defaultdict
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 from typing import TextIO
 
 import agents.anthropic as anthropic_module
+from adaptive_repeats import (
+    CELL_PRECISION_HEADER,
+    CellPrecision,
+    allocate_repeats,
+    cell_precision,
+    cell_precision_row,
+)
+from active_ranking import RANKING_HEADER, AdditiveRanking
+from agents.batch import BatchCoordinator, batch_game, batch_scope
 from agents.gemini import Gemini
 from agents.grok import Grok
+from agents.main import describe_history_policy
 from agents.openai import OpenAI
-from agents.resilience import retry_log_sink
+from agents.resilience import describe_concurrency_windows, retry_log_sink
+from bandit import game_reward_tape
+from cache_stats import CACHE_STATS_HEADER, cache_stats_row, cell_cache_ratios, summarize_cache_rows
 from config import NUM_PULLS
-from conversation import conversation
+from conversation import conversation_async
 from dotenv import dotenv_values
+from event_store import (
+    EVENTS_JSONL,
+    EVENTS_PARQUET,
+    EventLog,
+    compact_events,
+    flatten_event,
+    pyarrow_available,
+)
+from game_checkpoint import GameCheckpoint
+from paired_stats import (
+    PAIRED_DIFFS_HEADER,
+    load_solo_baseline,
+    paired_diff_rows,
+    solo_diff_means,
+    summarize_paired_rows,
+)
+from run_journal import RunJournal, accumulate_usage, archive_file
 from util import get_summary_rows, total_expected_score, total_score
 
 
@@ -59,6 +89,7 @@ class MatchResult:
     expected_score: float
     elapsed_seconds: float
     match_log_path: Path
+    usage: dict[str, dict[str, int]] = field(default_factory=dict)
 
 
 @dataclass(frozen=True)
@@ -91,6 +122,17 @@ LATTICES: dict[str, LatticeSpec] = {
             gemini_effort="low",
         ),
     ),
+    # Offline mock provider (agents/mock.py) for load-testing the runner itself.
+    "mock": LatticeSpec(
+        name="mock",
+        models=("mock-ucb1", "mock-greedy", "mock-random"),
+        reasoning=ReasoningProfile(
+            openai_effort=None,
+            anthropic_effort=None,
+            anthropic_thinking_type="disabled",
+            gemini_effort=None,
+        ),
+    ),
     "gpt-5.4-reasoning-cross": LatticeSpec(
         name="gpt-5.4-reasoning-cross",
         models=(
@@ -118,6 +160,11 @@ LATTICES: dict[str, LatticeSpec] = {
 }
 
 
+def _format_windows() -> str:
+    windows = describe_concurrency_windows()
+    return f" in_flight[{windows}]" if windows else ""
+
+
 def _safe_name(value: str) -> str:
     return re.sub(r"[^A-Za-z0-9._-]+", "-", value)
 
@@ -171,6 +218,26 @@ def _build_match_tasks(lattice: LatticeSpec, repeats: int) -> list[MatchTask]:
     ]
 
 
+def _build_ranking_tasks(lattice: LatticeSpec, repeats: int) -> list[MatchTask]:
+    # Initial wave for active ranking: each model plays itself and its neighbour in
+    # both roles, which links every effect in the additive model with 2N cells.
+    if lattice.pairs is not None:
+        return _build_match_tasks(lattice, repeats)
+    models = lattice.models
+    model_pairs = list(
+        dict.fromkeys(
+            (models[idx], models[(idx + shift) % len(models)])
+            for shift in range(min(2, len(models)))
+            for idx in range(len(models))
+        )
+    )
+    return [
+        MatchTask(good_model=good_model, bad_model=bad_model, repeat_index=repeat_idx)
+        for repeat_idx in range(1, repeats + 1)
+        for good_model, bad_model in model_pairs
+    ]
+
+
 def _build_match_log_path(match_logs_dir: Path, task: MatchTask) -> Path:
     return match_logs_dir / (
         f"{_safe_name(task.good_model)}_vs_{_safe_name(task.bad_model)}"
@@ -298,6 +365,20 @@ def _print_run_header(
     print(f"  output_dir={args.output_dir.resolve()}")
     print(f"  debug={args.debug}")
     print(f"  settings_file={args.settings_file}")
+    print(f"  resume={args.resume}")
+    print(f"  task_retries={args.task_retries}")
+    print(f"  history_window={args.history_window} ({describe_history_policy(args.history_window)})")
+    print(f"  batch_mode={args.batch_mode}")
+    print(f"  reward_seed={args.reward_seed}")
+    print(f"  paired_baseline={args.paired_baseline}")
+    print(
+        f"  adaptive={args.adaptive} target_half_width={args.target_half_width} "
+        f"max_repeats={args.max_repeats} budget={args.budget}"
+    )
+    print(
+        f"  active_ranking={args.active_ranking} ranking_confidence={args.ranking_confidence} "
+        f"rank_tolerance={args.rank_tolerance}"
+    )
     print("Reasoning profile:")
     print(f"  openai_effort={lattice.reasoning.openai_effort}")
     print(f"  anthropic_effort={lattice.reasoning.anthropic_effort}")
@@ -322,40 +403,138 @@ def _print_run_header(
     print("=" * 100)
 
 
+def _match_record(
+    result: MatchResult, num_pulls: int, history_window: int, reward_seed: int | None
+) -> dict[str, object]:
+    return {
+        "kind": "match",
+        "good_model": result.task.good_model,
+        "bad_model": result.task.bad_model,
+        "repeat_index": result.task.repeat_index,
+        "num_pulls": num_pulls,
+        "history_window": history_window,
+        "reward_seed": reward_seed,
+        "pulls": [[arm, reward] for arm, reward in result.pulls],
+        "total_score": result.total_score,
+        "expected_score": result.expected_score,
+        "elapsed_seconds": result.elapsed_seconds,
+        "match_log_path": str(result.match_log_path),
+        "usage": result.usage,
+        "recorded_at": datetime.now().isoformat(),
+    }
+
+
+def _load_journaled_results(
+    journal: RunJournal,
+    tasks: list[MatchTask],
+    num_pulls: int,
+    history_window: int,
+    reward_seed: int | None,
+) -> dict[MatchTask, MatchResult]:
+    wanted = set(tasks)
+    journaled: dict[MatchTask, MatchResult] = {}
+    for record in journal.records():
+        if record.get("kind") != "match" or record.get("num_pulls") != num_pulls:
+            continue
+        if record.get("history_window", 0) != history_window:
+            continue
+        if record.get("reward_seed") != reward_seed:
+            continue
+        task = MatchTask(
+            good_model=record["good_model"],
+            bad_model=record["bad_model"],
+            repeat_index=int(record["repeat_index"]),
+        )
+        if task not in wanted:
+            continue
+        journaled[task] = MatchResult(
+            task=task,
+            pulls=[(int(arm), float(reward)) for arm, reward in record["pulls"]],
+            total_score=float(record["total_score"]),
+            expected_score=float(record["expected_score"]),
+            elapsed_seconds=float(record["elapsed_seconds"]),
+            match_log_path=Path(record["match_log_path"]),
+            usage=record.get("usage") or {},
+        )
+    return journaled
+
+
 async def _run_single_match(
     task: MatchTask,
     *,
     game_slot: asyncio.Semaphore,
     match_logs_dir: Path,
+    checkpoints_dir: Path,
+    event_log: EventLog,
+    lattice_name: str,
     num_pulls: int,
+    history_window: int,
+    reward_seed: int | None,
     debug: bool,
 ) -> MatchResult:
     match_log_path = _build_match_log_path(match_logs_dir, task)
+    checkpoint = GameCheckpoint(
+        checkpoints_dir / f"{match_log_path.stem}.json",
+        metadata={
+            "good_model": task.good_model,
+            "bad_model": task.bad_model,
+            "repeat_index": task.repeat_index,
+            "num_pulls": num_pulls,
+            "history_window": history_window,
+            "reward_seed": reward_seed,
+        },
+    )
 
-    def _run_conversation_with_match_log() -> list[tuple[int, float]]:
+    async with game_slot:
+        start = time.perf_counter()
         match_log_path.parent.mkdir(parents=True, exist_ok=True)
-        with match_log_path.open("w", encoding="utf-8", buffering=1) as match_log:
+        # A match resumed from its checkpoint continues its existing log. An unreadable or
+        # mismatched checkpoint restarts the match at turn 0, so its old log is truncated.
+        log_mode = "a" if checkpoint.load() is not None else "w"
+        with match_log_path.open(log_mode, encoding="utf-8", buffering=1) as match_log:
             def emit(message: str) -> None:
                 text = message if message.endswith("\n") else f"{message}\n"
                 match_log.write(text)
 
             emit(f"Match: {task.good_model} (good) vs {task.bad_model} (bad)")
             emit(f"Repeat index: {task.repeat_index}")
+            emit(f"History policy: {describe_history_policy(history_window)}")
+            if reward_seed is not None:
+                emit(f"Reward tape: seed {reward_seed}, repeat {task.repeat_index}")
             emit(f"Debug mode: {debug}")
             emit("-" * 80)
 
+            usage: dict[str, dict[str, int]] = {}
+
+            event_context = {
+                "lattice": lattice_name,
+                "good_model": task.good_model,
+                "bad_model": task.bad_model,
+                "repeat_index": task.repeat_index,
+                "num_pulls": num_pulls,
+            }
+
+            def record_turn(turn: dict) -> None:
+                accumulate_usage(usage.setdefault(turn["role"], {}), turn["usage"])
+                event_log.append(flatten_event(event_context, turn))
+
             with retry_log_sink(emit):
-                return conversation(
+                pulls = await conversation_async(
                     num_pulls,
                     task.good_model,
                     task.bad_model,
                     debug,
                     emit=emit,
+                    on_turn=record_turn,
+                    checkpoint=checkpoint,
+                    history_window=history_window,
+                    reward_tape=(
+                        game_reward_tape(reward_seed, task.repeat_index, num_pulls)
+                        if reward_seed is not None
+                        else None
+                    ),
                 )
-
-    async with game_slot:
-        start = time.perf_counter()
-        pulls = await asyncio.to_thread(_run_conversation_with_match_log)
+        checkpoint.clear()
         elapsed_seconds = time.perf_counter() - start
         return MatchResult(
             task=task,
@@ -364,6 +543,7 @@ async def _run_single_match(
             expected_score=total_expected_score(pulls),
             elapsed_seconds=elapsed_seconds,
             match_log_path=match_log_path,
+            usage=usage,
         )
 
 
@@ -383,66 +563,246 @@ async def _run_lattice(
     max_concurrent_games: int,
     output_root: Path,
     debug: bool,
+    resume: bool = False,
+    task_retries: int = 0,
+    history_window: int = 0,
+    batch_mode: bool = False,
+    reward_seed: int | None = None,
+    paired_baseline: Path | None = None,
+    adaptive: bool = False,
+    target_half_width: float = 20.0,
+    max_repeats: int = 50,
+    budget: int | None = None,
+    active_ranking: bool = False,
+    ranking_confidence: float = 0.95,
+    rank_tolerance: float = 0.0,
 ) -> None:
     _apply_reasoning_profile(lattice.reasoning)
-    tasks = _build_match_tasks(lattice, repeats)
+    solo_scores = None
+    if paired_baseline is not None and reward_seed is not None:
+        solo_scores = load_solo_baseline(
+            paired_baseline, num_pulls=num_pulls, history_window=history_window, reward_seed=reward_seed
+        )
+        print(f"[{lattice.name}] paired baseline: {len(solo_scores)} solo game(s) from {paired_baseline}")
+    tasks = _build_ranking_tasks(lattice, repeats) if active_ranking else _build_match_tasks(lattice, repeats)
     lattice_dir = output_root / lattice.name
     matches_dir = lattice_dir / "matches"
     match_logs_dir = lattice_dir / "match_logs"
-
-    game_slot = asyncio.Semaphore(max_concurrent_games)
+    checkpoints_dir = lattice_dir / "checkpoints"
+
+    journal = RunJournal(lattice_dir / "journal.jsonl")
+    event_log = EventLog(lattice_dir / EVENTS_JSONL)
+    journaled: dict[MatchTask, MatchResult] = {}
+    if resume:
+        # Adaptive runs may have gone past --repeats in earlier sessions.
+        adaptive_run = adaptive or active_ranking
+        resumable = _build_match_tasks(lattice, max(repeats, max_repeats)) if adaptive_run else tasks
+        journaled = _load_journaled_results(journal, resumable, num_pulls, history_window, reward_seed)
+        planned = "" if adaptive_run else f"/{len(tasks)}"
+        print(f"[{lattice.name}] resuming: {len(journaled)}{planned} matches already in {journal.path}")
+        tasks = [task for task in tasks if task not in journaled]
+    else:
+        archived = journal.archive(datetime.now())
+        if archived is not None:
+            print(f"[{lattice.name}] previous journal moved to {archived}")
+        shutil.rmtree(checkpoints_dir, ignore_errors=True)
+        archive_file(event_log.path, datetime.now())
+        (lattice_dir / EVENTS_PARQUET).unlink(missing_ok=True)
+    if (adaptive or active_ranking) and budget is not None:
+        tasks = tasks[: max(0, budget - len(journaled))]
+
+    # Batch mode advances every game together, one wave of requests per turn.
+    batch = BatchCoordinator() if batch_mode else None
+    game_slot = asyncio.Semaphore(
+        max(1, len(tasks), max_concurrent_games) if batch_mode else max_concurrent_games
+    )
     async def _run_and_capture(task: MatchTask) -> tuple[MatchTask, MatchResult | None, Exception | None]:
-        try:
-            result = await _run_single_match(
-                task,
-                game_slot=game_slot,
-                match_logs_dir=match_logs_dir,
-                num_pulls=num_pulls,
-                debug=debug,
-            )
-            return task, result, None
-        except Exception as exc:
-            return task, None, exc
-
-    running = [asyncio.create_task(_run_and_capture(task)) for task in tasks]
+        # The game holds its place in the wave barrier across retries, until it is done for good.
+        with batch_game():
+            attempt = 0
+            while True:
+                try:
+                    result = await _run_single_match(
+                        task,
+                        game_slot=game_slot,
+                        match_logs_dir=match_logs_dir,
+                        checkpoints_dir=checkpoints_dir,
+                        event_log=event_log,
+                        lattice_name=lattice.name,
+                        num_pulls=num_pulls,
+                        history_window=history_window,
+                        reward_seed=reward_seed,
+                        debug=debug,
+                    )
+                    return task, result, None
+                except Exception as exc:
+                    if attempt >= task_retries:
+                        return task, None, exc
+                    attempt += 1
+                    print(
+                        f"[{lattice.name}] retrying {task.good_model} vs {task.bad_model} "
+                        f"(run {task.repeat_index}) from its checkpoint "
+                        f"({attempt}/{task_retries}) after: {exc}"
+                    )
 
-    successful_results: list[MatchResult] = []
+    successful_results: list[MatchResult] = list(journaled.values())
     failures: list[tuple[MatchTask, Exception]] = []
-    total = len(running)
+    total = 0
     completed = 0
 
-    for job in asyncio.as_completed(running):
-        task, result, exc = await job
-        if exc is None and result is not None:
-            successful_results.append(result)
+    async def _play(wave: list[MatchTask]) -> None:
+        nonlocal total, completed
+        if batch is not None:
+            batch.expect(len(wave))
+        with batch_scope(batch):
+            running = [asyncio.create_task(_run_and_capture(task)) for task in wave]
+        total += len(running)
+
+        for job in asyncio.as_completed(running):
+            task, result, exc = await job
+            if exc is None and result is not None:
+                journal.append(_match_record(result, num_pulls, history_window, reward_seed))
+                successful_results.append(result)
+
+                summary_rows = [["Metric", "Value"]] + [list(row) for row in get_summary_rows(result.pulls)]
+                match_path = matches_dir / (
+                    f"{_safe_name(result.task.good_model)}_vs_{_safe_name(result.task.bad_model)}"
+                    f"_r{result.task.repeat_index:03d}.csv"
+                )
+                _write_csv(match_path, summary_rows)
+
+                completed += 1
+                print(
+                    f"[{lattice.name}] {completed}/{total} "
+                    f"{result.task.good_model} vs {result.task.bad_model} "
+                    f"(run {result.task.repeat_index}) "
+                    f"total={result.total_score:.3f} expected={result.expected_score:.3f} "
+                    f"time={result.elapsed_seconds:.2f}s "
+                    f"log={result.match_log_path}"
+                    f"{_format_windows()}"
+                )
+            else:
+                completed += 1
+                failures.append((task, exc if exc is not None else RuntimeError("unknown error")))
+                print(
+                    f"[{lattice.name}] {completed}/{total} FAILED "
+                    f"{task.good_model} vs {task.bad_model} "
+                    f"(run {task.repeat_index}): {exc}"
+                )
 
-            summary_rows = [["Metric", "Value"]] + [list(row) for row in get_summary_rows(result.pulls)]
-            match_path = matches_dir / (
-                f"{_safe_name(result.task.good_model)}_vs_{_safe_name(result.task.bad_model)}"
-                f"_r{result.task.repeat_index:03d}.csv"
+    await _play(tasks)
+
+    if adaptive or active_ranking:
+        cells = [(task.good_model, task.bad_model) for task in _build_match_tasks(lattice, 1)]
+        scheduled = {cell: 0 for cell in cells}
+        for task in [*journaled, *tasks]:
+            cell = (task.good_model, task.bad_model)
+            scheduled[cell] = max(scheduled[cell], task.repeat_index)
+        ranking = (
+            AdditiveRanking(
+                list(dict.fromkeys(good_model for good_model, _ in cells)),
+                list(dict.fromkeys(bad_model for _, bad_model in cells)),
             )
-            _write_csv(match_path, summary_rows)
+            if active_ranking
+            else None
+        )
 
-            completed += 1
-            print(
-                f"[{lattice.name}] {completed}/{total} "
-                f"{result.task.good_model} vs {result.task.bad_model} "
-                f"(run {result.task.repeat_index}) "
-                f"total={result.total_score:.3f} expected={result.expected_score:.3f} "
-                f"time={result.elapsed_seconds:.2f}s "
-                f"log={result.match_log_path}"
-            )
+        def _cell_values() -> dict[tuple[str, str], list[float]]:
+            values: dict[tuple[str, str], list[float]] = {cell: [] for cell in cells}
+            for result in successful_results:
+                score = result.expected_score
+                if solo_scores is not None:
+                    solo = solo_scores.get((result.task.good_model, result.task.repeat_index))
+                    if solo is None:
+                        continue
+                    score -= solo[1]
+                values[(result.task.good_model, result.task.bad_model)].append(score)
+            return values
+
+        while True:
+            values = _cell_values()
+            played = len(successful_results) + len(failures)
+            slots = max_concurrent_games
+            if budget is not None:
+                slots = max(0, min(slots, budget - played))
+            if ranking is not None:
+                observations = [(cell, value) for cell in cells for value in values[cell]]
+                if not observations:
+                    break
+                ranking.fit(observations)
+                if ranking.stable(ranking_confidence, rank_tolerance):
+                    break
+                extra = ranking.choose_cells({cell: max_repeats - scheduled[cell] for cell in cells}, slots)
+                status = f"active ranking: {ranking.ranking_uncertainty():.3f} expected misordered pair(s)"
+            else:
+                precisions = {cell: cell_precision(cell_values) for cell, cell_values in values.items()}
+                extra = allocate_repeats(
+                    precisions,
+                    target_half_width=target_half_width,
+                    max_repeats=max_repeats,
+                    slots=slots,
+                    scheduled=scheduled,
+                )
+                open_cells = sum(
+                    not precision.converged(target_half_width) for precision in precisions.values()
+                )
+                status = f"adaptive: {open_cells} cell(s) wider than +/-{target_half_width:g}"
+            if not extra:
+                break
+            wave: list[MatchTask] = []
+            for (good_model, bad_model), count in extra.items():
+                for _ in range(count):
+                    scheduled[(good_model, bad_model)] += 1
+                    wave.append(MatchTask(good_model, bad_model, scheduled[(good_model, bad_model)]))
+            print(f"[{lattice.name}] {status}, playing {len(wave)} more game(s) in {len(extra)} cell(s)")
+            await _play(wave)
+
+        played = len(successful_results) + len(failures)
+        if ranking is not None:
+            values = _cell_values()
+            observations = [(cell, value) for cell in cells for value in values[cell]]
+            if observations:
+                ranking.fit(observations)
+                _write_csv(lattice_dir / "ranking.csv", [RANKING_HEADER, *ranking.ranking_rows()])
+                _write_csv(
+                    lattice_dir / "predicted_scores.csv",
+                    _build_matrix_rows(
+                        "Additive-model predicted score", lattice.models, ranking.predicted_scores()
+                    ),
+                )
+                for row in ranking.ranking_rows():
+                    role, model, rank, effect, effect_sd, _ = row
+                    print(f"[{lattice.name}] ranking {role} #{rank}: {model} ({effect} +/- {effect_sd})")
+                stable = ranking.stable(ranking_confidence, rank_tolerance)
+                print(
+                    f"[{lattice.name}] active ranking: {'stable' if stable else 'not yet stable'} at "
+                    f"{ranking_confidence:.0%} after {played} game(s) in "
+                    f"{sum(1 for cell in cells if scheduled[cell])}/{len(cells)} cell(s)"
+                )
         else:
-            completed += 1
-            failures.append((task, exc if exc is not None else RuntimeError("unknown error")))
+            precisions = {cell: cell_precision(cell_values) for cell, cell_values in _cell_values().items()}
+            _write_csv(
+                lattice_dir / "cell_precision.csv",
+                [
+                    CELL_PRECISION_HEADER,
+                    *(cell_precision_row(cell, precisions[cell], target_half_width) for cell in cells),
+                ],
+            )
+            converged = sum(precision.converged(target_half_width) for precision in precisions.values())
             print(
-                f"[{lattice.name}] {completed}/{total} FAILED "
-                f"{task.good_model} vs {task.bad_model} "
-                f"(run {task.repeat_index}): {exc}"
+                f"[{lattice.name}] adaptive: {converged}/{len(cells)} cell(s) "
+                f"within +/-{target_half_width:g} after {played} game(s) "
+                f"(a fixed design at --max-repeats is {len(cells) * max_repeats})"
             )
 
+    if batch is not None:
+        print(f"[{lattice.name}] batch mode: {batch.describe()}")
+
     if not successful_results:
         raise RuntimeError(f"No successful matches were produced for lattice '{lattice.name}'.")
+    successful_results.sort(
+        key=lambda result: (result.task.good_model, result.task.bad_model, result.task.repeat_index)
+    )
 
     actual_values: dict[tuple[str, str], list[float]] = defaultdict(list)
     expected_values: dict[tuple[str, str], list[float]] = defaultdict(list)
@@ -458,21 +818,25 @@ async def _run_lattice(
             "match_log_path",
         ]
     ]
+    if solo_scores is not None:
+        run_rows[0] += ["solo_actual_score", "actual_minus_solo"]
     for result in successful_results:
         pair = (result.task.good_model, result.task.bad_model)
         actual_values[pair].append(result.total_score)
         expected_values[pair].append(result.expected_score)
-        run_rows.append(
-            [
-                result.task.good_model,
-                result.task.bad_model,
-                result.task.repeat_index,
-                result.total_score,
-                result.expected_score,
-                round(result.elapsed_seconds, 3),
-                str(result.match_log_path.resolve()),
-            ]
-        )
+        run_row: list[object] = [
+            result.task.good_model,
+            result.task.bad_model,
+            result.task.repeat_index,
+            result.total_score,
+            result.expected_score,
+            round(result.elapsed_seconds, 3),
+            str(result.match_log_path.resolve()),
+        ]
+        if solo_scores is not None:
+            solo = solo_scores.get((result.task.good_model, result.task.repeat_index))
+            run_row += ["", ""] if solo is None else [solo[0], round(result.total_score - solo[0], 3)]
+        run_rows.append(run_row)
 
     _write_csv(lattice_dir / "runs.csv", run_rows)
 
@@ -512,6 +876,56 @@ async def _run_lattice(
         _build_matrix_rows("Expected score stdev", lattice.models, expected_stdev),
     )
 
+    if reward_seed is not None:
+        paired_rows = paired_diff_rows(
+            {
+                (result.task.good_model, result.task.bad_model, result.task.repeat_index): (
+                    result.total_score,
+                    result.expected_score,
+                )
+                for result in successful_results
+            },
+            solo_scores,
+        )
+        _write_csv(lattice_dir / "paired_differences.csv", [PAIRED_DIFFS_HEADER, *paired_rows])
+        if solo_scores is not None:
+            _write_csv(
+                lattice_dir / "actual_minus_solo_mean.csv",
+                _build_matrix_rows(
+                    "Actual score minus solo, paired mean", lattice.models, solo_diff_means(paired_rows)
+                ),
+            )
+        for line in summarize_paired_rows(paired_rows):
+            print(f"[{lattice.name}] paired design: {line}")
+
+    cache_rows = [
+        cache_stats_row(
+            result.task.good_model,
+            result.task.bad_model,
+            result.task.repeat_index,
+            role,
+            model,
+            result.usage[role],
+        )
+        for result in successful_results
+        for role, model in (("good", result.task.good_model), ("bad", result.task.bad_model))
+        if result.usage.get(role)
+    ]
+    _write_csv(lattice_dir / "cache_stats.csv", [CACHE_STATS_HEADER, *cache_rows])
+    _write_csv(
+        lattice_dir / "cached_input_ratio.csv",
+        _build_matrix_rows("Cached input ratio", lattice.models, cell_cache_ratios(cache_rows)),
+    )
+    for line in summarize_cache_rows(cache_rows):
+        print(f"[{lattice.name}] prompt cache {line}")
+
+    if pyarrow_available():
+        events_path = compact_events(lattice_dir)
+        if events_path is not None:
+            print(f"[{lattice.name}] per-turn events compacted to {events_path}")
+    else:
+        print(f"[{lattice.name}] pyarrow not installed; per-turn events left in {event_log.path}")
+
     print(
         f"[{lattice.name}] completed with {len(successful_results)} successes and "
         f"{len(failures)} failures. Outputs: {lattice_dir}"
@@ -523,17 +937,30 @@ def _parse_args() -> argparse.Namespace:
         description=(
             "Run lattice evaluations concurrently with retry/backoff at the provider request layer. "
             "Tune provider limits with env vars like OPENAI_MAX_IN_FLIGHT, ANTHROPIC_MAX_IN_FLIGHT, "
-            "GEMINI_MAX_IN_FLIGHT, and corresponding *_MIN_INTERVAL_SECONDS / *_MAX_RETRIES."
+            "GEMINI_MAX_IN_FLIGHT, and corresponding *_MIN_INTERVAL_SECONDS / *_MAX_RETRIES. "
+            "Per-model request/token budgets come from *_RPM / *_TPM. "
+            "With *_ADAPTIVE_CONCURRENCY=1, in-flight limits adapt between *_ADAPTIVE_MIN_IN_FLIGHT "
+            "and *_ADAPTIVE_MAX_IN_FLIGHT (default 4x *_MAX_IN_FLIGHT)."
         )
     )
     parser.add_argument(
         "--lattice",
         type=str,
-        choices=["openai-none", "mixed-low", "gpt-5.4-reasoning-cross", "both"],
+        choices=["openai-none", "mixed-low", "gpt-5.4-reasoning-cross", "mock", "both"],
         default="both",
         help="Which preset lattice to run.",
     )
     parser.add_argument("--num-pulls", type=int, default=NUM_PULLS, help="Pulls per game.")
+    parser.add_argument(
+        "--history-window",
+        type=int,
+        default=0,
+        help=(
+            "Replay only the last K turns to each agent, preceded by per-arm pull counts and "
+            "mean rewards over the whole game. Keeps per-turn input size flat for long games. "
+            "0 (default) replays the full history."
+        ),
+    )
     parser.add_argument(
         "--repeats",
         type=int,
@@ -551,7 +978,8 @@ def _parse_args() -> argparse.Namespace:
         type=int,
         default=None,
         help=(
-            "Worker threads used by asyncio.to_thread for game execution. "
+            "Worker threads for providers without a native async client (games themselves "
+            "run as coroutines on one event loop). "
             "Default: max(max_concurrent_games, Python default threadpool size)."
         ),
     )
@@ -585,7 +1013,118 @@ def _parse_args() -> argparse.Namespace:
             "Existing environment variables take precedence over file values."
         ),
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help=(
+            "Skip matches already recorded in <output-dir>/<lattice>/journal.jsonl and rebuild "
+            "runs.csv and the score matrices from the journal plus the newly run matches."
+        ),
+    )
+    parser.add_argument(
+        "--task-retries",
+        type=int,
+        default=0,
+        help=(
+            "Re-run a failed game this many times. Each retry continues from the game's "
+            "turn checkpoint (<output-dir>/<lattice>/checkpoints), so completed turns are not re-paid."
+        ),
+    )
+    parser.add_argument(
+        "--reward-seed",
+        type=int,
+        default=None,
+        help=(
+            "Draw each game's rewards from a seeded reward tape shared by every game with the "
+            "same repeat index (matches, solo games and baselines alike), so cells are compared "
+            "on identical reward realisations. Default: live unseeded draws."
+        ),
+    )
+    parser.add_argument(
+        "--paired-baseline",
+        type=Path,
+        default=None,
+        help=(
+            "Solo journal (or solo <output-dir>/<lattice> directory) run with the same --reward-seed. "
+            "Each match is then also reported as its difference from the good model's solo game on "
+            "the same reward tape. Requires --reward-seed."
+        ),
+    )
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        help=(
+            "Treat --repeats as an initial wave, then keep adding repeats to the cells whose 95%% "
+            "confidence interval on the expected score (on the difference from solo with "
+            "--paired-baseline) is widest, until every cell is within --target-half-width, reaches "
+            "--max-repeats, or --budget games have been played. Writes cell_precision.csv."
+        ),
+    )
+    parser.add_argument(
+        "--target-half-width",
+        type=float,
+        default=20.0,
+        help="Adaptive mode: stop a cell once its confidence interval half-width is at most this.",
+    )
+    parser.add_argument(
+        "--max-repeats",
+        type=int,
+        default=50,
+        help="Adaptive and active-ranking modes: most games played in any one cell.",
+    )
+    parser.add_argument(
+        "--budget",
+        type=int,
+        default=None,
+        help=(
+            "Adaptive and active-ranking modes: most games played in total, journaled ones included. "
+            "Default: no limit."
+        ),
+    )
+    parser.add_argument(
+        "--active-ranking",
+        action="store_true",
+        help=(
+            "Rank models instead of measuring every cell: play --repeats games in 2N cells, fit an "
+            "additive (good effect + bad effect) model to the expected scores, and keep playing the "
+            "cells expected to settle the most uncertain rank orderings until both rankings are "
+            "stable at --ranking-confidence, --budget games have been played, or every cell reaches "
+            "--max-repeats. Writes ranking.csv and predicted_scores.csv."
+        ),
+    )
+    parser.add_argument(
+        "--ranking-confidence",
+        type=float,
+        default=0.95,
+        help=(
+            "Active ranking: stop once every adjacent pair in both rankings has this probability "
+            "of being in order."
+        ),
+    )
+    parser.add_argument(
+        "--rank-tolerance",
+        type=float,
+        default=0.0,
+        help=(
+            "Active ranking: also treat an adjacent pair as settled once its effects are confidently "
+            "within this many points of each other, so genuine ties do not run to the budget."
+        ),
+    )
+    parser.add_argument(
+        "--batch-mode",
+        action="store_true",
+        help=(
+            "Run every game at once, one turn at a time, sending each wave of OpenAI/Anthropic "
+            "requests as a single Batch API job (cheaper, no rate limits, much higher latency). "
+            "Ignores --max-concurrent-games. Tune with BATCH_POLL_SECONDS and BATCH_COLLECT_SECONDS."
+        ),
+    )
+    args = parser.parse_args()
+    if args.paired_baseline is not None and args.reward_seed is None:
+        parser.error("--paired-baseline requires --reward-seed")
+    if args.adaptive and args.active_ranking:
+        parser.error("--adaptive and --active-ranking are separate modes; pick one")
+    return args
 
 
 async def _async_main() -> None:
@@ -633,6 +1172,19 @@ async def _async_main() -> None:
                         max_concurrent_games=args.max_concurrent_games,
                         output_root=args.output_dir,
                         debug=args.debug,
+                        resume=args.resume,
+                        task_retries=max(0, args.task_retries),
+                        history_window=max(0, args.history_window),
+                        batch_mode=args.batch_mode,
+                        reward_seed=args.reward_seed,
+                        paired_baseline=args.paired_baseline,
+                        adaptive=args.adaptive,
+                        target_half_width=args.target_half_width,
+                        max_repeats=args.max_repeats,
+                        budget=args.budget,
+                        active_ranking=args.active_ranking,
+                        ranking_confidence=args.ranking_confidence,
+                        rank_tolerance=args.rank_tolerance,
                     )
                     elapsed = time.perf_counter() - start
                     print(f"[{lattice.name}] elapsed {elapsed:.2f}s")
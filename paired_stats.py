@@ -0,0 +1,139 @@
+"""
+Paired (common random numbers) comparisons for lattices run with --reward-seed.
+
+Every game with the same repeat index then draws its rewards from the same tape, so
+the difference between two cells at one repeat index cancels most of the reward
+noise that dominates a raw score. Cells are compared against the other bad models
+of the same good model and, given a solo journal run with the same seed, against
+that good model's solo game on the same tape.
+"""
+
+import statistics
+from pathlib import Path
+
+from run_journal import RunJournal
+
+SOLO_REFERENCE = "solo"
+
+PAIRED_DIFFS_HEADER = [
+    "good_model",
+    "bad_model",
+    "reference",
+    "pairs",
+    "actual_diff_mean",
+    "actual_diff_stdev",
+    "unpaired_actual_diff_stdev",
+    "expected_diff_mean",
+    "expected_diff_stdev",
+]
+
+# (good_model, bad_model, repeat_index) -> (actual_score, expected_score)
+CellScores = dict[tuple[str, str, int], tuple[float, float]]
+# (model, repeat_index) -> (actual_score, expected_score)
+SoloScores = dict[tuple[str, int], tuple[float, float]]
+
+
+def load_solo_baseline(
+    path: Path, *, num_pulls: int, history_window: int, reward_seed: int
+) -> SoloScores:
+    """Solo scores from a solo_async journal (or its lattice directory) played on the same tapes."""
+    journal_path = path / "journal.jsonl" if path.is_dir() else path
+    if not journal_path.exists():
+        raise FileNotFoundError(f"No solo journal at {journal_path}")
+    scores: SoloScores = {}
+    for record in RunJournal(journal_path).records():
+        if record.get("kind") != "solo" or record.get("num_pulls") != num_pulls:
+            continue
+        if record.get("history_window", 0) != history_window:
+            continue
+        if record.get("reward_seed") != reward_seed:
+            continue
+        key = (record["model"], int(record["repeat_index"]))
+        scores[key] = (float(record["total_score"]), float(record["expected_score"]))
+    return scores
+
+
+def _pvariance(values: list[float]) -> float:
+    return statistics.pvariance(values) if len(values) >= 2 else 0.0
+
+
+def _paired_row(
+    good_model: str,
+    bad_model: str,
+    reference: str,
+    cell: dict[int, tuple[float, float]],
+    other: dict[int, tuple[float, float]],
+) -> list[object] | None:
+    repeats = sorted(cell.keys() & other.keys())
+    if not repeats:
+        return None
+    actual_diffs = [cell[r][0] - other[r][0] for r in repeats]
+    expected_diffs = [cell[r][1] - other[r][1] for r in repeats]
+    # What the difference would spread like had the two sides drawn independent rewards.
+    unpaired = _pvariance([cell[r][0] for r in repeats]) + _pvariance([other[r][0] for r in repeats])
+    return [
+        good_model,
+        bad_model,
+        reference,
+        len(repeats),
+        round(statistics.fmean(actual_diffs), 3),
+        round(_pvariance(actual_diffs) ** 0.5, 3),
+        round(unpaired**0.5, 3),
+        round(statistics.fmean(expected_diffs), 3),
+        round(_pvariance(expected_diffs) ** 0.5, 3),
+    ]
+
+
+def paired_diff_rows(scores: CellScores, solo: SoloScores | None = None) -> list[list[object]]:
+    """
+    One row per (cell, reference): the cell's score minus the reference's, over shared repeats.
+
+    References are the solo game of the same good model (when solo is given) and every
+    other bad model played by the same good model, each unordered pair listed once.
+    """
+    cells: dict[tuple[str, str], dict[int, tuple[float, float]]] = {}
+    for (good_model, bad_model, repeat_index), value in scores.items():
+        cells.setdefault((good_model, bad_model), {})[repeat_index] = value
+
+    rows: list[list[object]] = []
+    for (good_model, bad_model), cell in sorted(cells.items()):
+        if solo is not None:
+            solo_cell = {r: value for (model, r), value in solo.items() if model == good_model}
+            row = _paired_row(good_model, bad_model, SOLO_REFERENCE, cell, solo_cell)
+            if row is not None:
+                rows.append(row)
+        for (other_good, other_bad), other in sorted(cells.items()):
+            if other_good != good_model or other_bad <= bad_model:
+                continue
+            row = _paired_row(good_model, bad_model, other_bad, cell, other)
+            if row is not None:
+                rows.append(row)
+    return rows
+
+
+def solo_diff_means(rows: list[list[object]]) -> dict[tuple[str, str], float]:
+    """Mean actual-score difference from solo per (good_model, bad_model) cell."""
+    reference_col = PAIRED_DIFFS_HEADER.index("reference")
+    mean_col = PAIRED_DIFFS_HEADER.index("actual_diff_mean")
+    return {
+        (str(row[0]), str(row[1])): float(row[mean_col])
+        for row in rows
+        if row[reference_col] == SOLO_REFERENCE
+    }
+
+
+def summarize_paired_rows(rows: list[list[object]]) -> list[str]:
+    """How much variance pairing removed, pooled over all comparisons with at least two pairs."""
+    pairs_col = PAIRED_DIFFS_HEADER.index("pairs")
+    paired_col = PAIRED_DIFFS_HEADER.index("actual_diff_stdev")
+    unpaired_col = PAIRED_DIFFS_HEADER.index("unpaired_actual_diff_stdev")
+    usable = [row for row in rows if int(row[pairs_col]) >= 2]
+    paired = sum(float(row[paired_col]) ** 2 for row in usable)
+    unpaired = sum(float(row[unpaired_col]) ** 2 for row in usable)
+    if not usable or unpaired <= 0:
+        return []
+    ratio = paired / unpaired
+    return [
+        f"{len(usable)} paired comparison(s): differences have {ratio:.1%} of the variance of "
+        f"independent draws, so equal power needs about {ratio:.0%} of the repeats"
+    ]
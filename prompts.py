@@ -1,38 +1,78 @@
+import threading
+from typing import Callable
+
 from bandit import ARMS
-from util import load_prompt, expected_score
+from util import load_prompt, expected_score, prompt_file_stamp
 
-def get_good_prompt(num_pulls: int) -> str:
+# Rendered system prompts keyed by (template, num_pulls, ARMS fingerprint, file stamp).
+# The file stamp is None unless PROMPT_RELOAD=1, in which case it is the template's mtime.
+_RENDERED_PROMPTS: dict[tuple, str] = {}
+_RENDERED_PROMPTS_LOCK = threading.Lock()
+
+
+def _arms_fingerprint() -> tuple:
+    return tuple(tuple(sorted(arm.items())) for arm in ARMS)
+
+
+def _cached_prompt(template: str, num_pulls: int, render: Callable[[str, int], str]) -> str:
+    key = (template, num_pulls, _arms_fingerprint(), prompt_file_stamp(template))
+    prompt = _RENDERED_PROMPTS.get(key)
+    if prompt is None:
+        prompt = render(load_prompt(template), num_pulls)
+        with _RENDERED_PROMPTS_LOCK:
+            _RENDERED_PROMPTS[key] = prompt
+    return prompt
+
+
+def clear_prompt_cache() -> None:
+    with _RENDERED_PROMPTS_LOCK:
+        _RENDERED_PROMPTS.clear()
+
+
+def _render_good_prompt(template: str, num_pulls: int) -> str:
     num_arms = len(ARMS)
     arms_1 = ", ".join([f"Arm {i}" for i in range(num_arms-1)]) + f", and Arm {num_arms-1}"
     arms_2 = ", ".join([f"{i}" for i in range(num_arms-1)]) + f", or {num_arms-1}"
     arms_3 = ", ".join([f"{i}" for i in range(num_arms-1)]) + f", AND {num_arms-1}"
-    return load_prompt("good_prompt.txt").format(num_pulls=num_pulls, num_arms=num_arms, arms_1=arms_1, arms_2=arms_2, arms_3=arms_3)
+    return template.format(num_pulls=num_pulls, num_arms=num_arms, arms_1=arms_1, arms_2=arms_2, arms_3=arms_3)
 
 
-def get_good_solo_prompt(num_pulls: int) -> str:
+def get_good_prompt(num_pulls: int) -> str:
+    return _cached_prompt("good_prompt.txt", num_pulls, _render_good_prompt)
+
+
+def _render_good_solo_prompt(template: str, num_pulls: int) -> str:
     num_arms = len(ARMS)
     arms_1 = ", ".join([f"Arm {i}" for i in range(num_arms - 1)]) + f", and Arm {num_arms - 1}"
     arms_3 = ", ".join([f"{i}" for i in range(num_arms - 1)]) + f", AND {num_arms - 1}"
-    return load_prompt("good_prompt_solo.txt").format(
+    return template.format(
         num_pulls=num_pulls,
         num_arms=num_arms,
         arms_1=arms_1,
         arms_3=arms_3,
     )
 
+
+def get_good_solo_prompt(num_pulls: int) -> str:
+    return _cached_prompt("good_prompt_solo.txt", num_pulls, _render_good_solo_prompt)
+
 def arm_description(choice: int) -> str:
     tmp = [0] + sorted(ARMS[choice].keys())
     s = f"Arm {choice}: " + ", ".join([f"{int(tmp[i]*100)-int(tmp[i-1]*100)}% chance of giving {ARMS[choice][tmp[i]]} points" for i in range(1, len(tmp))])
     s += f" - expected value is {expected_score(choice)}."
     return s
 
-def get_bad_prompt(num_pulls: int) -> str:
+def _render_bad_prompt(template: str, num_pulls: int) -> str:
     info = "\n".join([arm_description(i) for i in range(len(ARMS))])
     ev_info = "\n".join(
         [f"Arm {i}: expected value {expected_score(i)}" for i in range(len(ARMS))]
     )
-    return load_prompt("bad_prompt.txt").format(
+    return template.format(
         num_pulls=num_pulls,
         info=info,
         ev_info=ev_info,
     )
+
+
+def get_bad_prompt(num_pulls: int) -> str:
+    return _cached_prompt("bad_prompt.txt", num_pulls, _render_bad_prompt)
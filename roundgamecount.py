@@ -1,8 +1,17 @@
+import argparse
+import concurrent.futures
+import contextlib
+import hashlib
+import itertools
+import json
 import math
+import os
+from pathlib import Path
 
 import numpy as np
 import scipy.stats as st
 
+from bandit import reward_table
 from config import ARMS as CONFIG_ARMS
 
 
@@ -26,6 +35,11 @@ ALPHA = 0.05
 TARGET_PROB = 0.95
 N_EXPERIMENTS = 2000
 SEED = 2026
+# experiments per shard: each shard gets its own SeedSequence child stream and
+# is simulated as one batch, so memory is bounded and results do not depend on
+# how many worker processes share the shards
+EXPERIMENT_CHUNK = 500
+CACHE_DIR = Path("results/power_cache")
 
 # Estimate earliest stopping time R* where UCB1 beats random
 # Simulate many "experiments", each experiment is 60 paired games up to R_MAX
@@ -34,7 +48,6 @@ SEED = 2026
 # r where it exceeds TARGET_PROB
 
 K = len(ARMS)
-p_vec = np.array([p for p, _, _ in ARMS], dtype=np.float64)
 hi_vec = np.array([hi for _, hi, _ in ARMS], dtype=np.int32)
 lo_vec = np.array([lo for _, _, lo in ARMS], dtype=np.int32)
 
@@ -43,83 +56,98 @@ R_MAXR = hi_vec.max()
 R_RANGE = float(R_MAXR - R_MIN)
 
 
-def sample_reward_table(rng: np.random.Generator, r_max: int) -> np.ndarray:
-    # rewards[a, t] is the reward if arm a is pulled at time t
-    u = rng.random((K, r_max))
-    return np.where(u < p_vec[:, None], hi_vec[:, None], lo_vec[:, None]).astype(
-        np.int32
-    )
-
-
-def run_ucb1(rewards: np.ndarray) -> np.ndarray:
-    # basic UCB1 on scaled rewards in [0,1]
-    r_max = rewards.shape[1]
-    counts = np.zeros(K, dtype=np.int32)
-    sum_scaled = np.zeros(K, dtype=np.float64)
-    cum = np.zeros(r_max, dtype=np.float64)
-    total = 0.0
+def run_ucb1_batch(rewards: np.ndarray) -> np.ndarray:
+    # basic UCB1 on rewards scaled to [0,1], for a whole batch of games at once:
+    # rewards is (..., K, r_max) and the result is the (..., r_max) cumulative score
+    batch_shape = rewards.shape[:-2]
+    r_max = rewards.shape[-1]
+    flat = rewards.reshape(-1, K, r_max)
+    games = np.arange(flat.shape[0])
+    counts = np.zeros((flat.shape[0], K), dtype=np.int32)
+    sum_scaled = np.zeros((flat.shape[0], K), dtype=np.float64)
+    picked = np.empty((flat.shape[0], r_max), dtype=np.float64)
 
     for t in range(r_max):
         if t < K:
-            a = t
+            a = np.full(flat.shape[0], t)
         else:
             ln_t = math.log(t + 1.0)
             means = sum_scaled / counts
             bonus = np.sqrt(2.0 * ln_t / counts)
-            a = int(np.argmax(means + bonus))
-
-        r = float(rewards[a, t])
-        total += r
-        cum[t] = total
-        counts[a] += 1
-        sum_scaled[a] += (r - R_MIN) / R_RANGE
-
-    return cum
-
-
-def run_random(rewards: np.ndarray, rng_actions: np.random.Generator) -> np.ndarray:
-    # random actions
-    r_max = rewards.shape[1]
-    actions = rng_actions.integers(0, K, size=r_max)
-    picked = rewards[actions, np.arange(r_max)]
-    return np.cumsum(picked, dtype=np.float64)
+            a = np.argmax(means + bonus, axis=1)
+
+        r = flat[games, a, t].astype(np.float64)
+        picked[:, t] = r
+        counts[games, a] += 1
+        sum_scaled[games, a] += (r - R_MIN) / R_RANGE
+
+    return np.cumsum(picked, axis=1).reshape(*batch_shape, r_max)
+
+
+def run_random_batch(rewards: np.ndarray, rng_actions: np.random.Generator) -> np.ndarray:
+    # uniformly random actions for a (..., K, r_max) batch of games
+    r_max = rewards.shape[-1]
+    actions = rng_actions.integers(0, K, size=(*rewards.shape[:-2], r_max))
+    picked = np.take_along_axis(rewards, actions[..., None, :], axis=-2)[..., 0, :]
+    return np.cumsum(picked, axis=-1, dtype=np.float64)
+
+
+def simulate_diffs(
+    r_max: int, n_games: int, n_experiments: int, rng: np.random.Generator
+) -> np.ndarray:
+    # (n_experiments, n_games, r_max) cumulative UCB1 minus random score, with
+    # both policies playing the same reward table in each game
+    rewards = reward_table(rng, n_experiments * n_games * r_max)
+    rewards = rewards.reshape(K, n_experiments, n_games, r_max).transpose(1, 2, 0, 3)
+    return run_ucb1_batch(rewards) - run_random_batch(rewards, rng)
+
+
+def earliest_stop_rounds(diffs: np.ndarray, alpha: float) -> np.ndarray:
+    # earliest r where mean_diff(r) is positive and the one-sided paired t-test
+    # p-value is <= alpha/r_max, for every experiment at once: diffs is
+    # (n_experiments, n_games, r_max), the result holds each experiment's
+    # earliest stopping round (0 if it never stops)
+    n_games, r_max = diffs.shape[-2:]
+    mean = diffs.mean(axis=-2)
+    sd = diffs.std(axis=-2, ddof=1)
+    se = sd / math.sqrt(float(n_games))
 
+    finite = se > 0
+    tstats = np.where(finite, mean / np.where(finite, se, 1.0), np.copysign(np.inf, mean))
+    pvals = st.t.sf(tstats, n_games - 1)
 
-def earliest_stop_round(r_max: int, n_games: int, alpha: float, seed: int) -> int:
-    # returns earliest r where p_r <= alpha/r_max and mean_diff(r) is positive
-    rng_master = np.random.default_rng(seed)
+    ok = (mean > 0) & (pvals <= alpha / r_max)
+    return np.where(ok.any(axis=-1), ok.argmax(axis=-1) + 1, 0).astype(np.int32)
 
-    ucb_totals = np.empty((n_games, r_max), dtype=np.float64)
-    rnd_totals = np.empty((n_games, r_max), dtype=np.float64)
 
-    for i in range(n_games):
-        rewards = sample_reward_table(
-            np.random.default_rng(int(rng_master.integers(0, 2**32 - 1))), r_max
-        )
-        ucb_totals[i] = run_ucb1(rewards)
-        rnd_totals[i] = run_random(
-            rewards, np.random.default_rng(int(rng_master.integers(0, 2**32 - 1)))
-        )
+def _shard_stop_rounds(
+    r_max: int, n_games: int, alpha: float, n_experiments: int, seed_seq: np.random.SeedSequence
+) -> np.ndarray:
+    rng = np.random.default_rng(seed_seq)
+    return earliest_stop_rounds(simulate_diffs(r_max, n_games, n_experiments, rng), alpha)
 
-    diffs = ucb_totals - rnd_totals
-    mean = diffs.mean(axis=0)
-    sd = diffs.std(axis=0, ddof=1)
-    se = sd / math.sqrt(float(n_games))
-
-    # compute one-sided p-values for H1: mean(diffs[:, r]) > 0 using a paired
-    # one-sample t-test
-    tstats = np.zeros(r_max, dtype=np.float64)
-    finite = se > 0
-    tstats[finite] = mean[finite] / se[finite]
-    tstats[~finite] = np.inf * np.sign(mean[~finite])
 
-    df = n_games - 1
-    pvals = st.t.sf(tstats, df)
-
-    thresh = alpha / r_max
-    ok = (mean > 0) & (pvals <= thresh)
-    idx = np.where(ok)[0]
-    return int(idx[0] + 1) if idx.size > 0 else 0
+def stop_rounds(
+    r_max: int,
+    n_games: int,
+    alpha: float,
+    n_experiments: int,
+    seed: int,
+    executor: concurrent.futures.Executor | None = None,
+) -> np.ndarray:
+    # earliest stopping round of every experiment, in shard order whether the
+    # shards run here or on executor
+    sizes = [
+        min(EXPERIMENT_CHUNK, n_experiments - start)
+        for start in range(0, n_experiments, EXPERIMENT_CHUNK)
+    ]
+    seed_seqs = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [[r_max] * len(sizes), [n_games] * len(sizes), [alpha] * len(sizes), sizes, seed_seqs]
+    if executor is None:
+        shards = list(map(_shard_stop_rounds, *args))
+    else:
+        shards = list(executor.map(_shard_stop_rounds, *args))
+    return np.concatenate(shards) if shards else np.empty(0, dtype=np.int32)
 
 
 def find_min_r_for_target_prob(
@@ -129,23 +157,14 @@ def find_min_r_for_target_prob(
     target_prob: float,
     n_experiments: int,
     seed: int,
+    executor: concurrent.futures.Executor | None = None,
 ) -> dict:
     # runs experiments to estimate P(stop by r)
     # returns smallest r meeting target_prob
-    rng = np.random.default_rng(seed)
-    rstars = np.empty(n_experiments, dtype=np.int32)
-
-    for j in range(n_experiments):
-        s = int(rng.integers(0, 2**32 - 1))
-        rstars[j] = earliest_stop_round(r_max, n_games, alpha, s)
-
-    cdf = np.array(
-        [
-            (rstars[(rstars > 0) & (rstars <= r)].size) / n_experiments
-            for r in range(1, r_max + 1)
-        ],
-        dtype=np.float64,
-    )
+    rstars = stop_rounds(r_max, n_games, alpha, n_experiments, seed, executor)
+
+    stops = np.bincount(rstars, minlength=r_max + 1)
+    cdf = np.cumsum(stops[1:]) / n_experiments
 
     idx = np.where(cdf >= target_prob)[0]
     r_target = int(idx[0] + 1) if idx.size > 0 else None
@@ -166,18 +185,102 @@ def find_min_r_for_target_prob(
     }
 
 
-def main() -> None:
-    means = [p * hi + (1 - p) * lo for (p, hi, lo) in ARMS]
+def arms_fingerprint() -> str:
+    # changes whenever config.ARMS changes, so cached results never outlive it
+    arms = [sorted(arm.items()) for arm in CONFIG_ARMS]
+    return hashlib.sha256(json.dumps(arms).encode("utf-8")).hexdigest()[:16]
+
+
+def _cache_path(cache_dir: Path, key: dict) -> Path:
+    digest = hashlib.sha256(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()[:24]
+    return cache_dir / f"{digest}.json"
+
+
+def cached_find_min_r(
+    r_max: int,
+    n_games: int,
+    alpha: float,
+    target_prob: float,
+    n_experiments: int,
+    seed: int,
+    cache_dir: Path | None = CACHE_DIR,
+    executor: concurrent.futures.Executor | None = None,
+) -> tuple[dict, bool]:
+    # find_min_r_for_target_prob, answered from cache_dir when the same question
+    # was asked before; returns (result, whether it came from the cache)
+    key = {
+        "arms": arms_fingerprint(),
+        "r_max": r_max,
+        "n_games": n_games,
+        "alpha": alpha,
+        "target_prob": target_prob,
+        "n_experiments": n_experiments,
+        "seed": seed,
+        "experiment_chunk": EXPERIMENT_CHUNK,
+    }
+    path = _cache_path(cache_dir, key) if cache_dir is not None else None
+    if path is not None and path.exists():
+        try:
+            stored = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            stored = None
+        if stored is not None and stored.get("key") == key:
+            result = stored["result"]
+            result["CDF_P_STOP_BY_R"] = np.asarray(result["CDF_P_STOP_BY_R"], dtype=np.float64)
+            result["RSTARS"] = np.asarray(result["RSTARS"], dtype=np.int32)
+            return result, True
+
     result = find_min_r_for_target_prob(
-        r_max=R_MAX,
-        n_games=N_GAMES,
-        alpha=ALPHA,
-        target_prob=TARGET_PROB,
-        n_experiments=N_EXPERIMENTS,
-        seed=SEED,
+        r_max, n_games, alpha, target_prob, n_experiments, seed, executor
+    )
+    if path is not None:
+        stored_result = dict(
+            result,
+            CDF_P_STOP_BY_R=result["CDF_P_STOP_BY_R"].tolist(),
+            RSTARS=result["RSTARS"].tolist(),
+        )
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps({"key": key, "result": stored_result}), encoding="utf-8")
+        tmp_path.replace(path)
+    return result, False
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Estimate the smallest round r by which UCB1 reliably beats random. "
+            "Several values per grid option sweep every combination."
+        )
+    )
+    parser.add_argument("--r-max", type=int, nargs="+", default=[R_MAX], help="Rounds per game")
+    parser.add_argument(
+        "--n-games", type=int, nargs="+", default=[N_GAMES], help="Paired games per experiment"
     )
+    parser.add_argument(
+        "--alpha", type=float, nargs="+", default=[ALPHA], help="Family-wise significance level"
+    )
+    parser.add_argument(
+        "--target-prob", type=float, nargs="+", default=[TARGET_PROB], help="Required P(stop by r)"
+    )
+    parser.add_argument(
+        "--experiments", type=int, default=N_EXPERIMENTS, help="Simulated experiments per point"
+    )
+    parser.add_argument(
+        "--seed", type=int, default=SEED, help="Root seed; shards use SeedSequence.spawn children"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes sharing the shards (1 runs in this process). Default: CPU count.",
+    )
+    parser.add_argument("--cache-dir", type=Path, default=CACHE_DIR, help="Where finished points are cached")
+    parser.add_argument("--no-cache", action="store_true", help="Neither read nor write the cache")
+    return parser.parse_args()
 
-    print("Arm means:", [round(m, 3) for m in means])
+
+def _print_result(result: dict) -> None:
     print(
         f"R_MAX={result['R_MAX']}, N_GAMES={result['N_GAMES']}, "
         f"ALPHA={result['ALPHA']}"
@@ -192,5 +295,32 @@ def main() -> None:
     print(f"Estimated P(stop by r_target): {result['P_STOP_BY_R_TARGET']:.3f}")
 
 
+def main() -> None:
+    args = _parse_args()
+    means = [p * hi + (1 - p) * lo for (p, hi, lo) in ARMS]
+    print("Arm means:", [round(m, 3) for m in means])
+
+    grid = list(itertools.product(args.r_max, args.n_games, args.alpha, args.target_prob))
+    cache_dir = None if args.no_cache else args.cache_dir
+    with contextlib.ExitStack() as stack:
+        executor = None
+        if args.workers > 1:
+            executor = stack.enter_context(concurrent.futures.ProcessPoolExecutor(args.workers))
+        for r_max, n_games, alpha, target_prob in grid:
+            result, cached = cached_find_min_r(
+                r_max, n_games, alpha, target_prob, args.experiments, args.seed, cache_dir, executor
+            )
+            if len(grid) == 1:
+                _print_result(result)
+                if cached:
+                    print("(from cache)")
+                continue
+            print(
+                f"R_MAX={r_max} N_GAMES={n_games} ALPHA={alpha} TARGET_PROB={target_prob}: "
+                f"r_target={result['R_TARGET']} P(stop by r_target)={result['P_STOP_BY_R_TARGET']:.3f}"
+                f"{' (cached)' if cached else ''}"
+            )
+
+
 if __name__ == "__main__":
     main()
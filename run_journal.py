@@ -0,0 +1,79 @@
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+
+class RunJournal:
+    """
+    Append-only JSONL record of finished tasks for one lattice output directory.
+
+    Each record is flushed and fsynced before append() returns, so a crash loses at
+    most the tasks that were still running. A torn final line is ignored on load.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._tail_checked = False
+
+    def _torn_tail(self) -> bool:
+        if not self.path.exists() or self.path.stat().st_size == 0:
+            return False
+        with self.path.open("rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b"\n"
+
+    def append(self, record: dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False, sort_keys=True)
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            prefix = ""
+            if not self._tail_checked:
+                # Terminate a line torn by a crash so the next record parses on its own.
+                prefix = "\n" if self._torn_tail() else ""
+                self._tail_checked = True
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(f"{prefix}{line}\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def records(self) -> list[dict[str, Any]]:
+        if not self.path.exists():
+            return []
+        records: list[dict[str, Any]] = []
+        with self.path.open("r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(record, dict):
+                    records.append(record)
+        return records
+
+    def archive(self, now: datetime) -> Path | None:
+        """Move an existing journal aside so a fresh (non-resumed) run starts empty."""
+        return archive_file(self.path, now)
+
+
+def archive_file(path: Path, now: datetime) -> Path | None:
+    if not path.exists():
+        return None
+    archived = path.with_name(f"{path.stem}_{now.strftime('%Y%m%d_%H%M%S')}{path.suffix}")
+    os.replace(path, archived)
+    return archived
+
+
+def accumulate_usage(totals: dict[str, int], usage: dict[str, Any] | None) -> None:
+    """Add the integer token counts of one provider response into totals."""
+    if not usage:
+        return
+    for key, value in usage.items():
+        if isinstance(value, int) and not isinstance(value, bool):
+            totals[key] = totals.get(key, 0) + value
@@ -5,6 +5,7 @@ import contextlib
 import csv
 import os
 import re
+import shutil
 import shlex
 import statistics
 import sys
@@ -12,7 +13,7 @@ import threading
 import time
 import traceback
 from collections import defaultdict
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 from typing import TextIO
@@ -20,13 +21,27 @@ from typing import TextIO
 import agents.anthropic as anthropic_module
 from agents.gemini import Gemini
 from agents.grok import Grok
-from agents.main import call_good_agent
+from agents.main import call_good_agent, call_good_agent_async, describe_history_policy
 from agents.openai import OpenAI
-from agents.resilience import retry_log_sink
-from bandit import n_armed_bandit
+from agents.batch import BatchCoordinator, batch_game, batch_scope
+from agents.resilience import describe_concurrency_windows, retry_log_sink
+from agents.transcript import Transcript
+from bandit import RewardTape, draw_reward, game_reward_tape
+from cache_stats import CACHE_STATS_HEADER, cache_stats_row, summarize_cache_rows
 from config import NUM_PULLS
+from conversation import _report_turn, _warn_cache_discount_once, load_game_state, save_game_state
 from dotenv import dotenv_values
+from event_store import (
+    EVENTS_JSONL,
+    EVENTS_PARQUET,
+    EventLog,
+    compact_events,
+    flatten_event,
+    pyarrow_available,
+)
+from game_checkpoint import GameCheckpoint
 from prompts import get_good_solo_prompt
+from run_journal import RunJournal, accumulate_usage, archive_file
 from util import get_summary, get_summary_rows, total_expected_score, total_score
 
 
@@ -59,6 +74,7 @@ class SoloResult:
     expected_score: float
     elapsed_seconds: float
     game_log_path: Path
+    usage: dict[str, dict[str, int]] = field(default_factory=dict)
 
 
 @dataclass(frozen=True)
@@ -91,9 +107,25 @@ LATTICES: dict[str, LatticeSpec] = {
             gemini_effort="low",
         ),
     ),
+    # Offline mock provider (agents/mock.py) for load-testing the runner itself.
+    "mock": LatticeSpec(
+        name="mock",
+        models=("mock-ucb1", "mock-greedy", "mock-random"),
+        reasoning=ReasoningProfile(
+            openai_effort=None,
+            anthropic_effort=None,
+            anthropic_thinking_type="disabled",
+            gemini_effort=None,
+        ),
+    ),
 }
 
 
+def _format_windows() -> str:
+    windows = describe_concurrency_windows()
+    return f" in_flight[{windows}]" if windows else ""
+
+
 def _safe_name(value: str) -> str:
     return re.sub(r"[^A-Za-z0-9._-]+", "-", value)
 
@@ -244,6 +276,11 @@ def _print_run_header(
     print(f"  output_dir={args.output_dir.resolve()}")
     print(f"  debug={args.debug}")
     print(f"  settings_file={args.settings_file}")
+    print(f"  resume={args.resume}")
+    print(f"  task_retries={args.task_retries}")
+    print(f"  history_window={args.history_window} ({describe_history_policy(args.history_window)})")
+    print(f"  batch_mode={args.batch_mode}")
+    print(f"  reward_seed={args.reward_seed}")
     print("Reasoning profile:")
     print(f"  openai_effort={lattice.reasoning.openai_effort}")
     print(f"  anthropic_effort={lattice.reasoning.anthropic_effort}")
@@ -266,90 +303,250 @@ def _print_run_header(
     print("=" * 100)
 
 
+def _apply_solo_response(
+    log,
+    debug: bool,
+    model_id: str,
+    current_pull: int,
+    response: dict,
+    all_results: list[tuple[int, float]],
+    good_history_turns: list[dict],
+    cache_discount_warnings_shown: set[str],
+    reward_tape: RewardTape | None = None,
+) -> tuple[int, float] | None:
+    _warn_cache_discount_once(log, model_id, response, cache_discount_warnings_shown)
+
+    if debug:
+        log(f"Model ({model_id}): {response['llm_response']}\n")
+        if response.get("usage"):
+            log(f"Usage ({model_id}): {response['usage']}")
+
+    if response.get("history_turn"):
+        good_history_turns.append(response["history_turn"])
+
+    if response["arm_pulled"] is not None:
+        arm = int(response["arm_pulled"])
+        result = draw_reward(arm, current_pull, reward_tape)
+        all_results.append((arm, result))
+        if debug:
+            log(f"Pull {current_pull + 1}: arm {arm} gave {result} points")
+        return arm, result
+    return None
+
+
 def solo_conversation(
     num_pulls: int,
     model_id: str,
     debug: bool = False,
     emit=None,
+    on_turn=None,
+    checkpoint: GameCheckpoint | None = None,
+    history_window: int = 0,
+    reward_tape: RewardTape | None = None,
 ) -> list[tuple[int, float]]:
-    all_results: list[tuple[int, float]] = []
-    good_history_turns: list[dict] = []
-    bad_messages: list[str] = []
     cache_discount_warnings_shown: set[str] = set()
     log = emit if emit is not None else print
+    state = load_game_state(checkpoint, log)
+    all_results = state.all_results
     solo_prompt = get_good_solo_prompt(num_pulls)
+    transcript = Transcript()
 
-    for current_pull in range(num_pulls):
+    for current_pull in range(state.next_pull, num_pulls):
+        started_at = time.perf_counter()
         response = call_good_agent(
             model=model_id,
             current_turn=current_pull + 1,
             past_results=all_results,
-            bad_messages=bad_messages,
-            good_history_turns=good_history_turns,
+            bad_messages=state.bad_messages,
+            good_history_turns=state.good_history_turns,
             num_pulls=num_pulls,
             prompt_override=solo_prompt,
             include_bad_message=False,
+            transcript=transcript,
+            history_window=history_window,
+        )
+        pull = _apply_solo_response(
+            log, debug, model_id, current_pull, response,
+            all_results, state.good_history_turns, cache_discount_warnings_shown, reward_tape,
         )
+        _report_turn(on_turn, "solo", model_id, current_pull, response, started_at, pull)
+        state.next_pull = current_pull + 1
+        save_game_state(checkpoint, state)
 
-        cache_note = response.get("cache_discount_note")
-        warning_key = f"{model_id}:{cache_note}"
-        if cache_note and warning_key not in cache_discount_warnings_shown:
-            log(f"[cache-warning][{model_id}] {cache_note}")
-            cache_discount_warnings_shown.add(warning_key)
+    if debug:
+        log(get_summary(all_results, num_pulls))
+    return all_results
 
-        if debug:
-            log(f"Model ({model_id}): {response['llm_response']}\n")
-            if response.get("usage"):
-                log(f"Usage ({model_id}): {response['usage']}")
 
-        if response.get("history_turn"):
-            good_history_turns.append(response["history_turn"])
+async def solo_conversation_async(
+    num_pulls: int,
+    model_id: str,
+    debug: bool = False,
+    emit=None,
+    on_turn=None,
+    checkpoint: GameCheckpoint | None = None,
+    history_window: int = 0,
+    reward_tape: RewardTape | None = None,
+) -> list[tuple[int, float]]:
+    cache_discount_warnings_shown: set[str] = set()
+    log = emit if emit is not None else print
+    state = load_game_state(checkpoint, log)
+    all_results = state.all_results
+    solo_prompt = get_good_solo_prompt(num_pulls)
+    transcript = Transcript()
 
-        if response["arm_pulled"] is not None:
-            arm = int(response["arm_pulled"])
-            result = n_armed_bandit(arm)
-            all_results.append((arm, result))
-            if debug:
-                log(f"Pull {current_pull + 1}: arm {arm} gave {result} points")
+    for current_pull in range(state.next_pull, num_pulls):
+        started_at = time.perf_counter()
+        response = await call_good_agent_async(
+            model=model_id,
+            current_turn=current_pull + 1,
+            past_results=all_results,
+            bad_messages=state.bad_messages,
+            good_history_turns=state.good_history_turns,
+            num_pulls=num_pulls,
+            prompt_override=solo_prompt,
+            include_bad_message=False,
+            transcript=transcript,
+            history_window=history_window,
+        )
+        pull = _apply_solo_response(
+            log, debug, model_id, current_pull, response,
+            all_results, state.good_history_turns, cache_discount_warnings_shown, reward_tape,
+        )
+        _report_turn(on_turn, "solo", model_id, current_pull, response, started_at, pull)
+        state.next_pull = current_pull + 1
+        save_game_state(checkpoint, state)
 
     if debug:
         log(get_summary(all_results, num_pulls))
     return all_results
 
 
+def _game_record(
+    result: SoloResult, num_pulls: int, history_window: int, reward_seed: int | None
+) -> dict[str, object]:
+    return {
+        "kind": "solo",
+        "model": result.task.model,
+        "repeat_index": result.task.repeat_index,
+        "num_pulls": num_pulls,
+        "history_window": history_window,
+        "reward_seed": reward_seed,
+        "pulls": [[arm, reward] for arm, reward in result.pulls],
+        "total_score": result.total_score,
+        "expected_score": result.expected_score,
+        "elapsed_seconds": result.elapsed_seconds,
+        "game_log_path": str(result.game_log_path),
+        "usage": result.usage,
+        "recorded_at": datetime.now().isoformat(),
+    }
+
+
+def _load_journaled_results(
+    journal: RunJournal,
+    tasks: list[SoloTask],
+    num_pulls: int,
+    history_window: int,
+    reward_seed: int | None,
+) -> dict[SoloTask, SoloResult]:
+    wanted = set(tasks)
+    journaled: dict[SoloTask, SoloResult] = {}
+    for record in journal.records():
+        if record.get("kind") != "solo" or record.get("num_pulls") != num_pulls:
+            continue
+        if record.get("history_window", 0) != history_window:
+            continue
+        if record.get("reward_seed") != reward_seed:
+            continue
+        task = SoloTask(model=record["model"], repeat_index=int(record["repeat_index"]))
+        if task not in wanted:
+            continue
+        journaled[task] = SoloResult(
+            task=task,
+            pulls=[(int(arm), float(reward)) for arm, reward in record["pulls"]],
+            total_score=float(record["total_score"]),
+            expected_score=float(record["expected_score"]),
+            elapsed_seconds=float(record["elapsed_seconds"]),
+            game_log_path=Path(record["game_log_path"]),
+            usage=record.get("usage") or {},
+        )
+    return journaled
+
+
 async def _run_single_game(
     task: SoloTask,
     *,
     game_slot: asyncio.Semaphore,
     game_logs_dir: Path,
+    checkpoints_dir: Path,
+    event_log: EventLog,
+    lattice_name: str,
     num_pulls: int,
+    history_window: int,
+    reward_seed: int | None,
     debug: bool,
 ) -> SoloResult:
     game_log_path = _build_game_log_path(game_logs_dir, task)
+    checkpoint = GameCheckpoint(
+        checkpoints_dir / f"{game_log_path.stem}.json",
+        metadata={
+            "model": task.model,
+            "repeat_index": task.repeat_index,
+            "num_pulls": num_pulls,
+            "history_window": history_window,
+            "reward_seed": reward_seed,
+        },
+    )
 
-    def _run_with_game_log() -> list[tuple[int, float]]:
+    async with game_slot:
+        start = time.perf_counter()
         game_log_path.parent.mkdir(parents=True, exist_ok=True)
-        with game_log_path.open("w", encoding="utf-8", buffering=1) as game_log:
+        # A game resumed from its checkpoint continues its existing log. An unreadable or
+        # mismatched checkpoint restarts the game at turn 0, so its old log is truncated.
+        log_mode = "a" if checkpoint.load() is not None else "w"
+        with game_log_path.open(log_mode, encoding="utf-8", buffering=1) as game_log:
             def emit(message: str) -> None:
                 text = message if message.endswith("\n") else f"{message}\n"
                 game_log.write(text)
 
             emit(f"Model: {task.model}")
             emit(f"Repeat index: {task.repeat_index}")
+            emit(f"History policy: {describe_history_policy(history_window)}")
+            if reward_seed is not None:
+                emit(f"Reward tape: seed {reward_seed}, repeat {task.repeat_index}")
             emit(f"Debug mode: {debug}")
             emit("-" * 80)
 
+            usage: dict[str, dict[str, int]] = {}
+
+            event_context = {
+                "lattice": lattice_name,
+                "good_model": task.model,
+                "bad_model": None,
+                "repeat_index": task.repeat_index,
+                "num_pulls": num_pulls,
+            }
+
+            def record_turn(turn: dict) -> None:
+                accumulate_usage(usage.setdefault(turn["role"], {}), turn["usage"])
+                event_log.append(flatten_event(event_context, turn))
+
             with retry_log_sink(emit):
-                return solo_conversation(
+                pulls = await solo_conversation_async(
                     num_pulls=num_pulls,
                     model_id=task.model,
                     debug=debug,
                     emit=emit,
+                    on_turn=record_turn,
+                    checkpoint=checkpoint,
+                    history_window=history_window,
+                    reward_tape=(
+                        game_reward_tape(reward_seed, task.repeat_index, num_pulls)
+                        if reward_seed is not None
+                        else None
+                    ),
                 )
-
-    async with game_slot:
-        start = time.perf_counter()
-        pulls = await asyncio.to_thread(_run_with_game_log)
+        checkpoint.clear()
         elapsed_seconds = time.perf_counter() - start
         return SoloResult(
             task=task,
@@ -358,6 +555,7 @@ async def _run_single_game(
             expected_score=total_expected_score(pulls),
             elapsed_seconds=elapsed_seconds,
             game_log_path=game_log_path,
+            usage=usage,
         )
 
 
@@ -377,31 +575,70 @@ async def _run_solo_lattice(
     max_concurrent_games: int,
     output_root: Path,
     debug: bool,
+    resume: bool = False,
+    task_retries: int = 0,
+    history_window: int = 0,
+    batch_mode: bool = False,
+    reward_seed: int | None = None,
 ) -> None:
     _apply_reasoning_profile(lattice.reasoning)
     tasks = _build_tasks(lattice.models, repeats)
     lattice_dir = output_root / lattice.name
     games_dir = lattice_dir / "games"
     game_logs_dir = lattice_dir / "game_logs"
+    checkpoints_dir = lattice_dir / "checkpoints"
+
+    journal = RunJournal(lattice_dir / "journal.jsonl")
+    event_log = EventLog(lattice_dir / EVENTS_JSONL)
+    journaled: dict[SoloTask, SoloResult] = {}
+    if resume:
+        journaled = _load_journaled_results(journal, tasks, num_pulls, history_window, reward_seed)
+        print(f"[{lattice.name}] resuming: {len(journaled)}/{len(tasks)} games already in {journal.path}")
+        tasks = [task for task in tasks if task not in journaled]
+    else:
+        archived = journal.archive(datetime.now())
+        if archived is not None:
+            print(f"[{lattice.name}] previous journal moved to {archived}")
+        shutil.rmtree(checkpoints_dir, ignore_errors=True)
+        archive_file(event_log.path, datetime.now())
+        (lattice_dir / EVENTS_PARQUET).unlink(missing_ok=True)
 
-    game_slot = asyncio.Semaphore(max_concurrent_games)
+    # Batch mode advances every game together, one wave of requests per turn.
+    batch = BatchCoordinator(expected_games=len(tasks)) if batch_mode else None
+    game_slot = asyncio.Semaphore(max(1, len(tasks)) if batch_mode else max_concurrent_games)
 
     async def _run_and_capture(task: SoloTask) -> tuple[SoloTask, SoloResult | None, Exception | None]:
-        try:
-            result = await _run_single_game(
-                task,
-                game_slot=game_slot,
-                game_logs_dir=game_logs_dir,
-                num_pulls=num_pulls,
-                debug=debug,
-            )
-            return task, result, None
-        except Exception as exc:
-            return task, None, exc
+        # The game holds its place in the wave barrier across retries, until it is done for good.
+        with batch_game():
+            attempt = 0
+            while True:
+                try:
+                    result = await _run_single_game(
+                        task,
+                        game_slot=game_slot,
+                        game_logs_dir=game_logs_dir,
+                        checkpoints_dir=checkpoints_dir,
+                        event_log=event_log,
+                        lattice_name=lattice.name,
+                        num_pulls=num_pulls,
+                        history_window=history_window,
+                        reward_seed=reward_seed,
+                        debug=debug,
+                    )
+                    return task, result, None
+                except Exception as exc:
+                    if attempt >= task_retries:
+                        return task, None, exc
+                    attempt += 1
+                    print(
+                        f"[{lattice.name}] retrying {task.model} (run {task.repeat_index}) "
+                        f"from its checkpoint ({attempt}/{task_retries}) after: {exc}"
+                    )
 
-    running = [asyncio.create_task(_run_and_capture(task)) for task in tasks]
+    with batch_scope(batch):
+        running = [asyncio.create_task(_run_and_capture(task)) for task in tasks]
 
-    successful_results: list[SoloResult] = []
+    successful_results: list[SoloResult] = list(journaled.values())
     failures: list[tuple[SoloTask, Exception]] = []
     total = len(running)
     completed = 0
@@ -409,6 +646,7 @@ async def _run_solo_lattice(
     for job in asyncio.as_completed(running):
         task, result, exc = await job
         if exc is None and result is not None:
+            journal.append(_game_record(result, num_pulls, history_window, reward_seed))
             successful_results.append(result)
             summary_rows = [["Metric", "Value"]] + [list(row) for row in get_summary_rows(result.pulls)]
             game_path = games_dir / f"{_safe_name(result.task.model)}_r{result.task.repeat_index:03d}.csv"
@@ -421,6 +659,7 @@ async def _run_solo_lattice(
                 f"total={result.total_score:.3f} expected={result.expected_score:.3f} "
                 f"time={result.elapsed_seconds:.2f}s "
                 f"log={result.game_log_path}"
+                f"{_format_windows()}"
             )
         else:
             completed += 1
@@ -430,8 +669,12 @@ async def _run_solo_lattice(
                 f"{task.model} (run {task.repeat_index}): {exc}"
             )
 
+    if batch is not None:
+        print(f"[{lattice.name}] batch mode: {batch.describe()}")
+
     if not successful_results:
         raise RuntimeError(f"No successful games were produced for lattice '{lattice.name}'.")
+    successful_results.sort(key=lambda result: (result.task.model, result.task.repeat_index))
 
     run_rows: list[list[object]] = [
         [
@@ -485,6 +728,29 @@ async def _run_solo_lattice(
     _write_csv(lattice_dir / "model_scores_mean.csv", mean_rows)
     _write_csv(lattice_dir / "model_scores_stdev.csv", stdev_rows)
 
+    cache_rows = [
+        cache_stats_row(
+            result.task.model,
+            "no_evil_model",
+            result.task.repeat_index,
+            "solo",
+            result.task.model,
+            result.usage["solo"],
+        )
+        for result in successful_results
+        if result.usage.get("solo")
+    ]
+    _write_csv(lattice_dir / "cache_stats.csv", [CACHE_STATS_HEADER, *cache_rows])
+    for line in summarize_cache_rows(cache_rows):
+        print(f"[{lattice.name}] prompt cache {line}")
+
+    if pyarrow_available():
+        events_path = compact_events(lattice_dir)
+        if events_path is not None:
+            print(f"[{lattice.name}] per-turn events compacted to {events_path}")
+    else:
+        print(f"[{lattice.name}] pyarrow not installed; per-turn events left in {event_log.path}")
+
     print(
         f"[{lattice.name}] completed with {len(successful_results)} successes and "
         f"{len(failures)} failures. Outputs: {lattice_dir}"
@@ -496,17 +762,30 @@ def _parse_args() -> argparse.Namespace:
         description=(
             "Run solo lattice evaluations concurrently with retry/backoff at the provider request layer. "
             "Tune provider limits with env vars like OPENAI_MAX_IN_FLIGHT, ANTHROPIC_MAX_IN_FLIGHT, "
-            "GEMINI_MAX_IN_FLIGHT, and corresponding *_MIN_INTERVAL_SECONDS / *_MAX_RETRIES."
+            "GEMINI_MAX_IN_FLIGHT, and corresponding *_MIN_INTERVAL_SECONDS / *_MAX_RETRIES. "
+            "Per-model request/token budgets come from *_RPM / *_TPM. "
+            "With *_ADAPTIVE_CONCURRENCY=1, in-flight limits adapt between *_ADAPTIVE_MIN_IN_FLIGHT "
+            "and *_ADAPTIVE_MAX_IN_FLIGHT (default 4x *_MAX_IN_FLIGHT)."
         )
     )
     parser.add_argument(
         "--lattice",
         type=str,
-        choices=["openai-none", "mixed-low", "both"],
+        choices=["openai-none", "mixed-low", "mock", "both"],
         default="both",
         help="Which preset model set to run.",
     )
     parser.add_argument("--num-pulls", type=int, default=NUM_PULLS, help="Pulls per game.")
+    parser.add_argument(
+        "--history-window",
+        type=int,
+        default=0,
+        help=(
+            "Replay only the last K turns, preceded by per-arm pull counts and mean rewards "
+            "over the whole game. Keeps per-turn input size flat for long games. "
+            "0 (default) replays the full history."
+        ),
+    )
     parser.add_argument(
         "--repeats",
         type=int,
@@ -524,7 +803,8 @@ def _parse_args() -> argparse.Namespace:
         type=int,
         default=None,
         help=(
-            "Worker threads used by asyncio.to_thread for game execution. "
+            "Worker threads for providers without a native async client (games themselves "
+            "run as coroutines on one event loop). "
             "Default: max(max_concurrent_games, Python default threadpool size)."
         ),
     )
@@ -555,6 +835,42 @@ def _parse_args() -> argparse.Namespace:
             "Existing environment variables take precedence over file values."
         ),
     )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help=(
+            "Skip games already recorded in <output-dir>/<lattice>/journal.jsonl and rebuild "
+            "runs.csv and the per-model summaries from the journal plus the newly run games."
+        ),
+    )
+    parser.add_argument(
+        "--task-retries",
+        type=int,
+        default=0,
+        help=(
+            "Re-run a failed game this many times. Each retry continues from the game's "
+            "turn checkpoint (<output-dir>/<lattice>/checkpoints), so completed turns are not re-paid."
+        ),
+    )
+    parser.add_argument(
+        "--reward-seed",
+        type=int,
+        default=None,
+        help=(
+            "Draw each game's rewards from a seeded reward tape shared by every game with the "
+            "same repeat index (matches, solo games and baselines alike), so cells are compared "
+            "on identical reward realisations. Default: live unseeded draws."
+        ),
+    )
+    parser.add_argument(
+        "--batch-mode",
+        action="store_true",
+        help=(
+            "Run every game at once, one turn at a time, sending each wave of OpenAI/Anthropic "
+            "requests as a single Batch API job (cheaper, no rate limits, much higher latency). "
+            "Ignores --max-concurrent-games. Tune with BATCH_POLL_SECONDS and BATCH_COLLECT_SECONDS."
+        ),
+    )
     return parser.parse_args()
 
 
@@ -603,6 +919,11 @@ async def _async_main() -> None:
                         max_concurrent_games=args.max_concurrent_games,
                         output_root=args.output_dir,
                         debug=args.debug,
+                        resume=args.resume,
+                        task_retries=max(0, args.task_retries),
+                        history_window=max(0, args.history_window),
+                        batch_mode=args.batch_mode,
+                        reward_seed=args.reward_seed,
                     )
                     elapsed = time.perf_counter() - start
                     print(f"[{lattice.name}] elapsed {elapsed:.2f}s")
@@ -1,11 +1,30 @@
+import os
 import re
+import threading
 from bandit import ARMS
 
 GREEN, RED, RESET = "\033[32m", "\033[31m", "\033[0m"
 
+_PROMPT_FILES: dict[str, tuple[int | None, str]] = {}
+_PROMPT_FILES_LOCK = threading.Lock()
+
+def prompt_reload_enabled() -> bool:
+    # PROMPT_RELOAD=1 re-reads a prompt file whenever its mtime changes (for editing prompts mid-run).
+    return os.getenv("PROMPT_RELOAD", "0").strip() == "1"
+
+def prompt_file_stamp(filename: str) -> int | None:
+    return os.stat(f"prompts/{filename}").st_mtime_ns if prompt_reload_enabled() else None
+
 def load_prompt(filename: str) -> str:
+    stamp = prompt_file_stamp(filename)
+    cached = _PROMPT_FILES.get(filename)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
     with open(f"prompts/{filename}") as f:
-        return f.read()
+        text = f.read()
+    with _PROMPT_FILES_LOCK:
+        _PROMPT_FILES[filename] = (stamp, text)
+    return text
 
 def remove_thinking(message: str) -> str:
     return re.sub(r"<Thinking>.*?</Thinking>", "", message, flags=re.DOTALL)